@@ -0,0 +1,134 @@
+"""DiffApplyer.apply_diff scenarios on synthetic files.
+
+Each scenario takes a file size in lines and a number of diff blocks and
+returns `(content, diff)`. Run this file for a quick table, or
+`benchmarks/suite.py` for JSON results and regression checks.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Callable
+
+from rune.utils.diff import DiffApplyer
+
+SIZES = (1_000, 10_000, 100_000)
+REPEATS = 3
+
+
+def _block(search: str, replace: str) -> str:
+    return f"<<<<<<< SEARCH\n{search}\n=======\n{replace}\n>>>>>>> REPLACE"
+
+
+def _source(n: int) -> list[str]:
+    return [f"    value_{i} = compute({i})  # line {i}" for i in range(n)]
+
+
+def _positions(n: int, blocks: int, height: int) -> list[int]:
+    """Starting lines for *blocks* windows of *height* lines spread over the file."""
+    step = max(height + 1, n // blocks)
+    return list(range(1, n - height, step))[:blocks]
+
+
+def exact(n: int, blocks: int) -> tuple[str, str]:
+    """Blocks that match the file verbatim."""
+    lines = _source(n)
+    diff = [
+        _block("\n".join(lines[k : k + 2]), f"    replaced_{k} = 1")
+        for k in _positions(n, blocks, 2)
+    ]
+    return "\n".join(lines) + "\n", "\n".join(diff)
+
+
+def whitespace(n: int, blocks: int) -> tuple[str, str]:
+    """Blocks whose indentation differs from the file (whitespace-flexible match)."""
+    lines = _source(n)
+    diff = [
+        _block(
+            "\n".join(line.strip() for line in lines[k : k + 2]), f"replaced_{k} = 1"
+        )
+        for k in _positions(n, blocks, 2)
+    ]
+    return "\n".join(lines) + "\n", "\n".join(diff)
+
+
+def anchor(n: int, blocks: int) -> tuple[str, str]:
+    """Blocks whose first and last lines match but whose middle line is stale."""
+    lines = _source(n)
+    diff = []
+    for k in _positions(n, blocks, 4):
+        search = lines[k : k + 4]
+        search[1] = search[1].replace("compute", "stale")
+        diff.append(_block("\n".join(search), f"    replaced_{k} = 1"))
+    return "\n".join(lines) + "\n", "\n".join(diff)
+
+
+def ellipsis(n: int, blocks: int) -> tuple[str, str]:
+    """Blocks that elide the middle of a ten-line region with `...`."""
+    lines = _source(n)
+    diff = []
+    for k in _positions(n, blocks, 10):
+        search = f"{lines[k]}\n...\n{lines[k + 9]}"
+        replace = f"    start_{k} = 1\n...\n    end_{k} = 1"
+        diff.append(_block(search, replace))
+    return "\n".join(lines) + "\n", "\n".join(diff)
+
+
+def anchor_ambiguous(n: int, blocks: int) -> tuple[str, str]:
+    """A three-line block whose anchors match every fourth line (fails as ambiguous)."""
+    lines = []
+    for i in range(n // 4):
+        lines += ["    if x:", f"        y = {i}", "    return x", ""]
+    return "\n".join(lines) + "\n", _block("if x:\ny = -1\nreturn x", "replaced = 1")
+
+
+def fuzzy_near_miss(n: int, blocks: int) -> tuple[str, str]:
+    """A block with one mistyped line, so the "Did you mean?" search runs."""
+    lines = _source(n)
+    k = n // 2
+    search = lines[k : k + 3]
+    search[0] = search[0].replace("compute", "calculate")
+    return "\n".join(lines) + "\n", _block("\n".join(search), "replaced = 1")
+
+
+def fuzzy_failure(n: int, blocks: int) -> tuple[str, str]:
+    """A block whose every line is mistyped, forcing the token pre-filter."""
+    lines = _source(n)
+    k = n // 2
+    search = "\n".join(lines[k : k + 3]).replace("compute", "calculate")
+    return "\n".join(lines) + "\n", _block(search, "replaced = 1")
+
+
+# (scenario, block counts to run it with); failing paths stop at the first block.
+SCENARIOS: list[tuple[Callable[[int, int], tuple[str, str]], tuple[int, ...]]] = [
+    (exact, (1, 10, 50)),
+    (whitespace, (1, 10, 50)),
+    (anchor, (1, 10, 50)),
+    (ellipsis, (1, 10, 50)),
+    (anchor_ambiguous, (1,)),
+    (fuzzy_near_miss, (1,)),
+    (fuzzy_failure, (1,)),
+]
+
+
+def main() -> None:
+    logging.disable(logging.CRITICAL)
+    applyer = DiffApplyer()
+    for scenario, block_counts in SCENARIOS:
+        for n in SIZES:
+            for blocks in block_counts:
+                content, diff = scenario(n, blocks)
+                best = float("inf")
+                for _ in range(REPEATS):
+                    start = time.perf_counter()
+                    applyer.apply_diff(content, diff)
+                    best = min(best, time.perf_counter() - start)
+                print(
+                    f"{scenario.__name__:<18} {n:>7} lines {blocks:>3} blocks"
+                    f"  {best * 1000:9.1f} ms"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""edit_file / write_file scenarios, including file I/O and diff generation.
+
+Each scenario takes a working directory, a file size in lines and a number
+of diff blocks, prepares the file and returns a zero-argument callable that
+performs one tool call. Results are collected by `benchmarks/suite.py`.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from pathlib import Path
+
+from bench_diff_apply import _source, exact
+from pydantic_ai import RunContext
+from pydantic_ai.usage import Usage
+
+from rune.core.context import SessionContext
+from rune.tools.edit_file import edit_file
+from rune.tools.write_file import write_file
+
+
+def _context(root: Path) -> RunContext[SessionContext]:
+    return RunContext(
+        model="bench",
+        usage=Usage(),
+        prompt="",
+        deps=SessionContext(current_working_dir=root),
+    )
+
+
+def tool_edit_file(root: Path, n: int, blocks: int) -> Callable[[], object]:
+    """edit_file with exact blocks spread over the file."""
+    content, diff = exact(n, blocks)
+    (root / "edit.py").write_text(content, encoding="utf-8")
+    ctx = _context(root)
+    return lambda: edit_file(ctx, "edit.py", diff)
+
+
+def tool_write_file_modify(root: Path, n: int, blocks: int) -> Callable[[], object]:
+    """write_file overwriting the file with *blocks* lines changed."""
+    lines = _source(n)
+    (root / "write.py").write_text("\n".join(lines) + "\n", encoding="utf-8")
+    for k in range(0, n, max(1, n // blocks))[:blocks]:
+        lines[k] = f"    changed_{k} = 1"
+    new_content = "\n".join(lines) + "\n"
+    ctx = _context(root)
+    return lambda: write_file(ctx, "write.py", new_content)
+
+
+def tool_write_file_create(root: Path, n: int, blocks: int) -> Callable[[], object]:
+    """write_file creating a new file."""
+    target = root / "created.py"
+    target.unlink(missing_ok=True)
+    content = "\n".join(_source(n)) + "\n"
+    ctx = _context(root)
+    return lambda: write_file(ctx, "created.py", content)
+
+
+SCENARIOS: list[
+    tuple[Callable[[Path, int, int], Callable[[], object]], tuple[int, ...]]
+] = [
+    (tool_edit_file, (1, 10, 50)),
+    (tool_write_file_modify, (1, 50)),
+    (tool_write_file_create, (1,)),
+]
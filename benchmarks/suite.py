@@ -0,0 +1,199 @@
+"""Benchmark suite for DiffApplyer and the edit/write tools.
+
+    python benchmarks/suite.py run -o results.json [--sizes 100 1000] [-k exact]
+    python benchmarks/suite.py compare baseline.json results.json
+
+`run` records the best wall time and the peak traced memory of every case
+as JSON. `compare` prints the change per case between two runs and exits
+with status 1 if any case got slower or hungrier than the thresholds allow.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+
+import bench_diff_apply
+import bench_tools
+
+from rune.utils.diff import DiffApplyer
+
+SIZES = (100, 1_000, 10_000, 100_000, 200_000)
+REPEATS = 5
+TIME_THRESHOLD = 0.25  # Relative slowdown reported as a regression
+MEMORY_THRESHOLD = 0.25  # Relative growth in peak memory reported as a regression
+MIN_DELTA_SECONDS = 0.002  # Smaller absolute changes are treated as noise
+MIN_DELTA_BYTES = 64 * 1024
+
+
+def _cases(root: Path, sizes: tuple[int, ...]):
+    """Yields (name, setup) pairs; setup() prepares inputs and returns the timed call."""
+    applyer = DiffApplyer()
+    for scenario, block_counts in bench_diff_apply.SCENARIOS:
+        for n in sizes:
+            for blocks in block_counts:
+
+                def setup(scenario=scenario, n=n, blocks=blocks):
+                    content, diff = scenario(n, blocks)
+                    return lambda: applyer.apply_diff(content, diff)
+
+                yield f"diff_apply/{scenario.__name__}/{n}/{blocks}", setup
+
+    for scenario, block_counts in bench_tools.SCENARIOS:
+        for n in sizes:
+            for blocks in block_counts:
+
+                def setup(scenario=scenario, n=n, blocks=blocks):
+                    return scenario(root, n, blocks)
+
+                yield f"tools/{scenario.__name__}/{n}/{blocks}", setup
+
+
+def _measure(setup: Callable[[], Callable[[], object]], repeats: int) -> dict:
+    times = []
+    for _ in range(repeats):
+        call = setup()
+        start = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - start)
+
+    call = setup()
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "seconds": min(times),
+        "mean_seconds": sum(times) / len(times),
+        "peak_bytes": peak,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args: argparse.Namespace) -> int:
+    logging.disable(logging.CRITICAL)
+    results: dict[str, dict] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, setup in _cases(Path(tmp), tuple(args.sizes)):
+            if args.filter and not any(f in name for f in args.filter):
+                continue
+            results[name] = _measure(setup, args.repeats)
+            r = results[name]
+            print(
+                f"{name:<52} {r['seconds'] * 1000:10.2f} ms"
+                f" {r['peak_bytes'] / 1024:10.0f} KiB",
+                flush=True,
+            )
+
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeats": args.repeats,
+        },
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Wrote {len(results)} results to {args.output}")
+    return 0
+
+
+def _regressed(old: float, new: float, threshold: float, min_delta: float) -> bool:
+    return new - old > min_delta and new > old * (1 + threshold)
+
+
+def compare(args: argparse.Namespace) -> int:
+    base = json.loads(Path(args.baseline).read_text())["results"]
+    current = json.loads(Path(args.current).read_text())["results"]
+
+    regressions = 0
+    for name in sorted(base.keys() & current.keys()):
+        old, new = base[name], current[name]
+        flags = []
+        if _regressed(
+            old["seconds"], new["seconds"], args.time_threshold, MIN_DELTA_SECONDS
+        ):
+            flags.append("SLOWER")
+        if _regressed(
+            old["peak_bytes"],
+            new["peak_bytes"],
+            args.memory_threshold,
+            MIN_DELTA_BYTES,
+        ):
+            flags.append("MORE MEMORY")
+        regressions += bool(flags)
+        time_change = new["seconds"] / old["seconds"] - 1 if old["seconds"] else 0.0
+        memory_change = (
+            new["peak_bytes"] / old["peak_bytes"] - 1 if old["peak_bytes"] else 0.0
+        )
+        print(
+            f"{name:<52} {old['seconds'] * 1000:9.2f} -> {new['seconds'] * 1000:9.2f} ms"
+            f" ({time_change:+7.1%})  mem {memory_change:+7.1%}  {' '.join(flags)}"
+        )
+
+    for name in sorted(base.keys() - current.keys()):
+        print(f"{name:<52} missing from {args.current}")
+    for name in sorted(current.keys() - base.keys()):
+        print(f"{name:<52} new")
+
+    print(f"{regressions} regression(s)")
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks.")
+    run_parser.add_argument("-o", "--output", help="Write results to this JSON file.")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    run_parser.add_argument("--repeats", type=int, default=REPEATS)
+    run_parser.add_argument(
+        "-k",
+        "--filter",
+        action="append",
+        help="Only run cases whose name contains this text (repeatable).",
+    )
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare", help="Compare two result files.")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--time-threshold", type=float, default=TIME_THRESHOLD)
+    compare_parser.add_argument(
+        "--memory-threshold", type=float, default=MEMORY_THRESHOLD
+    )
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,368 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+
+from rune.utils.files import FileTransaction, content_hash, file_hash
+from rune.utils.linediff import unified_diff
+from rune.utils.patch import PatchError, apply_hunks, parse_patch
+
+PATCH_MAX_BYTES = 1024 * 1024  # Larger pre-images are stored whole, not as patches
+MAX_TURNS = 100  # Turns kept in the journal; older ones can no longer be undone
+PROMPT_PREVIEW = 60  # Characters of the user's prompt stored with each turn
+FICLONE = 0x40049409  # Linux ioctl that reflinks one file to another
+
+
+class UndoError(ValueError):
+    """Raised when an undo stops part-way; `undone` lists the turns already reverted."""
+
+    def __init__(self, message: str, undone: list[Turn]) -> None:
+        super().__init__(message)
+        self.undone = undone
+
+
+@dataclass
+class JournalEntry:
+    """How to take one file back to its state before a turn.
+
+    `before` is "patch" (apply `patch`, a reverse unified diff), "blob" (copy
+    the object named `blob`) or "absent" (delete the file). `after` is the
+    hash of the content the turn left behind, or None if it deleted the file;
+    undo refuses to touch a file that no longer matches it.
+    """
+
+    path: str
+    before: str
+    after: str | None
+    patch: str | None = None
+    blob: str | None = None
+
+
+@dataclass
+class Turn:
+    number: int
+    started: str
+    prompt: str
+    entries: list[JournalEntry]
+
+
+class UndoJournal:
+    """Records the pre-images of files changed in each turn, so turns can be undone.
+
+    Tools call `record` before changing a file. Small text files are kept in
+    memory until `end_turn`, which stores a reverse patch from the final
+    content back to the pre-image; large files are reflinked or hard-linked
+    into an object store right away, since they may not fit in memory, and
+    binary files are stored there at the end of the turn. Each turn is one
+    JSON file under `.rune/journal/turns/`; unchanged files leave no trace,
+    and objects no entry refers to are deleted. `record` does nothing
+    outside a turn.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.dir = root / ".rune" / "journal"
+        self._turn: Turn | None = None
+        # Pre-images of this turn: bytes in memory, a blob name, or None if absent
+        self._pending: dict[Path, bytes | str | None] = {}
+        # (inode, size, mtime) of large files when recorded, to spot no-op edits
+        self._stats: dict[Path, tuple[int, int, int]] = {}
+        self._created: set[str] = set()  # Objects stored by `record` this turn
+
+    @property
+    def _turns_dir(self) -> Path:
+        return self.dir / "turns"
+
+    def _object_path(self, digest: str) -> Path:
+        return self.dir / "objects" / digest[:2] / digest[2:]
+
+    def _store_object(self, source: Path, *, link: bool) -> str:
+        """Stores *source* under a new random name, without reading it if possible."""
+        name = uuid.uuid4().hex
+        target = self._object_path(name)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        _clone_file(source, target, link=link)
+        self._created.add(name)
+        return name
+
+    def _store_bytes(self, data: bytes) -> str:
+        digest = content_hash(data)
+        target = self._object_path(digest)
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(data)
+        return digest
+
+    def turns(self) -> list[int]:
+        """Numbers of the turns that can be undone, oldest first."""
+        if not self._turns_dir.is_dir():
+            return []
+        return sorted(int(p.stem) for p in self._turns_dir.glob("*.json"))
+
+    def load_turn(self, number: int) -> Turn:
+        raw = json.loads((self._turns_dir / f"{number:06d}.json").read_text())
+        raw["entries"] = [JournalEntry(**entry) for entry in raw["entries"]]
+        return Turn(**raw)
+
+    def begin_turn(self, prompt: str) -> int:
+        """Starts recording a turn and returns its number; an open turn is ended first."""
+        self.end_turn()
+        number = max(self.turns(), default=0) + 1
+        self._turn = Turn(
+            number=number,
+            started=datetime.now().isoformat(timespec="seconds"),
+            prompt=" ".join(prompt.split())[:PROMPT_PREVIEW],
+            entries=[],
+        )
+        self._pending, self._stats, self._created = {}, {}, set()
+        return number
+
+    def record(self, path: Path, *, linkable: bool = False) -> None:
+        """Saves the current state of *path* if this is its first change in the turn.
+
+        Call it once the change is validated and about to be written. Pass
+        *linkable* when the writer replaces *path* with a new file (as
+        `atomic_write_text` and `FileTransaction` do) rather than writing it
+        in place; a large pre-image may then be kept as a hard link.
+        """
+        if self._turn is None or path in self._pending:
+            return
+        if not path.exists():
+            self._pending[path] = None
+            return
+        st = path.stat()
+        if st.st_size > PATCH_MAX_BYTES:
+            self._pending[path] = self._store_object(path, link=linkable)
+            self._stats[path] = (st.st_ino, st.st_size, st.st_mtime_ns)
+        else:
+            self._pending[path] = path.read_bytes()
+
+    def _entry(self, path: Path, before: bytes | str | None) -> JournalEntry | None:
+        rel = path.relative_to(self.root).as_posix()
+        if not path.exists():
+            if before is None:
+                return None
+            if isinstance(before, bytes):
+                before = self._store_bytes(before)
+            return JournalEntry(rel, "blob", None, blob=before)
+
+        if isinstance(before, str):
+            st = path.stat()
+            if (st.st_ino, st.st_size, st.st_mtime_ns) == self._stats.get(path):
+                return None  # Not written after all
+        after = file_hash(path)
+        if before is None:
+            return JournalEntry(rel, "absent", after)
+        if isinstance(before, str):
+            return JournalEntry(rel, "blob", after, blob=before)
+        if content_hash(before) == after:
+            return None
+
+        current = path.read_bytes() if path.stat().st_size <= PATCH_MAX_BYTES else None
+        patch = _reverse_patch(current, before, rel) if current is not None else None
+        if patch is not None:
+            return JournalEntry(rel, "patch", after, patch=patch)
+        return JournalEntry(rel, "blob", after, blob=self._store_bytes(before))
+
+    def end_turn(self) -> Turn | None:
+        """Writes the turn's journal entry; returns None if no file changed."""
+        turn, self._turn = self._turn, None
+        if turn is None:
+            return None
+        turn.entries = [
+            entry
+            for path, before in self._pending.items()
+            if (entry := self._entry(path, before)) is not None
+        ]
+        referenced = {entry.blob for entry in turn.entries}
+        for name in self._created - referenced:
+            self._object_path(name).unlink(missing_ok=True)
+        self._pending, self._stats, self._created = {}, {}, set()
+        if not turn.entries:
+            return None
+        self._turns_dir.mkdir(parents=True, exist_ok=True)
+        (self._turns_dir / f"{turn.number:06d}.json").write_text(
+            json.dumps(asdict(turn), indent=1)
+        )
+        self._prune()
+        return turn
+
+    def _prune(self) -> None:
+        turns = self.turns()
+        if len(turns) <= MAX_TURNS:
+            return
+        for number in turns[:-MAX_TURNS]:
+            (self._turns_dir / f"{number:06d}.json").unlink()
+        referenced = {
+            entry.blob
+            for number in turns[-MAX_TURNS:]
+            for entry in self.load_turn(number).entries
+            if entry.blob
+        }
+        for obj in (self.dir / "objects").glob("*/*"):
+            if obj.parent.name + obj.name not in referenced:
+                obj.unlink()
+
+    def undo(self, to_turn: int | None = None) -> list[Turn]:
+        """Restores the tree to its state before *to_turn* (default: the last turn).
+
+        Turns are undone newest first. Every file of a turn is checked and
+        its pre-image staged before any is written, and the files are then
+        replaced in one FileTransaction, so a turn is either undone
+        completely or not at all; a file edited since the turn stops the
+        undo with an UndoError, whose `undone` lists the turns reverted
+        before it. An undone turn's objects are deleted unless another turn
+        still refers to them. Returns the turns that were undone.
+        """
+        turns = self.turns()
+        if not turns:
+            raise ValueError("Nothing to undo.")
+        to_turn = turns[-1] if to_turn is None else to_turn
+        if to_turn not in turns:
+            raise ValueError(
+                f"Turn {to_turn} is not in the journal (available: {turns[0]}-{turns[-1]})."
+            )
+
+        undone = []
+        for number in reversed([n for n in turns if n >= to_turn]):
+            try:
+                turn = self.load_turn(number)
+                restores = [self._prepare(entry, number) for entry in turn.entries]
+                with (
+                    tempfile.TemporaryDirectory(dir=self.dir) as backups,
+                    FileTransaction() as txn,
+                ):
+                    for path, before in restores:
+                        previous = self._backup(path, Path(backups))
+                        if before is None:
+                            assert previous is not None
+                            txn.stage_delete(path, previous=previous)
+                            continue
+                        path.parent.mkdir(parents=True, exist_ok=True)
+                        if isinstance(before, Path):
+                            txn.stage_copy(path, before, previous=previous)
+                        else:
+                            txn.stage(path, before, previous=previous)
+                    txn.commit()
+            except (OSError, ValueError) as e:
+                raise UndoError(str(e), undone) from e
+            self._drop_turn(turn)
+            undone.append(turn)
+        return undone
+
+    def _prepare(
+        self, entry: JournalEntry, number: int
+    ) -> tuple[Path, str | Path | None]:
+        """Checks that *entry* can be undone and returns what to restore.
+
+        That is the restored text for a patch, the object file for a blob,
+        or None if the file is to be deleted.
+        """
+        path = self.root / entry.path
+        current = file_hash(path) if path.is_file() else None
+        if current != entry.after:
+            raise ValueError(
+                f"{entry.path} was changed after turn {number}; undo stopped there."
+            )
+        if entry.before == "absent":
+            return path, None
+        if entry.before == "blob":
+            blob = self._object_path(entry.blob)
+            if not blob.is_file():
+                raise ValueError(f"Cannot undo {entry.path}: its saved copy is gone.")
+            return path, blob
+        try:
+            text, _ = apply_hunks(
+                path.read_bytes().decode("utf-8"),
+                parse_patch(entry.patch)[0].hunks,
+                fuzz=0,
+            )
+        except (PatchError, UnicodeDecodeError) as e:
+            raise ValueError(f"Cannot undo {entry.path}: {e}") from e
+        return path, text
+
+    def _backup(self, path: Path, backups: Path) -> bytes | Path | None:
+        """The current content of *path*, to put back if the undo fails part-way."""
+        if not path.exists():
+            return None
+        if path.stat().st_size <= PATCH_MAX_BYTES:
+            return path.read_bytes()
+        # The transaction replaces or unlinks the file, so a link stays intact.
+        backup = backups / uuid.uuid4().hex
+        _clone_file(path, backup, link=True)
+        return backup
+
+    def _drop_turn(self, turn: Turn) -> None:
+        """Removes an undone turn and the objects only it referred to."""
+        (self._turns_dir / f"{turn.number:06d}.json").unlink()
+        referenced = self._created | {
+            entry.blob
+            for number in self.turns()
+            for entry in self.load_turn(number).entries
+            if entry.blob
+        }
+        for entry in turn.entries:
+            if entry.blob and entry.blob not in referenced:
+                self._object_path(entry.blob).unlink(missing_ok=True)
+
+
+def _reverse_patch(current: bytes, before: bytes, path: str) -> str | None:
+    """A patch taking *current* back to *before*, or None if a blob is the better record.
+
+    The patch is applied once here, so only patches that reproduce *before*
+    byte for byte are kept.
+    """
+    try:
+        current_text = current.decode("utf-8")
+        before_text = before.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+    if "\0" in current_text or "\0" in before_text:
+        return None
+    diff = unified_diff(current_text, before_text, path)
+    if diff.summary is not None or not diff.text or len(diff.text) >= len(before):
+        return None
+    try:
+        restored, _ = apply_hunks(current_text, parse_patch(diff.text)[0].hunks, fuzz=0)
+    except PatchError:
+        return None
+    return diff.text if restored.encode("utf-8") == before else None
+
+
+def _clone_file(source: Path, target: Path, *, link: bool) -> None:
+    """Copies *source* to *target*, sharing its data where the filesystem allows.
+
+    Tries a reflink (copy-on-write, so later writes to either file are not
+    seen by the other), then a hard link if *link* allows it, then a copy.
+    """
+    if sys.platform == "linux":
+        import fcntl
+
+        with source.open("rb") as src, target.open("wb") as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                return
+            except OSError:
+                pass  # Not supported by this filesystem
+        target.unlink()
+    if link:
+        try:
+            os.link(source, target)
+            return
+        except OSError:
+            pass  # Cross-device, or links are not supported
+    fd, tmp = tempfile.mkstemp(dir=target.parent)
+    os.close(fd)
+    try:
+        shutil.copyfile(source, tmp)
+        os.replace(tmp, target)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
@@ -47,6 +47,11 @@ def rich_tool(
             return args[0].deps.live_display
         return None
 
+    def _begin_tool_call(args: Sequence[Any]) -> None:
+        """Counts the call against the session so tools can refer back to it."""
+        if args and isinstance(args[0], RunContext):
+            args[0].deps.begin_tool_call()
+
     def handle_result(tool_result: ToolResult, live_manager) -> str:
         """Prints the final renderable and formats the data for the LLM."""
         # For streaming tools, the tool itself updates the live display.
@@ -79,6 +84,7 @@ def rich_tool(
         @functools.wraps(fn)
         async def async_wrapper(*args, **kwargs) -> str:
             live_manager = _get_live_manager(args)
+            _begin_tool_call(args)
             ui.display_tool_call(tool_name, _infer_param_repr(args, kwargs))
             try:
                 tool_result = await fn(*args, **kwargs)
@@ -92,6 +98,7 @@ def rich_tool(
         @functools.wraps(fn)
         def sync_wrapper(*args, **kwargs) -> str:
             live_manager = _get_live_manager(args)
+            _begin_tool_call(args)
             ui.display_tool_call(tool_name, _infer_param_repr(args, kwargs))
             try:
                 tool_result = fn(*args, **kwargs)
@@ -22,6 +22,7 @@ from pydantic_ai.models import KnownModelName
 from pydantic_ai.usage import UsageLimits
 from rich.spinner import Spinner
 
+from rune.adapters.persistence.journal import UndoError
 from rune.adapters.persistence.sessions import (
     Session,
     choose_session,
@@ -151,7 +152,12 @@ async def chat_async(
         session = load_session(ses_path)
         console.print(f"📂  Resuming session: [italic]{ses_path.stem}[/]")
     else:
-        ses_path = base_dir / ".rune" / "sessions" / f"session_{datetime.now():%Y%m%d_%H%M%S}.json"
+        ses_path = (
+            base_dir
+            / ".rune"
+            / "sessions"
+            / f"session_{datetime.now():%Y%m%d_%H%M%S}.json"
+        )
         session = Session()
         console.print("🆕  Starting new session")
         (base_dir / ".rune" / "sessions").mkdir(parents=True, exist_ok=True)
@@ -188,7 +194,7 @@ async def chat_async(
     )
 
     console.print(
-        "\n🤖  Commands: /save [name], /model [name] (tab-complete), /exit, Ctrl-C to interrupt"
+        "\n🤖  Commands: /save [name], /undo [turn], /model [name] (tab-complete), /exit, Ctrl-C to interrupt"
     )
     console.print(
         "💡  To submit, press [bold]Esc+Enter[/], [bold]Option+Enter[/] (Mac), or [bold]Alt+Enter[/] (Windows).\n"
@@ -228,6 +234,31 @@ async def chat_async(
                 console.print(f"💾  Snapshot saved ➜ {fname}")
                 continue
 
+            parts = user_input.split()
+            if parts and parts[0] == "/undo":
+                if len(parts) > 2 or (len(parts) == 2 and not parts[1].isdigit()):
+                    console.print(
+                        "Usage: /undo [turn]. Without a turn, undoes the last turn that changed files."
+                    )
+                    continue
+                error = None
+                try:
+                    undone = session_ctx.journal.undo(
+                        int(parts[1]) if len(parts) == 2 else None
+                    )
+                except UndoError as e:
+                    undone, error = e.undone, e
+                except (OSError, ValueError) as e:
+                    undone, error = [], e
+                for turn in undone:
+                    files = ", ".join(entry.path for entry in turn.entries)
+                    console.print(
+                        f"↩️  Undid turn {turn.number} ({turn.prompt}): {files}"
+                    )
+                if error is not None:
+                    console.print(f"❌ [bold red]Error:[/bold red] {error}")
+                continue
+
             if user_input.startswith("/model"):
                 parts = user_input.split()
                 if len(parts) == 2:
@@ -250,6 +281,7 @@ async def chat_async(
                     )
                 continue
 
+            session_ctx.journal.begin_turn(user_input)
             agent_task = asyncio.create_task(
                 run_agent_turn(agent, user_input, session.messages, session_ctx)
             )
@@ -259,9 +291,16 @@ async def chat_async(
             except asyncio.CancelledError:
                 # Task was cancelled, history is already updated by run_agent_turn
                 pass
+            finally:
+                if turn := session_ctx.journal.end_turn():
+                    console.print(
+                        f"[dim]↩️  Turn {turn.number} changed {len(turn.entries)} file(s); /undo reverts it.[/]"
+                    )
 
             save_session(ses_path, session)
 
+    session_ctx.shell.close()
+    session_ctx.jobs.close()
     console.print("\n[bold italic]bye.[/]")
 
 
@@ -5,8 +5,12 @@ from pathlib import Path
 
 from pydantic import BaseModel, Field, PrivateAttr
 
+from rune.adapters.persistence.journal import UndoJournal
 from rune.adapters.ui.live_display import LiveDisplayManager
-from rune.core.models import Todo
+from rune.core.models import FileReadRecord, Todo
+from rune.utils.jobs import JobTable
+from rune.utils.shell import ShellSession
+from rune.utils.symbols import SymbolIndex
 
 
 class SessionContext(BaseModel):
@@ -18,6 +22,17 @@ class SessionContext(BaseModel):
     # The `live_display` is a transient object that should not be persisted.
     _live_display: LiveDisplayManager | None = PrivateAttr(default=None)
 
+    # Read bookkeeping is deliberately not persisted: after a resume, the first
+    # read of any file is always sent in full.
+    _tool_calls: int = PrivateAttr(default=0)
+    _file_reads: dict[Path, FileReadRecord] = PrivateAttr(default_factory=dict)
+    _symbol_index: SymbolIndex | None = PrivateAttr(default=None)
+    _tail_cursors: dict[Path, int] = PrivateAttr(default_factory=dict)
+    _journal: UndoJournal | None = PrivateAttr(default=None)
+    _shell: ShellSession | None = PrivateAttr(default=None)
+    # Background jobs are not persisted: their processes belong to this run.
+    _jobs: JobTable = PrivateAttr(default_factory=JobTable)
+
     @property
     def live_display(self) -> LiveDisplayManager | None:
         return self._live_display
@@ -25,3 +40,55 @@ class SessionContext(BaseModel):
     @live_display.setter
     def live_display(self, value: LiveDisplayManager | None) -> None:
         self._live_display = value
+
+    @property
+    def tool_calls(self) -> int:
+        """Number of tool calls started so far in this session."""
+        return self._tool_calls
+
+    def begin_tool_call(self) -> int:
+        """Registers a new tool call and returns its 1-based sequence number."""
+        self._tool_calls += 1
+        return self._tool_calls
+
+    @property
+    def file_reads(self) -> dict[Path, FileReadRecord]:
+        return self._file_reads
+
+    @property
+    def tail_cursors(self) -> dict[Path, int]:
+        """Byte offset up to which each file has been returned by `tail`."""
+        return self._tail_cursors
+
+    @property
+    def symbol_index(self) -> SymbolIndex:
+        """The workspace symbol table, rebuilt if the working directory changes."""
+        if (
+            self._symbol_index is None
+            or self._symbol_index.root != self.current_working_dir
+        ):
+            self._symbol_index = SymbolIndex(self.current_working_dir)
+        return self._symbol_index
+
+    @property
+    def journal(self) -> UndoJournal:
+        """The undo journal of the working directory; tools `record` files in it."""
+        if self._journal is None or self._journal.root != self.current_working_dir:
+            self._journal = UndoJournal(self.current_working_dir)
+        return self._journal
+
+    @property
+    def shell(self) -> ShellSession:
+        """The persistent bash session of `run_command(persistent=True)`, started on first use.
+
+        It follows `current_working_dir` when that changes.
+        """
+        if self._shell is None:
+            self._shell = ShellSession(self.current_working_dir)
+        self._shell.cwd = self.current_working_dir
+        return self._shell
+
+    @property
+    def jobs(self) -> JobTable:
+        """Background commands started in this session."""
+        return self._jobs
@@ -12,3 +12,12 @@ class Todo(BaseModel):
     status: Literal["pending", "in_progress", "completed", "cancelled"]
     priority: Literal["low", "medium", "high"]
     note: str | None = None
+
+
+class FileReadRecord(BaseModel):
+    """Remembers what `read_file` last returned for a path in this session."""
+
+    mtime_ns: int
+    size: int
+    sha256: str
+    tool_call: int
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from pydantic_ai import RunContext
+from rich.console import Group
+from rich.syntax import Syntax
+from rich.text import Text
+
+from rune.core.context import SessionContext
+from rune.core.tool_result import ToolResult
+from rune.tools.registry import register_tool
+from rune.utils.files import FileTransaction
+from rune.utils.linediff import unified_diff
+from rune.utils.patch import DEFAULT_FUZZ, apply_hunks, parse_patch
+
+
+def _create_renderable(files: list[dict], diff: str | None) -> Group:
+    hunks = sum(f["hunks"] for f in files)
+    header_text = (
+        f"┌─ Δ Patch applied: {len(files)} file{'s' if len(files) != 1 else ''} "
+        f"({hunks} hunk{'s' if hunks != 1 else ''})"
+    )
+    renderables: list = [Text(header_text, style="bold blue")]
+    for f in files:
+        line = f"│  {f['status']}: {f['path']}"
+        if f.get("adjusted"):
+            line += f"  ({'; '.join(f['adjusted'])})"
+        renderables.append(Text(line, style="blue"))
+    if diff:
+        renderables.append(Syntax(diff, "diff", theme="monokai"))
+    renderables.append(Text("└" + "─" * (len(header_text) - 1), style="blue"))
+    return Group(*renderables)
+
+
+def _resolve(base_dir: Path, path: str) -> Path:
+    target = (base_dir / path).resolve()
+    try:
+        target.relative_to(base_dir)
+    except ValueError as e:
+        raise PermissionError(f"Path is outside the project directory: {path}") from e
+    return target
+
+
+@register_tool(needs_ctx=True)
+def apply_patch(
+    ctx: RunContext[SessionContext], patch: str, *, fuzz: int = DEFAULT_FUZZ
+) -> ToolResult:
+    """Applies a unified diff (`diff -u` / `git diff` format) to one or more files.
+
+    Prefer this over `edit_file` for large or scattered edits: a unified diff
+    only repeats a few context lines around each change. Files are created
+    with `--- /dev/null` and deleted with `+++ /dev/null`. Line numbers and
+    counts in `@@` headers are treated as hints: a hunk is placed where its
+    context matches nearest to the stated line, and if needed up to `fuzz`
+    context lines at either end are ignored, like `patch`. Every hunk of
+    every file must apply, otherwise nothing is written.
+
+    Example:
+    ```
+    --- a/src/app.py
+    +++ b/src/app.py
+    @@ -10,3 +10,3 @@ def main():
+         config = load()
+    -    run(config)
+    +    run(config, verbose=True)
+         return 0
+    ```
+
+    Args:
+        patch: The unified diff to apply.
+        fuzz: How many context lines may be ignored at each end of a hunk.
+    """
+    base_dir = ctx.deps.current_working_dir
+    file_patches = parse_patch(patch)
+
+    originals: dict[Path, str | None] = {}  # None: the file did not exist
+    contents: dict[Path, str | None] = {}  # None: the file is to be deleted
+    display: dict[Path, str] = {}
+    files: list[dict] = []
+
+    def current(target: Path) -> str | None:
+        if target not in contents:
+            exists = target.is_file()
+            originals[target] = target.read_text(encoding="utf-8") if exists else None
+            contents[target] = originals[target]
+        return contents[target]
+
+    for file_patch in file_patches:
+        source = (
+            _resolve(base_dir, file_patch.old_path) if file_patch.old_path else None
+        )
+        dest = _resolve(base_dir, file_patch.new_path) if file_patch.new_path else None
+        if source is not None:
+            text = current(source)
+            if text is None:
+                raise FileNotFoundError(
+                    f"File not found: {file_patch.old_path}. Nothing was changed."
+                )
+        else:
+            assert dest is not None
+            if current(dest) is not None or dest.is_dir():
+                raise FileExistsError(
+                    f"{file_patch.new_path} already exists. Nothing was changed."
+                )
+            text = ""
+
+        try:
+            new_text, hunk_results = apply_hunks(
+                text, file_patch.hunks, fuzz=fuzz, path=file_patch.path
+            )
+        except ValueError as e:
+            raise ValueError(f"{e} Nothing was changed.") from e
+
+        if dest is None:
+            assert source is not None
+            contents[source] = None
+            status = "deleted"
+        else:
+            if source is not None and source != dest:
+                # Allowed only if an earlier delete or rename in this patch
+                # moved the existing file out of the way.
+                if current(dest) is not None or dest.is_dir():
+                    raise FileExistsError(
+                        f"Cannot rename {file_patch.old_path} to "
+                        f"{file_patch.new_path}: it already exists. "
+                        "Nothing was changed."
+                    )
+                contents[source] = None
+                status = "renamed"
+            else:
+                status = "created" if source is None else "modified"
+            current(dest)
+            contents[dest] = new_text
+        for target, path in (
+            (source, file_patch.old_path),
+            (dest, file_patch.new_path),
+        ):
+            if target is not None and path is not None:
+                display.setdefault(target, path)
+
+        files.append(
+            {
+                "path": file_patch.path,
+                "status": status,
+                "hunks": len(hunk_results),
+                "adjusted": [
+                    f"hunk {n} at line {r.line}"
+                    + (f", offset {r.offset:+d}" if r.offset else "")
+                    + (f", fuzz {r.fuzz}" if r.fuzz else "")
+                    for n, r in enumerate(hunk_results, 1)
+                    if r.offset or r.fuzz
+                ],
+            }
+        )
+
+    changed = [target for target in contents if contents[target] != originals[target]]
+    for target in changed:
+        ctx.deps.journal.record(target, linkable=True)
+    with FileTransaction() as txn:
+        for target in changed:
+            new_content, previous = contents[target], originals[target]
+            if new_content is None:
+                assert previous is not None
+                txn.stage_delete(target, previous=previous)
+            else:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                txn.stage(target, new_content, previous=previous)
+        txn.commit()
+    for target in changed:
+        ctx.deps.file_reads.pop(target, None)
+
+    diffs = [
+        unified_diff(
+            originals[target] or "",
+            contents[target] or "",
+            display[target],
+            fromfile=None if originals[target] is not None else "/dev/null",
+            tofile=None if contents[target] is not None else "/dev/null",
+        )
+        for target in changed
+    ]
+    compact = "".join(d.compact() or "" for d in diffs) or None
+    full = "".join(d.as_text() or "" for d in diffs) or None
+
+    return ToolResult(
+        data={"status": "applied", "files": files, "diff": compact},
+        renderable=_create_renderable(files, full),
+    )
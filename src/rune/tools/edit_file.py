@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-import difflib
+import dataclasses
 from pathlib import Path
 
 from pydantic_ai import RunContext
@@ -11,7 +11,20 @@ from rich.text import Text
 from rune.core.context import SessionContext
 from rune.core.tool_result import ToolResult
 from rune.tools.registry import register_tool
-from rune.utils.diff import ApplyDiffResult, DiffApplyer
+from rune.utils.diff import ApplyDiffResult, DiffApplyer, LineIndex, cached_line_index
+from rune.utils.files import FileTransaction, atomic_write_text, line_range_hash
+from rune.utils.largefile import stream_replace
+from rune.utils.linediff import unified_diff
+
+LARGE_FILE_THRESHOLD = 64 * 1024 * 1024  # Larger files are edited by streaming
+
+
+@dataclasses.dataclass
+class EditFilesEdits:
+    """The diff blocks to apply to one file."""
+
+    path: str
+    diff: str
 
 
 def _create_renderable(
@@ -53,8 +66,121 @@ def _create_renderable(
     return Group(*renderables)
 
 
+def _resolve_file(ctx: RunContext[SessionContext], path: str) -> Path:
+    base_dir = ctx.deps.current_working_dir
+    target = (base_dir / path).resolve()
+
+    try:
+        target.relative_to(base_dir)
+    except ValueError as e:
+        raise PermissionError("Path is outside the project directory.") from e
+
+    if not target.is_file():
+        raise FileNotFoundError("File not found or is a directory.")
+    return target
+
+
+def _apply_diff(original_content: str, diff: str) -> ApplyDiffResult:
+    """Applies *diff* in memory, raising ValueError with a "Did you mean?" hint on failure."""
+    applyer = DiffApplyer()
+    apply_result: ApplyDiffResult = applyer.apply_diff(original_content, diff)
+
+    if not apply_result.success:
+        fail = apply_result.failed_blocks[0]
+        error_message = fail.error_reason
+        if fail.best_match_snippet:
+            error_message += (
+                f"\n\nDid you mean to match this section (score "
+                f"{fail.best_match_score:.1%})?\n"
+                f"---\n{fail.context_snippet}\n---"
+            )
+        raise ValueError(error_message)
+    return apply_result
+
+
+def _splice_line_range(
+    index: LineIndex,
+    start_line: int,
+    end_line: int,
+    replacement: str,
+    expected_hash: str,
+) -> str:
+    """Replaces lines *start_line*..*end_line* (1-based, inclusive) of the indexed text.
+
+    `end_line == start_line - 1` inserts before *start_line* without replacing
+    anything. Raises ValueError if the range is invalid or its current hash
+    does not start with *expected_hash*.
+    """
+    total = len(index)
+    if not (1 <= start_line <= total + 1 and start_line - 1 <= end_line <= total):
+        raise ValueError(
+            f"Invalid line range {start_line}-{end_line} for a file with {total} lines."
+        )
+    current = line_range_hash(index.lines[start_line - 1 : end_line])
+    expected = expected_hash.strip().lower()
+    if len(expected) < 8 or not current.startswith(expected):
+        raise ValueError(
+            f"Lines {start_line}-{end_line} do not match expected_hash {expected_hash!r} "
+            f"(current hash {current}). The file changed since it was read; read the "
+            "range again before editing."
+        )
+
+    text = index.text
+    span_start = index.line_to_char(start_line - 1)
+    span_end = index.line_to_char(end_line)
+    line_ending = "\r\n" if "\r\n" in text else "\n"
+    new_lines = replacement.splitlines()
+    new_text = "".join(line + line_ending for line in new_lines)
+    if new_lines and span_end == len(text) and text and not text.endswith(("\n", "\r")):
+        if span_start == span_end:
+            new_text = (
+                line_ending + new_text
+            )  # Appending after an unterminated last line
+        else:
+            new_text = new_text[: -len(line_ending)]  # Keep the missing final newline
+    return text[:span_start] + new_text + text[span_end:]
+
+
+def _edit_large_file(
+    ctx: RunContext[SessionContext], path: str, target: Path, diff: str
+) -> ToolResult:
+    """Applies *diff* to a file too large to hold in memory, with exact matching only."""
+    blocks = DiffApplyer().parse_blocks(diff)
+    placed = stream_replace(
+        target,
+        blocks,
+        before_replace=lambda: ctx.deps.journal.record(target, linkable=True),
+    )
+    ctx.deps.file_reads.pop(target, None)
+
+    # A full diff would need both versions in memory, so show each block instead.
+    hunks = "".join(block.hunk() for block in placed)
+    file_diff = f"--- a/{path}\n+++ b/{path}\n{hunks}"
+    return ToolResult(
+        data={
+            "path": path,
+            "status": "modified",
+            "blocks_applied": len(placed),
+            "streamed": True,
+            "diff": file_diff,
+        },
+        renderable=_create_renderable(
+            "modified", path, blocks_applied=len(placed), diff=file_diff
+        ),
+    )
+
+
 @register_tool(needs_ctx=True)
-def edit_file(ctx: RunContext[SessionContext], path: str, diff: str) -> ToolResult:
+def edit_file(
+    ctx: RunContext[SessionContext],
+    path: str,
+    diff: str | None = None,
+    *,
+    start_line: int | None = None,
+    end_line: int | None = None,
+    replacement: str | None = None,
+    expected_hash: str | None = None,
+) -> ToolResult:
     """
     Performs precise, robust edits to a file using one or more diff blocks. Returns the diff between the original and edited file.
 
@@ -77,66 +203,178 @@ def edit_file(ctx: RunContext[SessionContext], path: str, diff: str) -> ToolResu
 
     Always make sure you've read the file before attempting any edits.
 
+    LINE-RANGE MODE:
+    When you know the exact lines (from read_file with start_line/end_line),
+    pass `start_line`, `end_line`, `replacement` and `expected_hash` instead of
+    `diff`. Lines start_line..end_line are replaced by `replacement` without
+    any matching. `expected_hash` is the `range_hash` read_file returned for
+    exactly that range; the edit is rejected if those lines have changed since.
+    Use end_line = start_line - 1 (and the hash of the empty range,
+    "e3b0c44298fc1c14") to insert before start_line.
+
+    LARGE FILES:
+    Files over 64 MB are edited by streaming, without loading them. SEARCH
+    blocks must then match the file exactly and uniquely (no whitespace,
+    fuzzy or `...` matching), and the returned diff shows only the blocks.
+
     Args:
         path: The path to the file that will be edited.
         diff: A string containing one or more diff blocks that specify the edits.
+        start_line: Line-range mode: first line to replace (1-based).
+        end_line: Line-range mode: last line to replace (1-based, inclusive).
+        replacement: Line-range mode: the new text for those lines.
+        expected_hash: Line-range mode: `range_hash` of the lines being replaced.
     ```
     """
-    base_dir = ctx.deps.current_working_dir
-    target = (base_dir / path).resolve()
-
-    try:
-        target.relative_to(base_dir)
-    except ValueError as e:
-        raise PermissionError("Path is outside the project directory.") from e
-
-    if not target.is_file():
-        raise FileNotFoundError("File not found or is a directory.")
-
-    original_content = target.read_text(encoding="utf-8")
-
-    applyer = DiffApplyer()
-    apply_result: ApplyDiffResult = applyer.apply_diff(original_content, diff)
-
-    if not apply_result.success:
-        fail = apply_result.failed_blocks[0]
-        error_message = fail.error_reason
-        if fail.best_match_snippet:
-            error_message += (
-                f"\n\nDid you mean to match this section (score "
-                f"{fail.best_match_score:.1%})?\n"
-                f"---\n{fail.context_snippet}\n---"
+    target = _resolve_file(ctx, path)
+    range_args = (start_line, end_line, replacement, expected_hash)
+    if diff is not None:
+        if any(arg is not None for arg in range_args):
+            raise ValueError("Pass either diff or a line range, not both.")
+        if target.stat().st_size > LARGE_FILE_THRESHOLD:
+            return _edit_large_file(ctx, path, target, diff)
+        original_content = target.read_text(encoding="utf-8")
+        apply_result = _apply_diff(original_content, diff)
+        final_content = apply_result.final_content or original_content
+        blocks_applied = len(apply_result.applied_blocks)
+        details: dict = {"blocks_applied": blocks_applied}
+    else:
+        if any(arg is None for arg in range_args):
+            raise ValueError(
+                "Pass diff, or all of start_line, end_line, replacement and expected_hash."
             )
-        raise ValueError(error_message)
+        index = cached_line_index(target)
+        original_content = index.text
+        final_content = _splice_line_range(
+            index, start_line, end_line, replacement, expected_hash
+        )
+        blocks_applied = 1
+        new_end = start_line + len(replacement.splitlines()) - 1
+        details = {
+            "lines_replaced": [start_line, end_line],
+            "new_lines": [start_line, new_end],
+            # Lets a follow-up range edit of the same lines skip another read.
+            "range_hash": line_range_hash(
+                final_content.splitlines()[start_line - 1 : new_end]
+            ),
+        }
 
-    final_content = apply_result.final_content or original_content
     if final_content == original_content:
         return ToolResult(
             data={"path": path, "status": "unchanged"},
             renderable=_create_renderable("unchanged", path),
         )
 
-    target.write_text(final_content, encoding="utf-8")
+    ctx.deps.journal.record(target, linkable=True)
+    atomic_write_text(target, final_content)
+    # mtime can be too coarse to notice a same-size rewrite, so forget the read.
+    ctx.deps.file_reads.pop(target, None)
 
-    diff_text = difflib.unified_diff(
-        original_content.splitlines(keepends=True),
-        final_content.splitlines(keepends=True),
-        fromfile=f"a/{path}",
-        tofile=f"b/{path}",
-    )
-    diff_str = "".join(diff_text) or None
+    # The model gets a compact diff; the full one is only rendered for the user.
+    file_diff = unified_diff(original_content, final_content, path)
 
     return ToolResult(
         data={
             "path": path,
             "status": "modified",
-            "blocks_applied": len(apply_result.applied_blocks),
-            "diff": diff_str,
+            **details,
+            "diff": file_diff.compact(),
         },
         renderable=_create_renderable(
             "modified",
             path,
-            blocks_applied=len(apply_result.applied_blocks),
-            diff=diff_str,
+            blocks_applied=blocks_applied,
+            diff=file_diff.as_text(),
+        ),
+    )
+
+
+@register_tool(needs_ctx=True)
+def edit_files(
+    ctx: RunContext[SessionContext], edits: list[EditFilesEdits]
+) -> ToolResult:
+    """
+    Edits several files in one all-or-nothing transaction. Returns one combined diff.
+
+    Use this instead of repeated `edit_file` calls for changes that span files
+    (renames, signature changes, refactors). Every edit uses the same diff
+    block format and matching rules as `edit_file`. All edits are applied in
+    memory first; if any block in any file fails, no file is changed and the
+    error names the failing edit. Several edits may target the same file;
+    they are applied in order.
+
+    Args:
+        edits: The edits to apply, each with the `path` of a file and the
+            `diff` blocks for it.
+    """
+    if not edits:
+        raise ValueError("Provide at least one edit.")
+
+    originals: dict[Path, str] = {}
+    contents: dict[Path, str] = {}
+    display_paths: dict[Path, str] = {}
+    blocks_applied: dict[Path, int] = {}
+    for number, edit in enumerate(edits, 1):
+        try:
+            target = _resolve_file(ctx, edit.path)
+            if target not in contents:
+                originals[target] = contents[target] = target.read_text(
+                    encoding="utf-8"
+                )
+                display_paths[target] = edit.path
+                blocks_applied[target] = 0
+            apply_result = _apply_diff(contents[target], edit.diff)
+        except (OSError, ValueError) as e:
+            # Subclasses such as UnicodeDecodeError cannot be rebuilt from a
+            # message, so re-raise as the nearest type the tools use.
+            error_type = next(
+                t
+                for t in (PermissionError, FileNotFoundError, OSError, ValueError)
+                if isinstance(e, t)
+            )
+            raise error_type(
+                f"Edit {number} ({edit.path}) failed, no files were changed: {e}"
+            ) from e
+        contents[target] = apply_result.final_content or contents[target]
+        blocks_applied[target] += len(apply_result.applied_blocks)
+
+    changed = [target for target in contents if contents[target] != originals[target]]
+    if not changed:
+        label = ", ".join(display_paths.values())
+        return ToolResult(
+            data={"status": "unchanged", "files": list(display_paths.values())},
+            renderable=_create_renderable("unchanged", label),
+        )
+
+    for target in changed:
+        ctx.deps.journal.record(target, linkable=True)
+    with FileTransaction() as txn:
+        for target in changed:
+            txn.stage(target, contents[target], previous=originals[target])
+        txn.commit()
+    for target in changed:
+        ctx.deps.file_reads.pop(target, None)
+
+    files = [
+        {"path": display_paths[target], "blocks_applied": blocks_applied[target]}
+        for target in changed
+    ]
+    diffs = [
+        unified_diff(originals[target], contents[target], display_paths[target])
+        for target in changed
+    ]
+    total_blocks = sum(blocks_applied[target] for target in changed)
+    label = ", ".join(display_paths[target] for target in changed)
+    return ToolResult(
+        data={
+            "status": "modified",
+            "files": files,
+            "diff": "".join(d.compact() or "" for d in diffs),
+        },
+        renderable=_create_renderable(
+            "modified",
+            label,
+            blocks_applied=total_blocks,
+            diff="".join(d.as_text() or "" for d in diffs),
         ),
     )
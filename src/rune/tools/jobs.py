@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from pydantic_ai import RunContext
+from rich.console import Group
+from rich.text import Text
+
+from rune.core.context import SessionContext
+from rune.core.tool_result import ToolResult
+from rune.tools.read_chunk import tail
+from rune.tools.registry import register_tool
+from rune.utils.jobs import Job
+
+_STATE_STYLES = {"running": "blue bold", "exited": "green", "killed": "yellow"}
+
+
+def _job_status(ctx: RunContext[SessionContext], job: Job) -> dict:
+    info = ctx.deps.jobs.status(job)
+    log_path = Path(info["log_file"])
+    try:
+        info["log_file"] = str(log_path.relative_to(ctx.deps.current_working_dir))
+    except ValueError:
+        pass  # The working directory changed since the job started
+    return info
+
+
+def _describe(info: dict) -> str:
+    parts = [info["state"]]
+    if info["exit_code"] is not None:
+        parts.append(f"exit {info['exit_code']}")
+    parts.append(f"{info['runtime_s']}s")
+    if "cpu_time_s" in info:
+        parts.append(f"cpu {info['cpu_time_s']}s")
+    if "rss_mb" in info:
+        parts.append(f"rss {info['rss_mb']} MB")
+    elif "peak_rss_mb" in info:
+        parts.append(f"peak rss {info['peak_rss_mb']} MB")
+    return ", ".join(parts)
+
+
+def _job_line(info: dict) -> Text:
+    line = Text("│  ")
+    line.append(f"[{info['id']}] ", style="bold")
+    line.append(_describe(info), style=_STATE_STYLES.get(info["state"], "default"))
+    line.append(f"  {info['command']}", style="dim")
+    return line
+
+
+def _render_jobs(title: str, infos: list[dict]) -> Group | Text:
+    if not infos:
+        return Text("○ No background jobs.", style="italic dim")
+    header_text = f"┌─ {title} "
+    return Group(
+        Text(header_text + "─" * (70 - len(header_text)), style="bold cyan"),
+        *(_job_line(info) for info in infos),
+        Text("└" + "─" * 69, style="cyan"),
+    )
+
+
+@register_tool(needs_ctx=True)
+def jobs_list(ctx: RunContext[SessionContext]) -> ToolResult:
+    """Lists the background commands started with `run_command(background=True)`.
+
+    Each job has an id (used by `job_status`, `job_tail` and `job_kill`), its
+    command, state ("running", "exited" or "killed"), exit code and log file.
+    """
+    infos = [_job_status(ctx, job) for job in ctx.deps.jobs]
+    return ToolResult(
+        data={"jobs": infos},
+        renderable=_render_jobs(f"Background jobs ({len(infos)})", infos),
+    )
+
+
+@register_tool(needs_ctx=True)
+def job_status(ctx: RunContext[SessionContext], job_id: int) -> ToolResult:
+    """Reports whether a background job is still running and what it uses.
+
+    Running jobs report the CPU time and resident memory of their whole
+    process group (`cpu_time_s`, `rss_mb`); finished jobs report their exit
+    code, total CPU time and peak memory (`peak_rss_mb`).
+
+    Args:
+        job_id: The job id returned by `run_command(background=True)`.
+    """
+    info = _job_status(ctx, ctx.deps.jobs.get(job_id))
+    return ToolResult(data=info, renderable=_render_jobs(f"Job {job_id}", [info]))
+
+
+@register_tool(needs_ctx=True)
+def job_tail(
+    ctx: RunContext[SessionContext],
+    job_id: int,
+    *,
+    pattern: str | None = None,
+    max_bytes: int = 65_536,
+) -> ToolResult:
+    """Returns the output a background job has written since the last call.
+
+    Works like `tail` on the job's log (stdout and stderr together): the first
+    call returns the end of the log, later calls only the new complete lines.
+    A log that reaches its size limit is moved to `<log>.1` and restarted.
+    The result also includes the job's status, so a finished job shows up
+    with its exit code.
+
+    Args:
+        job_id: The job id returned by `run_command(background=True)`.
+        pattern: Optional regular expression; only new lines matching it are
+            returned.
+        max_bytes: The maximum number of bytes to consume per call. Defaults
+            to 65536.
+    """
+    job = ctx.deps.jobs.get(job_id)
+    info = _job_status(ctx, job)
+    if job.rotations != job.tailed_rotations:
+        # The log was moved aside and restarted; read the new one from its start.
+        ctx.deps.tail_cursors.pop(job.log_path.resolve(), None)
+        job.tailed_rotations = job.rotations
+    result = tail(ctx, info["log_file"], pattern=pattern, max_bytes=max_bytes)
+    return ToolResult(
+        data={**result.data, "job": info},
+        renderable=Group(_render_jobs(f"Job {job_id}", [info]), result.renderable),
+    )
+
+
+@register_tool(needs_ctx=True)
+def job_kill(
+    ctx: RunContext[SessionContext], job_id: int, *, force: bool = False
+) -> ToolResult:
+    """Stops a background job and every process it started.
+
+    The job's whole process group gets SIGTERM, then SIGKILL if it is still
+    running a few seconds later. Killing a job that has already finished does
+    nothing.
+
+    Args:
+        job_id: The job id returned by `run_command(background=True)`.
+        force: If True, sends SIGKILL right away. Defaults to False.
+    """
+    jobs = ctx.deps.jobs
+    job = jobs.get(job_id)
+    jobs.kill(job, force=force)
+    info = _job_status(ctx, job)
+    return ToolResult(data=info, renderable=_render_jobs(f"Job {job_id}", [info]))
@@ -1,10 +1,8 @@
 from __future__ import annotations
 
-import subprocess
 from pathlib import Path
 from typing import Any
 
-import pathspec
 from pydantic_ai import RunContext
 from rich.console import Group
 from rich.text import Text
@@ -12,6 +10,7 @@ from rich.text import Text
 from rune.core.context import SessionContext
 from rune.core.tool_result import ToolResult
 from rune.tools.registry import register_tool
+from rune.utils.files import load_ignore_spec
 
 
 def _rich_lines(node: dict, prefix: str = "", is_last: bool = True) -> list[Text]:
@@ -48,45 +47,6 @@ def _create_renderable(
     return Group(header, *tree_lines, footer)
 
 
-def _load_ignore_spec(start_dir: Path) -> pathspec.PathSpec:
-    patterns: list[str] = [
-        ".git/",
-        ".venv/",
-        "__pycache__/",
-        ".pytest_cache/",
-        ".ruff_cache/",
-    ]
-
-    current = start_dir.resolve()
-    try:
-        git_root_str = subprocess.check_output(
-            ["git", "rev-parse", "--show-toplevel"],
-            cwd=current,
-            text=True,
-            stderr=subprocess.DEVNULL,
-        ).strip()
-        git_root = Path(git_root_str).resolve()
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        git_root = None
-
-    # Walk up from the start_dir to the git_root (or filesystem root)
-    while True:
-        for fname in (".gitignore", ".runeignore"):
-            f = current / fname
-            if f.is_file():
-                try:
-                    patterns.extend(f.read_text().splitlines())
-                except OSError:
-                    pass  # Ignore files we can't read
-
-        # Stop if we have reached the git root, or the filesystem root
-        if (git_root and current == git_root) or current.parent == current:
-            break
-        current = current.parent
-
-    return pathspec.PathSpec.from_lines("gitwildmatch", patterns)
-
-
 @register_tool(needs_ctx=True)
 def list_files(
     ctx: RunContext[SessionContext],
@@ -112,7 +72,7 @@ def list_files(
     if not target_dir.is_dir():
         raise NotADirectoryError(f"Path '{path}' is not a directory.")
 
-    ignore_spec = _load_ignore_spec(target_dir)
+    ignore_spec = load_ignore_spec(target_dir)
     files_listed, ignored = 0, 0
 
     def walk(cur: Path, depth: int) -> dict[str, Any] | None:
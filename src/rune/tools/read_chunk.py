@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import re
 from pathlib import Path
 
 from pydantic_ai import RunContext
@@ -10,6 +11,7 @@ from rich.text import Text
 from rune.core.context import SessionContext
 from rune.core.tool_result import ToolResult
 from rune.tools.registry import register_tool
+from rune.utils.sniff import SniffResult, decode_chunk, sniff_file
 
 
 def _fmt_size(size: int) -> str:
@@ -53,20 +55,19 @@ def _create_renderable(
     return Group(header, syntax, footer)
 
 
-@register_tool(needs_ctx=True)
-def read_chunk(
-    ctx: RunContext[SessionContext], path: str, *, offset: int = 0, length: int = 65_536
-) -> ToolResult:
-    """Reads a chunk of bytes from a file, starting at a specific offset.
+def _binary_result(path: str, sniffed: SniffResult, file_size: int) -> ToolResult:
+    header_text = f"┌─ 📦 {path} "
+    return ToolResult(
+        data=sniffed.summary(path, file_size),
+        renderable=Group(
+            Text(header_text + "─" * (70 - len(header_text)), style="bold cyan"),
+            Text(f"│  {sniffed.kind}, {_fmt_size(file_size)}, magic: {sniffed.magic}"),
+            Text("└" + "─" * 69, style="cyan"),
+        ),
+    )
 
-    This tool is ideal for reading large files piece by piece. The content is
-    decoded as UTF-8, with errors replaced.
 
-    Args:
-        path: The path to the file to read from.
-        offset: The byte offset at which to start reading. Defaults to 0.
-        length: The maximum number of bytes to read. Defaults to 65536.
-    """
+def _resolve_file(ctx: RunContext[SessionContext], path: str) -> Path:
     base = ctx.deps.current_working_dir
     target = (base / path).resolve()
 
@@ -81,7 +82,43 @@ def read_chunk(
     if not target.is_file():
         raise IsADirectoryError("Path is a directory, not a file.")
 
+    return target
+
+
+@register_tool(needs_ctx=True)
+def read_chunk(
+    ctx: RunContext[SessionContext],
+    path: str,
+    *,
+    offset: int = 0,
+    length: int = 65_536,
+    from_end: int | None = None,
+) -> ToolResult:
+    """Reads a chunk of bytes from a file, starting at a specific offset.
+
+    This tool is ideal for reading large files piece by piece. The content is
+    decoded using the file's detected encoding, with errors replaced. Binary
+    files return a short summary (type, size, magic bytes) instead.
+
+    Args:
+        path: The path to the file to read from.
+        offset: The byte offset at which to start reading. Defaults to 0.
+        length: The maximum number of bytes to read. Defaults to 65536.
+        from_end: If given, read the last `from_end` bytes of the file instead
+            (ignoring `offset` and `length`), starting at the first complete
+            line. Useful for checking the end of a log.
+    """
+    target = _resolve_file(ctx, path)
+
     file_size = target.stat().st_size
+    sniffed = sniff_file(target)
+    if sniffed.is_binary:
+        return _binary_result(path, sniffed, file_size)
+
+    if from_end is not None:
+        offset = max(file_size - from_end, 0)
+        length = file_size - offset
+
     if offset >= file_size:
         return ToolResult(
             data={
@@ -99,7 +136,14 @@ def read_chunk(
         f.seek(offset)
         data = f.read(length)
 
-    text = data.decode("utf-8", errors="replace")
+    if from_end is not None and offset > 0:
+        # Drop the partial line we landed in the middle of.
+        newline = data.find(b"\n")
+        if newline != -1 and newline + 1 < len(data):
+            offset += newline + 1
+            data = data[newline + 1 :]
+
+    text = decode_chunk(data, sniffed, offset=offset)
     read_len = len(data)
     more = (offset + read_len) < file_size
 
@@ -114,3 +158,84 @@ def read_chunk(
         },
         renderable=_create_renderable(path, text, offset, read_len, file_size, more),
     )
+
+
+@register_tool(needs_ctx=True)
+def tail(
+    ctx: RunContext[SessionContext],
+    path: str,
+    *,
+    pattern: str | None = None,
+    max_bytes: int = 65_536,
+) -> ToolResult:
+    """Returns the complete lines appended to a file since the last `tail` call.
+
+    The session remembers a cursor per file, so polling a growing log (e.g.
+    `.rune/logs/<pid>.log` of a background command) only returns new output.
+    The first call returns the end of the file (up to `max_bytes`). A trailing
+    line without a newline is held back until it is complete. If the file was
+    truncated or replaced by a smaller one, reading restarts from its beginning.
+
+    Args:
+        path: The path to the file to follow.
+        pattern: Optional regular expression; only new lines matching it are
+            returned (the cursor still advances past the others).
+        max_bytes: The maximum number of bytes to consume per call. If more
+            were appended, `more` is True and the next call continues from
+            where this one stopped. Defaults to 65536.
+    """
+    target = _resolve_file(ctx, path)
+    regex = re.compile(pattern) if pattern else None
+
+    cursors = ctx.deps.tail_cursors
+    file_size = target.stat().st_size
+    sniffed = sniff_file(target)
+    if sniffed.is_binary:
+        return _binary_result(path, sniffed, file_size)
+
+    cursor = cursors.get(target)
+    if cursor is None:
+        start = max(file_size - max_bytes, 0)
+    elif cursor > file_size:
+        start = 0  # Truncated or rotated
+    else:
+        start = cursor
+
+    with target.open("rb") as f:
+        f.seek(start)
+        data = f.read(max_bytes)
+    more = start + len(data) < file_size
+
+    if cursor is None and start > 0:
+        newline = data.find(b"\n")
+        if newline != -1:
+            start += newline + 1
+            data = data[newline + 1 :]
+
+    last_newline = data.rfind(b"\n")
+    if last_newline != -1:
+        data = data[: last_newline + 1]
+    elif len(data) < max_bytes:
+        data = b""  # Only an incomplete line so far
+    # Otherwise a single line is longer than max_bytes; return it in pieces.
+
+    cursors[target] = start + len(data)
+
+    text = decode_chunk(data, sniffed, offset=start)
+    lines = text.splitlines(keepends=True)
+    if regex is not None:
+        lines = [line for line in lines if regex.search(line)]
+    content = "".join(lines)
+
+    return ToolResult(
+        data={
+            "path": path,
+            "content": content,
+            "offset": start,
+            "read_length": len(data),
+            "file_size": file_size,
+            "pending_bytes": file_size - cursors[target],
+            "more": more,
+        },
+        renderable=_create_renderable(path, content, start, len(data), file_size, more),
+    )
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Literal
 
 from pydantic_ai import RunContext
 from rich.console import Group
@@ -8,22 +9,97 @@ from rich.syntax import Syntax
 from rich.text import Text
 
 from rune.core.context import SessionContext
+from rune.core.models import FileReadRecord
 from rune.core.tool_result import ToolResult
 from rune.tools.registry import register_tool
+from rune.utils.files import content_hash, fingerprint, line_range_hash
+from rune.utils.outline import outline_file
+from rune.utils.sniff import SniffResult, sniff_file
 
 MAX_READ = 5 * 1024 * 1024  # 5 MB
 
 
+def _unchanged_result(path: str, record: FileReadRecord) -> ToolResult:
+    message = (
+        f"File unchanged since tool call {record.tool_call}; its content is "
+        "already in the conversation. Pass force=True to read it again."
+    )
+    return ToolResult(
+        data={
+            "path": path,
+            "status": "unchanged",
+            "unchanged_since_tool_call": record.tool_call,
+            "sha256": record.sha256,
+            "message": message,
+        },
+        renderable=Text(
+            f"• {path} unchanged since tool call {record.tool_call}", style="dim"
+        ),
+    )
+
+
+def _binary_result(path: str, sniffed: SniffResult, size: int) -> ToolResult:
+    return ToolResult(
+        data=sniffed.summary(path, size),
+        renderable=Group(
+            Text(f"┌─ 📦 {path} ({sniffed.kind}, {size:,} bytes)"),
+            Text(f"└─ [Binary file not shown; magic: {sniffed.magic}]", style="dim"),
+        ),
+    )
+
+
+def _outline_result(path: str, target: Path) -> ToolResult:
+    entries = outline_file(target)
+    outline = "\n".join(entry.format() for entry in entries)
+
+    header = Text(f"┌─ 📄 {path} (outline, {len(entries)} definitions)")
+    body = [Text(f"│  {entry.format()}", style="cyan") for entry in entries]
+    footer = Text("└─ [Use start_line/end_line to read a definition]")
+
+    return ToolResult(
+        data={"path": path, "mode": "outline", "outline": outline},
+        renderable=Group(header, *body, footer),
+    )
+
+
 @register_tool(needs_ctx=True)
-def read_file(ctx: RunContext[SessionContext], path: str) -> ToolResult:
-    """Reads the entire content of a file.
+def read_file(
+    ctx: RunContext[SessionContext],
+    path: str,
+    *,
+    mode: Literal["full", "outline"] = "full",
+    start_line: int | None = None,
+    end_line: int | None = None,
+    force: bool = False,
+) -> ToolResult:
+    """Reads the content of a file, a range of its lines, or its outline.
 
     This tool is suitable for reasonably sized text files (up to 5 MB). For
-    larger files, use the `read_chunk` tool instead. The content is decoded
-    as UTF-8, with errors replaced.
+    larger files, use the `read_chunk` tool instead. The encoding is detected
+    (UTF-8, UTF-16/32 with BOM, or a legacy single-byte encoding); binary
+    files return a short summary (type, size, magic bytes) instead of content.
+
+    For large source files, start with `mode="outline"`: it lists classes,
+    functions and methods with their signatures, line ranges and the first
+    line of their docstrings (`L<start>-<end> <signature>  # <doc>`). Then read
+    just the definitions you need with `start_line`/`end_line`.
+
+    A full read returns its `tool_call` number and the content's `sha256`. If
+    the whole file has not changed since it was last read in this session, a
+    short "unchanged" notice with that tool call number and hash is returned
+    instead of the content.
 
     Args:
         path: The path to the file to read.
+        mode: "full" (default) returns content; "outline" returns the file's
+            structure instead.
+        start_line: First line to return (1-based, inclusive). Defaults to the
+            start of the file.
+        end_line: Last line to return (1-based, inclusive). Defaults to the end
+            of the file. A range read also returns `range_hash`, which
+            edit_file's line-range mode takes as `expected_hash`.
+        force: If True, always return the full content, even when the file is
+            unchanged since the last read. Defaults to False.
     """
     base = ctx.deps.current_working_dir
     target = (base / path).resolve()
@@ -39,22 +115,80 @@ def read_file(ctx: RunContext[SessionContext], path: str) -> ToolResult:
     except ValueError as e:
         raise PermissionError("Path is outside the project directory.") from e
 
-    size = target.stat().st_size
+    session = ctx.deps
+    fp = fingerprint(target)
+    whole_file = start_line is None and end_line is None
+    previous = session.file_reads.get(target)
+    if (
+        mode == "full"
+        and whole_file
+        and not force
+        and previous is not None
+        and (previous.mtime_ns, previous.size) == (fp.mtime_ns, fp.size)
+    ):
+        return _unchanged_result(path, previous)
+
+    size = fp.size
+    sniffed = sniff_file(target)
+    if sniffed.is_binary:
+        return _binary_result(path, sniffed, size)
+
     if size > MAX_READ:
         raise ValueError(
             f"File size {size / 1024 / 1024:.2f} MB exceeds 5 MB. Use read_chunk."
         )
 
-    content = target.read_text(encoding="utf-8", errors="replace")
-    lexer = Path(path).suffix.lstrip(".") or "text"
+    if mode == "outline":
+        return _outline_result(path, target)
 
+    content = target.read_text(encoding=sniffed.encoding, errors="replace")
+    lexer = Path(path).suffix.lstrip(".") or "text"
     lines = content.splitlines()
     total_lines = len(lines)
+
+    if not whole_file:
+        first = max(start_line or 1, 1)
+        last = min(end_line or total_lines, total_lines)
+        if first > last:
+            raise ValueError(
+                f"Invalid line range {start_line}-{end_line} for a file with "
+                f"{total_lines} lines."
+            )
+        selected = "\n".join(lines[first - 1 : last])
+        header = Text(f"┌─ 📄 {path} (lines {first}-{last} of {total_lines})")
+        syntax = Syntax(
+            selected, lexer, theme="monokai", line_numbers=True, start_line=first
+        )
+        return ToolResult(
+            data={
+                "path": path,
+                "content": selected,
+                "start_line": first,
+                "end_line": last,
+                "total_lines": total_lines,
+                "range_hash": line_range_hash(lines[first - 1 : last]),
+            },
+            renderable=Group(header, syntax, Text("└─")),
+        )
+
+    digest = content_hash(content)
+    if not force and previous is not None and previous.sha256 == digest:
+        # Touched but not modified: refresh the stat info and keep the reference.
+        previous.mtime_ns, previous.size = fp.mtime_ns, fp.size
+        return _unchanged_result(path, previous)
+
+    session.file_reads[target] = FileReadRecord(
+        mtime_ns=fp.mtime_ns,
+        size=fp.size,
+        sha256=digest,
+        tool_call=session.tool_calls,
+    )
+
     snippet_lines_count = 15
     snippet_content = "\n".join(lines[:snippet_lines_count])
 
     # Human-readable size
-    size_bytes = target.stat().st_size
+    size_bytes = size
     if size_bytes < 1024:
         size_str = f"{size_bytes} B"
     elif size_bytes < 1024 * 1024:
@@ -78,6 +212,11 @@ def read_file(ctx: RunContext[SessionContext], path: str) -> ToolResult:
     footer = Text(f"└─ [{footer_text}]")
 
     return ToolResult(
-        data={"path": path, "content": content},
+        data={
+            "path": path,
+            "content": content,
+            "tool_call": session.tool_calls,
+            "sha256": digest,
+        },
         renderable=Group(header, syntax, footer),
     )
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from pydantic_ai import RunContext
+from rich.console import Group
+from rich.syntax import Syntax
+from rich.text import Text
+
+from rune.core.context import SessionContext
+from rune.core.tool_result import ToolResult
+from rune.tools.registry import register_tool
+
+MAX_MATCHES_PER_NAME = 5
+SNIPPET_LINES = 15
+
+
+def _create_renderable(symbols: list[dict], not_found: list[str]) -> Group:
+    header_text = (
+        f"┌─ ƒ Read {len(symbols)} definition{'s' if len(symbols) != 1 else ''} "
+    )
+    header = Text(header_text + "─" * (70 - len(header_text)), style="bold cyan")
+    body: list = [header]
+
+    for sym in symbols:
+        body.append(
+            Text(
+                f"│  · {sym['name']} ({sym['path']}:{sym['start_line']}-{sym['end_line']})",
+                style="bold bright_cyan",
+            )
+        )
+        lexer = Path(sym["path"]).suffix.lstrip(".") or "text"
+        snippet = "\n".join(sym["source"].splitlines()[:SNIPPET_LINES])
+        body.append(
+            Syntax(
+                snippet,
+                lexer,
+                theme="monokai",
+                line_numbers=True,
+                start_line=sym["start_line"],
+            )
+        )
+
+    if not_found:
+        body.append(Text(f"│  Not found: {', '.join(not_found)}", style="yellow"))
+
+    body.append(Text("└" + "─" * 69, style="cyan"))
+    return Group(*body)
+
+
+@register_tool(needs_ctx=True)
+def read_symbol(
+    ctx: RunContext[SessionContext], names: list[str], *, path: str | None = None
+) -> ToolResult:
+    """Returns the source of named definitions (classes, functions, methods).
+
+    Resolves each name against a workspace symbol table and returns only the
+    matching source spans, so there is no need to read whole files to see one
+    definition. Names may be qualified (`DiffApplyer.apply_diff`) or bare
+    (`apply_diff`, which matches every method or function of that name).
+    Request several names in a single call whenever possible.
+
+    Args:
+        names: The definition names to look up.
+        path: Optional file or directory to restrict the search to. Defaults
+            to the whole project.
+    """
+    base_dir = ctx.deps.current_working_dir
+    scope = (base_dir / path).resolve() if path else base_dir
+
+    try:
+        scope.relative_to(base_dir)
+    except ValueError as e:
+        raise PermissionError("Path is outside the project directory.") from e
+
+    if not names:
+        raise ValueError("Provide at least one name to look up.")
+
+    index = ctx.deps.symbol_index
+    index.refresh()
+
+    matches_by_name: dict[str, list] = {}
+    for name in names:
+        matches = [
+            (file, entry)
+            for file, entry in index.lookup(name)
+            if file == scope or scope in file.parents
+        ]
+        matches_by_name[name] = matches[:MAX_MATCHES_PER_NAME]
+
+    not_found = [name for name, matches in matches_by_name.items() if not matches]
+    if len(not_found) == len(names):
+        raise ValueError(f"No definitions found for: {', '.join(not_found)}")
+
+    # Read each file once, however many of its definitions were requested.
+    file_lines: dict[Path, list[str]] = {}
+    symbols: list[dict] = []
+    for name, matches in matches_by_name.items():
+        for file, entry in matches:
+            if file not in file_lines:
+                file_lines[file] = file.read_text(
+                    encoding="utf-8", errors="replace"
+                ).splitlines()
+            lines = file_lines[file]
+            symbols.append(
+                {
+                    "query": name,
+                    "name": entry.name,
+                    "kind": entry.kind,
+                    "path": str(file.relative_to(base_dir)),
+                    "start_line": entry.start_line,
+                    "end_line": entry.end_line,
+                    "source": "\n".join(lines[entry.start_line - 1 : entry.end_line]),
+                }
+            )
+
+    return ToolResult(
+        data={"symbols": symbols, "not_found": not_found},
+        renderable=_create_renderable(symbols, not_found),
+    )
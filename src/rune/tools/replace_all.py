@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import fnmatch
+import os
+import re
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from pydantic_ai import RunContext
+from rich.console import Group
+from rich.syntax import Syntax
+from rich.text import Text
+
+from rune.core.context import SessionContext
+from rune.core.tool_result import ToolResult
+from rune.tools.registry import register_tool
+from rune.utils.files import FileTransaction, load_ignore_spec
+from rune.utils.linediff import unified_diff
+from rune.utils.sniff import sniff_file
+
+MAX_FILES = 500  # Changed files per call; narrow the glob for more
+MAX_FILE_SIZE = 5 * 1024 * 1024  # Larger files are skipped, as in read_file
+MAX_DIFF_CHARS = 20_000  # Combined diff returned to the model
+MAX_LISTED_FILES = 30  # Files named in the rendered summary
+WORKERS = min(8, (os.cpu_count() or 1) + 4)
+
+
+@dataclass
+class _Change:
+    path: Path
+    original: str
+    new: str
+    count: int
+    encoding: str  # "utf-8", or "utf-8-sig" to keep a byte order mark
+
+
+def _create_renderable(
+    pattern: str, changes: list[_Change], root: Path, dry_run: bool, diff: str | None
+) -> Group | Text:
+    if not changes:
+        return Text(f"○ No matches found for '{pattern}'.", style="dim")
+
+    total = sum(c.count for c in changes)
+    verb = "Would replace" if dry_run else "Replaced"
+    header = Text(
+        f"┌─ Δ {verb} {total} occurrence{'s' if total != 1 else ''} of '{pattern}' "
+        f"in {len(changes)} file{'s' if len(changes) != 1 else ''}",
+        style="bold yellow" if dry_run else "bold blue",
+    )
+    body: list = [header]
+    for change in changes[:MAX_LISTED_FILES]:
+        body.append(Text(f"│  · {change.path.relative_to(root)} ({change.count})"))
+    if len(changes) > MAX_LISTED_FILES:
+        body.append(Text(f"│  … {len(changes) - MAX_LISTED_FILES} more", style="dim"))
+    if diff:
+        body.append(Syntax(diff, "diff", theme="monokai"))
+    body.append(Text("└" + "─" * (len(header.plain) - 1), style=header.style))
+    return Group(*body)
+
+
+def _glob_matches(rel: str, glob: str | None) -> bool:
+    if not glob:
+        return True
+    # As in rg: a glob without a slash matches the file name in any directory.
+    target = rel if "/" in glob else rel.rsplit("/", 1)[-1]
+    return fnmatch.fnmatch(target, glob)
+
+
+def _walk_candidates(root: Path, glob: str | None) -> list[Path]:
+    """Every candidate file under *root*, for when rg is not available.
+
+    Hidden files and directories (including `.rune/`) are skipped, as rg
+    skips them by default, so both backends touch the same files.
+    """
+    ignore_spec = load_ignore_spec(root)
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        current = Path(dirpath)
+        rel_dir = current.relative_to(root)
+        dirnames[:] = sorted(
+            d
+            for d in dirnames
+            if not d.startswith(".")
+            and not ignore_spec.match_file(f"{(rel_dir / d).as_posix()}/")
+        )
+        for name in sorted(filenames):
+            if name.startswith("."):
+                continue
+            rel = (rel_dir / name).as_posix()
+            if not ignore_spec.match_file(rel) and _glob_matches(rel, glob):
+                found.append(current / name)
+    return found
+
+
+def _rg_candidates(
+    root: Path, pattern: str, glob: str | None, regex: bool
+) -> list[Path] | None:
+    """Files rg reports as matching, or None if rg is unavailable or failed.
+
+    rg's regex dialect differs from Python's, so a pattern it rejects (or any
+    other rg error) falls back to scanning every file. rg matches line by
+    line, so patterns that may span lines are not pre-filtered either.
+    """
+    if not shutil.which("rg") or "\n" in pattern or (regex and "\\n" in pattern):
+        return None
+    cmd = ["rg", "--files-with-matches", "--no-messages"]
+    if not regex:
+        cmd.append("--fixed-strings")
+    if glob:
+        cmd.extend(["--glob", glob])
+    cmd.extend(["--", pattern, str(root)])
+    try:
+        proc = subprocess.run(
+            cmd, capture_output=True, text=True, timeout=60, check=False
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if proc.returncode not in (0, 1):  # 1 means no matches
+        return None
+    return sorted(Path(line) for line in proc.stdout.splitlines() if line)
+
+
+def _substitute(
+    path: Path, compiled: re.Pattern[str] | None, pattern: str, replacement: str
+) -> _Change | None:
+    try:
+        if path.stat().st_size > MAX_FILE_SIZE:
+            return None
+        encoding = sniff_file(path).encoding
+        if encoding not in ("utf-8", "utf-8-sig"):
+            return None
+        # Decoding the bytes keeps "\r\n" line endings intact.
+        original = path.read_bytes().decode(encoding)
+    except (OSError, UnicodeDecodeError):
+        return None
+    if compiled is not None:
+        new, count = compiled.subn(replacement, original)
+    else:
+        count = original.count(pattern)
+        new = original.replace(pattern, replacement) if count else original
+    if not count or new == original:
+        return None
+    return _Change(path, original, new, count, encoding)
+
+
+@register_tool(needs_ctx=True)
+def replace_all(
+    ctx: RunContext[SessionContext],
+    pattern: str,
+    replacement: str,
+    glob: str | None = None,
+    *,
+    regex: bool = False,
+    dry_run: bool = True,
+) -> ToolResult:
+    """Replaces every occurrence of a pattern across the project in one call.
+
+    Use this for mechanical refactors (renaming an identifier, updating an
+    import path) instead of many edit_file calls. Files ignored by
+    .gitignore/.runeignore, binary files and non-UTF-8 files are skipped; a
+    UTF-8 byte order mark is kept.
+    Run with dry_run=True (the default) first to review the per-file counts
+    and diff, then again with dry_run=False to write. Writes are atomic: if
+    any file cannot be replaced, none are changed.
+
+    Args:
+        pattern: The text to find. Matched literally unless regex=True.
+        replacement: The replacement text. With regex=True it may use group
+            references such as `\\1` or `\\g<name>`.
+        glob: Optional glob restricting which files are touched, e.g. "*.py"
+            or "src/**/*.ts". Defaults to all files.
+        regex: Treat pattern as a Python regular expression. Use `\\b` word
+            boundaries to avoid renaming substrings of longer identifiers.
+        dry_run: If True (default), only report what would change.
+    """
+    if not pattern:
+        raise ValueError("pattern must not be empty.")
+    compiled = None
+    if regex:
+        try:
+            compiled = re.compile(pattern, re.MULTILINE)
+        except re.error as e:
+            raise ValueError(f"Invalid regular expression: {e}") from e
+
+    root = ctx.deps.current_working_dir.resolve()
+    candidates = _rg_candidates(root, pattern, glob, regex)
+    if candidates is None:
+        candidates = _walk_candidates(root, glob)
+    else:
+        ignore_spec = load_ignore_spec(root)  # rg does not read .runeignore
+        candidates = [
+            path
+            for path in candidates
+            if not ignore_spec.match_file(path.relative_to(root).as_posix())
+        ]
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = pool.map(
+            lambda path: _substitute(path, compiled, pattern, replacement), candidates
+        )
+        changes = [change for change in results if change is not None]
+
+    if len(changes) > MAX_FILES:
+        raise ValueError(
+            f"Pattern matches {len(changes)} files (limit {MAX_FILES}); "
+            "narrow it down with glob."
+        )
+
+    diffs = []
+    diff_chars = omitted = 0
+    for change in changes:
+        text = unified_diff(
+            change.original, change.new, change.path.relative_to(root).as_posix()
+        ).compact()
+        if text and diff_chars + len(text) <= MAX_DIFF_CHARS:
+            diffs.append(text)
+            diff_chars += len(text)
+        elif text:
+            omitted += 1
+    combined = "".join(diffs)
+    if omitted:
+        combined += f"# Diffs of {omitted} more file(s) omitted.\n"
+
+    if changes and not dry_run:
+        for change in changes:
+            ctx.deps.journal.record(change.path, linkable=True)
+        with FileTransaction() as txn:
+            for change in changes:
+                txn.stage(
+                    change.path,
+                    change.new,
+                    previous=change.original,
+                    encoding=change.encoding,
+                )
+            txn.commit()
+        for change in changes:
+            ctx.deps.file_reads.pop(change.path, None)
+
+    files = [
+        {"path": change.path.relative_to(root).as_posix(), "replacements": change.count}
+        for change in changes
+    ]
+    if not changes:
+        status = "no_matches"
+    else:
+        status = "dry_run" if dry_run else "replaced"
+    return ToolResult(
+        data={
+            "status": status,
+            "files": files,
+            "total_replacements": sum(c.count for c in changes),
+            "diff": combined or None,
+        },
+        renderable=_create_renderable(
+            pattern, changes, root, dry_run, combined or None
+        ),
+    )
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from pydantic_ai import RunContext
+from rich.console import Group
+from rich.syntax import Syntax
+from rich.text import Text
+
+from rune.core.context import SessionContext
+from rune.core.tool_result import ToolResult
+from rune.tools.registry import register_tool
+from rune.utils.files import atomic_write_text
+from rune.utils.linediff import unified_diff
+from rune.utils.structural import replace_python_definition
+
+
+def _create_renderable(path: str, name: str, diff: str | None) -> Group:
+    header = Text(f"┌─ Δ Definition replaced: {name} in {path}", style="bold blue")
+    renderables: list = [header]
+    if diff:
+        renderables.append(Syntax(diff, "diff", theme="monokai"))
+    renderables.append(Text("└" + "─" * (len(header.plain) - 1), style="blue"))
+    return Group(*renderables)
+
+
+def _resolve_file(ctx: RunContext[SessionContext], path: str) -> Path:
+    base_dir = ctx.deps.current_working_dir
+    target = (base_dir / path).resolve()
+
+    try:
+        target.relative_to(base_dir)
+    except ValueError as e:
+        raise PermissionError("Path is outside the project directory.") from e
+
+    if not target.is_file():
+        raise FileNotFoundError("File not found or is a directory.")
+    if target.suffix not in {".py", ".pyi"}:
+        raise ValueError(
+            "replace_definition only supports Python files; use edit_file instead."
+        )
+    return target
+
+
+@register_tool(needs_ctx=True)
+def replace_definition(
+    ctx: RunContext[SessionContext], path: str, qualified_name: str, new_source: str
+) -> ToolResult:
+    """Replaces a whole Python class, function or method with new source.
+
+    Prefer this over edit_file when rewriting most of a definition: only the
+    new version has to be written, not the old one. The definition is located
+    with Python's parser, so the name must match exactly; use read_symbol or
+    read_file first if unsure. Comments and code around the definition are
+    left untouched, and nothing is written unless the edited file parses.
+
+    Args:
+        path: The Python file containing the definition.
+        qualified_name: The definition's dotted name within the file, e.g.
+            `parse_args`, `DiffApplyer` or `DiffApplyer.apply_diff`.
+        new_source: The complete new definition, from its decorators (or its
+            `def`/`class` line) to its last line. It is re-indented to match
+            the original, so it may be written unindented. If it has no
+            decorators, the existing decorators are kept.
+    """
+    target = _resolve_file(ctx, path)
+    original = target.read_text(encoding="utf-8")
+    edit = replace_python_definition(original, qualified_name, new_source)
+
+    if edit.text == original:
+        return ToolResult(
+            data={"path": path, "name": qualified_name, "status": "unchanged"},
+            renderable=Text(f"• Definition unchanged: {qualified_name}", style="dim"),
+        )
+
+    ctx.deps.journal.record(target, linkable=True)
+    atomic_write_text(target, edit.text)
+    ctx.deps.file_reads.pop(target, None)
+
+    file_diff = unified_diff(original, edit.text, path)
+    return ToolResult(
+        data={
+            "path": path,
+            "name": qualified_name,
+            "status": "modified",
+            "old_lines": [edit.old_start, edit.old_end],
+            "new_lines": [edit.new_start, edit.new_end],
+            "diff": file_diff.compact(),
+        },
+        renderable=_create_renderable(path, qualified_name, file_diff.as_text()),
+    )
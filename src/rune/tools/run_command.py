@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import asyncio
-import os
-import subprocess
-import tempfile
+import codecs
+import functools
+import uuid
+from collections import deque
 from pathlib import Path
 
 from pydantic_ai import RunContext
@@ -12,25 +13,74 @@ from rich.syntax import Syntax
 from rich.text import Text
 
 from rune.adapters.ui import render as ui
+from rune.adapters.ui.console import console
 from rune.core.context import SessionContext
 from rune.core.tool_result import ToolResult
 from rune.tools.registry import register_tool
+from rune.utils.capture import OutputCapture
+from rune.utils.shell import ShellResult, ShellSession
 from rune.utils.stream import stream_to_live
 
+READ_CHUNK = 64 * 1024  # Bytes requested from a command's pipe per read
+LIVE_MAX_LINES = 200  # Recent lines per stream kept for the live view
+LIVE_MAX_LINE_CHARS = 1000  # Longer lines are cut short in the live view
+LIVE_CHROME_ROWS = 10  # Terminal rows taken by the frame around the live output
+LIVE_MIN_ROWS = 5
 
-def _create_renderable_content(
-    command: str,
-    stdout_lines: list[str],
-    stderr_lines: list[str],
-) -> Group:
+_LINE_HIGHLIGHTER = Syntax("", "bash", theme="ansi_dark", background_color="default")
+
+
+@functools.lru_cache(maxsize=4096)
+def _highlight_line(line: str) -> Text:
+    text = _LINE_HIGHLIGHTER.highlight(line)
+    text.rstrip()
+    return text
+
+
+def _cap_line(line: str) -> str:
+    line = line.rstrip("\r")
+    if len(line) > LIVE_MAX_LINE_CHARS:
+        return line[:LIVE_MAX_LINE_CHARS] + " …"
+    return line
+
+
+class _LiveTail:
+    """The last LIVE_MAX_LINES lines of a stream, for rendering while it runs.
+
+    Text is fed in arbitrary pieces; lines are split here and cut to
+    LIVE_MAX_LINE_CHARS, so even a single multi-megabyte line stays cheap.
+    """
+
+    def __init__(self) -> None:
+        self.lines: deque[str] = deque(maxlen=LIVE_MAX_LINES)
+        self.count = 0  # Complete lines seen
+        self._partial = ""  # The unterminated last line, cut one past the cap
+
+    def feed(self, text: str) -> None:
+        *complete, rest = (self._partial + text).split("\n")
+        self.count += len(complete)
+        self.lines.extend(_cap_line(line) for line in complete[-LIVE_MAX_LINES:])
+        self._partial = rest[: LIVE_MAX_LINE_CHARS + 1]
+
+    @property
+    def total(self) -> int:
+        """Lines seen, counting an unterminated last line."""
+        return self.count + bool(self._partial)
+
+    def last(self, n: int) -> list[str]:
+        """The last *n* lines, including an unterminated last line (a prompt, a progress bar)."""
+        lines = list(self.lines)  # At most LIVE_MAX_LINES
+        if self._partial:
+            lines.append(_cap_line(self._partial))
+        return lines[-n:] if n > 0 else []
+
+
+def _create_renderable_content(command: str, stdout: str, stderr: str) -> Group:
     """Creates the rich renderable for the command's output CONTENT only."""
     renderables = []
 
     renderables.append(Text(f"$ {command}", style="bold cyan"))
 
-    stdout = "".join(stdout_lines)
-    stderr = "".join(stderr_lines)
-
     if stdout:
         renderables.append(Text("\nSTDOUT " + "─" * 59, style="bold grey70"))
         renderables.append(
@@ -46,65 +96,147 @@ def _create_renderable_content(
     return Group(*renderables)
 
 
+def _create_live_content(
+    command: str, stdout: _LiveTail, stderr: _LiveTail, rows: int
+) -> Group:
+    """Like `_create_renderable_content`, but shows only the last *rows* lines.
+
+    Lines are highlighted one at a time through a cache and cropped to the
+    terminal width, so a frame costs the same however much has been printed.
+    """
+    renderables: list = [Text(f"$ {command}", style="bold cyan")]
+    stderr_rows = min(stderr.total, rows // 3) if stdout.total else rows
+    sections = (
+        ("STDOUT", "bold grey70", stdout, rows - stderr_rows),
+        ("STDERR", "bold yellow", stderr, stderr_rows),
+    )
+    for label, style, tail, budget in sections:
+        if not tail.total:
+            continue
+        renderables.append(Text(f"\n{label} " + "─" * 59, style=style))
+        shown = tail.last(budget)
+        if tail.total > len(shown):
+            renderables.append(
+                Text(f"… {tail.total - len(shown):,} earlier lines", style="dim")
+            )
+        body = Text("\n").join(_highlight_line(line) for line in shown)
+        body.no_wrap = True
+        body.overflow = "ellipsis"
+        renderables.append(body)
+    return Group(*renderables)
+
+
 async def _handle_streaming_command(
-    command: str, cwd: Path, timeout: int, live_manager
+    command: str,
+    cwd: Path,
+    timeout: int,
+    live_manager,
+    shell: ShellSession | None = None,
 ) -> ToolResult:
-    """The core logic for running a command and streaming its output."""
-    proc = await asyncio.create_subprocess_shell(
-        command,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-        cwd=cwd,
-    )
+    """The core logic for running a command and streaming its output.
 
-    stdout_lines: list[str] = []
-    stderr_lines: list[str] = []
+    With *shell*, the command runs in that persistent session instead of a
+    fresh `/bin/sh`.
+    """
+    if shell is None:
+        proc = await asyncio.create_subprocess_shell(
+            command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=cwd,
+        )
+        log_stem = str(proc.pid)
+    else:
+        proc = None
+        log_stem = f"shell-{uuid.uuid4().hex[:8]}"
+
+    # Large outputs keep only their head and tail in memory; the rest is
+    # spilled to .rune/logs/<pid>.<stream>.log.
+    log_dir = cwd / ".rune" / "logs"
+    stdout_capture = OutputCapture(log_dir / f"{log_stem}.stdout.log")
+    stderr_capture = OutputCapture(log_dir / f"{log_stem}.stderr.log")
+    stdout_tail = _LiveTail()
+    stderr_tail = _LiveTail()
     is_dirty = True  # Start dirty to render initial frame
 
     def set_dirty():
         nonlocal is_dirty
         is_dirty = True
 
-    async def read_stream(stream, sink: list[str]):
-        """Reads from a stream, appends to sink, and sets the dirty flag."""
+    def feeder(sink: OutputCapture, tail: _LiveTail):
+        """Returns a callback taking raw output chunks into sink and tail.
+
+        Taking chunks rather than lines means no line is ever too long, and
+        the incremental decoder copes with characters split across reads.
+        """
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+        def feed(chunk: bytes, final: bool = False) -> None:
+            sink.append(chunk)
+            tail.feed(decoder.decode(chunk, final=final))
+            set_dirty()
+
+        return feed
+
+    feed_stdout = feeder(stdout_capture, stdout_tail)
+    feed_stderr = feeder(stderr_capture, stderr_tail)
+
+    async def read_stream(stream, feed):
         if not stream:
             return
-        while not stream.at_eof():
-            line_bytes = await stream.readline()
-            if not line_bytes:
-                break
-            line = line_bytes.decode("utf-8", errors="replace")
-            sink.append(line)
-            set_dirty()
+        while chunk := await stream.read(READ_CHUNK):
+            feed(chunk)
+        feed(b"", final=True)
+
+    async def run() -> tuple[int, ShellResult | None]:
+        if proc is not None:
+            await asyncio.gather(
+                read_stream(proc.stdout, feed_stdout),
+                read_stream(proc.stderr, feed_stderr),
+            )
+            return await proc.wait(), None
+        assert shell is not None
+        result = await shell.run(command, feed_stdout, feed_stderr)
+        feed_stdout(b"", final=True)
+        feed_stderr(b"", final=True)
+        return result.exit_code, result
+
+    def output(capture: OutputCapture) -> str:
+        return capture.text(_relative_log(capture, cwd))
 
     def build_frame():
         nonlocal is_dirty
         is_dirty = False
-        content_update = _create_renderable_content(command, stdout_lines, stderr_lines)
+        rows = max(LIVE_MIN_ROWS, console.size.height - LIVE_CHROME_ROWS)
+        content_update = _create_live_content(command, stdout_tail, stderr_tail, rows)
         temp_status = ToolResult(status="success", data=None)
         return ui._build_tool_result_renderable(
             "run_command", temp_status, content_override=content_update
         )
 
-    reader_tasks = asyncio.gather(
-        read_stream(proc.stdout, stdout_lines),
-        read_stream(proc.stderr, stderr_lines),
-    )
-
     try:
         if live_manager:
             async with stream_to_live(live_manager, build_frame, lambda: is_dirty):
-                await asyncio.wait_for(reader_tasks, timeout)
+                exit_code, shell_result = await asyncio.wait_for(run(), timeout)
         else:
-            await asyncio.wait_for(reader_tasks, timeout)
+            exit_code, shell_result = await asyncio.wait_for(run(), timeout)
     except asyncio.TimeoutError:
-        proc.kill()
-        await proc.wait()
-        raise TimeoutError(f"Command timed out after {timeout} seconds.")
+        if proc is not None:
+            proc.kill()
+            await proc.wait()
+            raise TimeoutError(f"Command timed out after {timeout} seconds.")
+        # shell.run killed the session when it was cancelled.
+        raise TimeoutError(
+            f"Command timed out after {timeout} seconds. The persistent shell was "
+            "killed; the next command starts a new one without earlier state."
+        )
+    finally:
+        stdout_capture.close()
+        stderr_capture.close()
 
-    exit_code = await proc.wait()
-    final_stdout = "".join(stdout_lines)
-    final_stderr = "".join(stderr_lines)
+    final_stdout = output(stdout_capture)
+    final_stderr = output(stderr_capture)
+    notes = _shell_notes(shell_result)
 
     if exit_code != 0:
         error_details = (
@@ -113,47 +245,65 @@ async def _handle_streaming_command(
             f"------------------------------------\n"
             f"Stderr: {final_stderr.strip()}"
         )
+        if notes:
+            error_details += "\n" + " ".join(notes)
         raise ValueError(error_details)
 
+    data = {
+        "command": command,
+        "stdout": final_stdout,
+        "stderr": final_stderr,
+        "exit_code": exit_code,
+    }
+    for name, capture in (("stdout", stdout_capture), ("stderr", stderr_capture)):
+        if capture.truncated:
+            data[f"{name}_total_bytes"] = capture.total_bytes
+            data[f"{name}_total_lines"] = capture.total_lines
+            data[f"{name}_log"] = _relative_log(capture, cwd)
+    if notes:
+        data["shell"] = " ".join(notes)
     return ToolResult(
-        data={
-            "command": command,
-            "stdout": final_stdout,
-            "stderr": final_stderr,
-            "exit_code": exit_code,
-        },
-        renderable=_create_renderable_content(command, stdout_lines, stderr_lines),
+        data=data,
+        renderable=_create_renderable_content(command, final_stdout, final_stderr),
     )
 
 
-def _handle_background_command(command: str, session_ctx: SessionContext) -> ToolResult:
-    """Handles running a command in the background."""
-    log_dir = session_ctx.current_working_dir / ".rune" / "logs"
-    log_dir.mkdir(parents=True, exist_ok=True)
-    tmp_log_fd, tmp_log_path_str = tempfile.mkstemp(dir=log_dir, text=True)
-    tmp_log_path = Path(tmp_log_path_str)
+def _shell_notes(result: ShellResult | None) -> list[str]:
+    """What the model should know about the persistent shell after a command."""
+    notes = []
+    if result is not None and result.restarted:
+        notes.append(
+            "The persistent shell had stopped and was restarted before this command; "
+            "variables, cwd and sourced scripts from earlier commands are gone."
+        )
+    if result is not None and result.exited:
+        notes.append(
+            "The command ended the persistent shell; the next one starts fresh."
+        )
+    return notes
 
+
+def _relative_log(capture: OutputCapture, cwd: Path) -> str:
     try:
-        proc = subprocess.Popen(
-            command,
-            stdout=tmp_log_fd,
-            stderr=subprocess.STDOUT,
-            cwd=session_ctx.current_working_dir,
-            shell=True,
-            start_new_session=True,
-        )
-    finally:
-        os.close(tmp_log_fd)
+        return str(capture.log_path.relative_to(cwd))
+    except ValueError:
+        return str(capture.log_path)
+
 
-    pid = proc.pid
-    log_file = log_dir / f"{pid}.log"
-    tmp_log_path.rename(log_file)
-    rel_log_path = str(log_file.relative_to(session_ctx.current_working_dir))
+def _handle_background_command(command: str, session_ctx: SessionContext) -> ToolResult:
+    """Handles running a command in the background."""
+    job = session_ctx.jobs.start(command, session_ctx.current_working_dir)
+    rel_log_path = str(job.log_path.relative_to(session_ctx.current_working_dir))
 
     return ToolResult(
-        data={"pid": pid, "log_file": rel_log_path, "status": "success"},
+        data={
+            "job_id": job.id,
+            "pid": job.pid,
+            "log_file": rel_log_path,
+            "status": "success",
+        },
         renderable=Text(
-            f"✓ Started background command (PID: {pid}). Log: {rel_log_path}",
+            f"✓ Started background job {job.id} (PID: {job.pid}). Log: {rel_log_path}",
             style="green",
         ),
     )
@@ -166,6 +316,7 @@ async def run_command(
     *,
     timeout: int = 60,
     background: bool = False,
+    persistent: bool = False,
 ) -> ToolResult:
     """
     Executes a bash command with live streaming output and an optional timeout.
@@ -175,7 +326,13 @@ async def run_command(
         to the UI in real-time. It waits for the command to complete.
     2.  **Background (`background=True`):** Starts the command and immediately returns,
         allowing it to run in the background. Ideal for long-running processes like web
-        servers. Output is redirected to a log file.
+        servers. Output is redirected to a log file. Use `job_tail` to follow it,
+        `job_status` to see whether it is still running and `job_kill` to stop it.
+    3.  **Persistent (`persistent=True`):** Like synchronous, but runs in one bash
+        session kept for the whole chat, so `cd`, exported variables, activated
+        virtualenvs and sourced scripts carry over to later persistent commands.
+        Commands cannot read stdin. If the session dies (or a command times out),
+        the next persistent command starts a new one and the result says so.
 
     Args:
         command (str): The command to execute.
@@ -183,19 +340,28 @@ async def run_command(
             Defaults to 60.
         background (bool, optional): If True, runs the command in the background.
             Defaults to False.
+        persistent (bool, optional): If True, runs the command in the persistent
+            bash session. Defaults to False.
 
     Returns:
-        The final result of the command. For synchronous commands, this includes all
-        output and the exit code. For background commands, this includes the PID and
-        log file path.
+        The final result of the command. For synchronous commands, this includes the
+        output and the exit code; very long output keeps only its start and end, with
+        the total size and the path of a log file holding all of it. For background
+        commands, this includes the PID and log file path.
     """
     session_ctx = ctx.deps
 
     if background:
+        if persistent:
+            raise ValueError("A command cannot be both background and persistent.")
         return _handle_background_command(command, session_ctx)
 
     # The default case is to stream the command's output.
     live_manager = session_ctx.live_display
     return await _handle_streaming_command(
-        command, session_ctx.current_working_dir, timeout, live_manager
+        command,
+        session_ctx.current_working_dir,
+        timeout,
+        live_manager,
+        shell=session_ctx.shell if persistent else None,
     )
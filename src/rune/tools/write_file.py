@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import difflib
 from pathlib import Path
 from typing import Literal
 
@@ -12,6 +11,10 @@ from rich.text import Text
 from rune.core.context import SessionContext
 from rune.core.tool_result import ToolResult
 from rune.tools.registry import register_tool
+from rune.utils.files import atomic_write_text, content_hash, file_hash
+from rune.utils.linediff import unified_diff
+
+DIFF_MAX_BYTES = 1024 * 1024  # Old plus new size above which no diff is computed
 
 
 def _create_renderable(
@@ -68,7 +71,8 @@ def write_file(
     This tool can create a new file, overwrite an existing file, or append
     content to the end of an existing file. If the parent directories for the
     given path do not exist, they will be created automatically. When
-    overwriting, a diff of the changes is returned.
+    overwriting, the file is replaced atomically and a diff of the changes is
+    returned; for very large writes only a size and hash summary is returned.
 
     Args:
         path: The path to the file to be written to.
@@ -91,8 +95,10 @@ def write_file(
         raise IsADirectoryError("Path is a directory, not a file.")
 
     target.parent.mkdir(parents=True, exist_ok=True)
+    ctx.deps.file_reads.pop(target, None)
 
     if mode == "a":
+        ctx.deps.journal.record(target)  # Appends write in place: no hard link
         with target.open("a", encoding="utf-8") as f:
             bytes_written = f.write(content)
         return ToolResult(
@@ -106,34 +112,53 @@ def write_file(
             ),
         )
 
+    encoded = content.encode("utf-8")
     was_existing = target.exists()
-    original = target.read_text(encoding="utf-8") if was_existing else ""
-    if original == content:
+    old_size = target.stat().st_size if was_existing else 0
+    # A size mismatch proves a change without reading the file at all.
+    if (
+        was_existing
+        and old_size == len(encoded)
+        and file_hash(target) == content_hash(encoded)
+    ):
         return ToolResult(
             data={"path": path, "status": "unchanged"},
             renderable=_create_renderable("unchanged", path),
         )
 
-    with target.open("w", encoding="utf-8") as f:
-        bytes_written = f.write(content)
+    original = None
+    if old_size + len(encoded) <= DIFF_MAX_BYTES:
+        # Bytes are decoded directly so a change of line endings shows up.
+        original = (
+            target.read_bytes().decode("utf-8", errors="replace")
+            if was_existing
+            else ""
+        )
 
-    diff_lines = difflib.unified_diff(
-        original.splitlines(keepends=True),
-        content.splitlines(keepends=True),
-        fromfile=f"a/{path}",
-        tofile=f"b/{path}",
-    )
-    diff_str = "".join(diff_lines) or None
+    ctx.deps.journal.record(target, linkable=True)
+    atomic_write_text(target, content)
+    bytes_written = len(content)
     status = "modified" if was_existing else "created"
 
+    if original is None:
+        lines = content.count("\n") + (bool(content) and not content.endswith("\n"))
+        summary = (
+            f"# Diff of {path} skipped ({old_size:,} -> {len(encoded):,} bytes, "
+            f"{lines:,} lines, sha256 {content_hash(encoded)})"
+        )
+        model_diff = display_diff = summary
+    else:
+        diff = unified_diff(original, content, path)
+        model_diff, display_diff = diff.compact(), diff.as_text()
+
     return ToolResult(
         data={
             "path": path,
             "status": status,
             "bytes_written": bytes_written,
-            "diff": diff_str,
+            "diff": model_diff,
         },
         renderable=_create_renderable(
-            status, path, bytes_written=bytes_written, diff=diff_str
+            status, path, bytes_written=bytes_written, diff=display_diff
         ),
     )
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from collections import deque
+from pathlib import Path
+from typing import BinaryIO
+
+HEAD_BYTES = 8 * 1024  # Start of a stream kept in memory
+TAIL_BYTES = 24 * 1024  # End of a stream kept in memory
+
+
+class OutputCapture:
+    """Keeps the first and last few KB of a byte stream, spilling the rest to disk.
+
+    Chunks are appended as they arrive, in any size. Until the
+    stream outgrows `head_bytes + tail_bytes` everything stays in memory and
+    no file is created; from then on the whole stream, including what was
+    already buffered, is written to *log_path* and only the head and the
+    most recent tail are kept.
+    """
+
+    def __init__(
+        self,
+        log_path: Path,
+        *,
+        head_bytes: int = HEAD_BYTES,
+        tail_bytes: int = TAIL_BYTES,
+    ) -> None:
+        self.log_path = log_path
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.total_bytes = 0
+        self.total_lines = 0
+        self._head: list[bytes] = []
+        self._head_size = 0
+        self._head_lines = 0
+        self._head_open = True  # The head is a prefix: closed once a chunk misses it
+        self._tail: deque[bytes] = deque()
+        self._tail_size = 0
+        self._tail_lines = 0
+        self._spill: BinaryIO | None = None
+
+    @property
+    def truncated(self) -> bool:
+        """Whether part of the stream is only in the log file."""
+        return self._spill is not None
+
+    def append(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        self.total_bytes += len(chunk)
+        self.total_lines += chunk.count(b"\n")
+        if self._spill is not None:
+            self._spill.write(chunk)
+
+        if self._head_open:
+            room = self.head_bytes - self._head_size
+            # Fill the head up to its last whole line; the rest goes to the tail.
+            cut = len(chunk) if len(chunk) <= room else chunk.rfind(b"\n", 0, room) + 1
+            if cut:
+                self._head.append(chunk[:cut])
+                self._head_size += cut
+                self._head_lines += chunk.count(b"\n", 0, cut)
+                chunk = chunk[cut:]
+            if not chunk:
+                return
+            self._head_open = False
+
+        self._tail.append(chunk)
+        self._tail_size += len(chunk)
+        self._tail_lines += chunk.count(b"\n")
+        while self._tail_size > self.tail_bytes:
+            if self._spill is None:
+                self._start_spill()
+            excess = self._tail_size - self.tail_bytes
+            first = self._tail[0]
+            # Trim the oldest chunk, preferably to the start of a line.
+            newline = first.find(b"\n", excess)
+            if newline >= 0 and (newline < len(first) - 1 or len(self._tail) > 1):
+                excess = newline + 1
+            if excess >= len(first):
+                dropped = self._tail.popleft()
+            else:
+                dropped = first[:excess]
+                self._tail[0] = first[excess:]
+            self._tail_size -= len(dropped)
+            self._tail_lines -= dropped.count(b"\n")
+
+    def _start_spill(self) -> None:
+        # Head and tail still hold the complete stream at this point.
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._spill = self.log_path.open("wb")
+        self._spill.writelines(self._head)
+        self._spill.writelines(self._tail)
+
+    def close(self) -> None:
+        if self._spill is not None:
+            self._spill.close()
+
+    def text(self, log_name: str | None = None) -> str:
+        """The captured output, with a marker where the middle was left out.
+
+        *log_name* is how the marker refers to the log file (default: its path).
+        """
+        head = b"".join(self._head).decode("utf-8", errors="replace")
+        tail = b"".join(self._tail).decode("utf-8", errors="replace")
+        if not self.truncated:
+            return head + tail
+        omitted_bytes = self.total_bytes - self._head_size - self._tail_size
+        omitted_lines = self.total_lines - self._head_lines - self._tail_lines
+        if head and not head.endswith("\n"):
+            head += "\n"
+        return (
+            f"{head}… {omitted_lines:,} lines ({omitted_bytes:,} bytes) omitted; "
+            f"full output in {log_name or self.log_path} …\n{tail}"
+        )
@@ -1,14 +1,24 @@
 # ctxl_coder/utils/diff.py
 # Contains utilities for generating diffs and applying diff patches.
 
-import difflib
+import bisect
+import functools
+import heapq
 import logging
 import re
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass, field
 from difflib import SequenceMatcher
+from itertools import accumulate, count
+from pathlib import Path
 
 from rich.text import Text
 
+from rune.utils.files import FileFingerprint, fingerprint
+from rune.utils.linediff import unified_diff
+
 
 def generate_and_format_diff(
     original_content: str, new_content: str, path_str: str
@@ -18,18 +28,8 @@ def generate_and_format_diff(
     if original_content == new_content:
         return diff_text  # No changes
 
-    original_lines = original_content.splitlines()
-    new_lines = new_content.splitlines()
-    diff = difflib.unified_diff(
-        original_lines,
-        new_lines,
-        fromfile=f"a/{path_str}",
-        tofile=f"b/{path_str}",
-        lineterm="",
-        n=3,  # Context lines
-    )
-
-    lines = list(diff)
+    diff = unified_diff(original_content, new_content, path_str).as_text()
+    lines = diff.splitlines() if diff else []
     if not lines:
         return diff_text  # Should not happen if content differs
 
@@ -57,6 +57,9 @@ DEFAULT_FUZZY_THRESHOLD_FOR_ERROR_REPORTING = (
     0.85  # Threshold for suggesting "Did you mean?"
 )
 FUZZY_CONTEXT_LINES = 2  # Lines of context before/after fuzzy match snippet
+DEFAULT_FUZZY_TIME_BUDGET = 0.25  # Seconds spent looking for a "Did you mean?"
+FUZZY_PREFILTER_CANDIDATES = 50  # Windows kept after the token-overlap pre-filter
+FUZZY_EXACT_CANDIDATES = 5  # Windows that get a full SequenceMatcher.ratio()
 
 
 # --- Data Structures for Results ---
@@ -148,9 +151,178 @@ class ApplyDiffResult:
     )  # Contains at most one item if success=False due to stop-on-error
 
 
-def _get_similarity(a: str, b: str) -> float:
-    """Calculates the similarity ratio between two strings."""
-    return SequenceMatcher(isjunk=None, a=a, b=b, autojunk=False).ratio()
+_TOKEN_RE = re.compile(r"\w+")
+# Regex to find blocks, ensuring markers are at line start/end properly
+# Handles optional newline before ======= and >>>>>>>
+# Uses non-capturing group (?: ) for marker prefixes
+# Correctly handles escaped markers using negative lookbehind (?<!\\)
+_BLOCK_RE = re.compile(
+    r"(?:^|\n)(?<!\\)<<<<<<< SEARCH\s*\n([\s\S]*?)(?:\n?)(?<!\\)=======\s*\n([\s\S]*?)(?:\n?)(?<!\\)>>>>>>> REPLACE(?=\n|$)"
+)
+
+
+class LineIndex:
+    """Line boundaries of a text, for O(1) line -> character conversion.
+
+    Lines are split exactly like `str.splitlines()`. `starts[i]` is the
+    character offset where line `i` begins (`starts[-1] == len(text)`), and
+    `stripped[i]` caches `lines[i].strip()` for the whitespace-insensitive
+    matchers. `apply_edit` keeps the index current after a replacement by
+    re-splitting only the affected lines.
+
+    `counts` is a hash table of how often each stripped line occurs and
+    `positions` maps each stripped line to the sorted line numbers where it
+    occurs; `apply_edit` keeps both current. The matchers use them to pick
+    the rarest line of a search block and only verify the windows around its
+    occurrences.
+    """
+
+    def __init__(self, text: str):
+        self._build(text)
+
+    def _build(self, text: str) -> None:
+        self.text = text
+        self.lines = text.splitlines()
+        self.stripped = [line.strip() for line in self.lines]
+        self.starts = [0, *accumulate(map(len, text.splitlines(keepends=True)))]
+        self.counts = Counter(self.stripped)
+        self.positions = _line_positions(self.stripped)
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def occurrences(self, stripped_line: str) -> Iterator[int]:
+        """Yields, in order, the line numbers whose stripped text is *stripped_line*."""
+        return iter(self.positions.get(stripped_line, ()))
+
+    def find_stripped(self, search_stripped: list[str]) -> list[int]:
+        """Returns the start lines of every window whose stripped lines equal *search_stripped*.
+
+        Candidates come from the occurrences of the rarest search line, so the
+        cost is proportional to that line's frequency rather than to the file.
+        """
+        num_search = len(search_stripped)
+        if not num_search or num_search > len(self.lines):
+            return []
+        offset, rarest = min(
+            enumerate(search_stripped), key=lambda item: self.counts[item[1]]
+        )
+        starts = []
+        for line_num in self.occurrences(rarest):
+            start = line_num - offset
+            if (
+                start >= 0
+                and start + num_search <= len(self.lines)
+                and self.stripped[start : start + num_search] == search_stripped
+            ):
+                starts.append(start)
+        return starts
+
+    def line_to_char(self, line_num: int) -> int:
+        """Converts a 0-based line number to its starting character index."""
+        if line_num <= 0:
+            return 0
+        if line_num >= len(self.lines):
+            return len(self.text)
+        return self.starts[line_num]
+
+    def line_end(self, line_num: int) -> int:
+        """Returns the character index just past the text of a line, before its terminator."""
+        return self.starts[line_num] + len(self.lines[line_num])
+
+    def char_to_line(self, char_index: int) -> int:
+        """Converts a character index to the 0-based line containing it."""
+        line = bisect.bisect_right(self.starts, char_index) - 1
+        return max(0, min(line, len(self.lines) - 1))
+
+    def _update_counts(self, removed: list[str], added: list[str]) -> None:
+        self.counts.subtract(removed)
+        self.counts.update(added)
+        for line in removed:
+            if self.counts.get(line) == 0:
+                del self.counts[line]
+
+    def _update_positions(
+        self, first: int, removed: list[str], added: list[str]
+    ) -> None:
+        for line_num, old, new in zip(count(first), removed, added):
+            if old == new:
+                continue
+            rows = self.positions[old]
+            del rows[bisect.bisect_left(rows, line_num)]
+            if not rows:
+                del self.positions[old]
+            bisect.insort(self.positions.setdefault(new, []), line_num)
+
+    def apply_edit(self, start: int, end: int, replacement: str) -> None:
+        """Replaces `text[start:end]` and updates the index incrementally."""
+        old_text = self.text
+        new_text = old_text[:start] + replacement + old_text[end:]
+        if not self.lines:
+            self._build(new_text)
+            return
+
+        first = self.char_to_line(start)
+        last = self.char_to_line(end)
+        region_start = self.starts[first]
+        region_end = self.starts[last + 1]
+        delta = len(replacement) - (end - start)
+        region = new_text[region_start : region_end + delta]
+
+        # A "\r" / "\n" pair straddling the region boundary would be split
+        # differently by a full splitlines(); rebuild in that rare case.
+        if (
+            region.endswith("\r")
+            and new_text[region_end + delta : region_end + delta + 1] == "\n"
+        ) or (
+            region.startswith("\n")
+            and region_start > 0
+            and new_text[region_start - 1] == "\r"
+        ):
+            self._build(new_text)
+            return
+
+        region_lines = region.splitlines()
+        region_starts = list(
+            accumulate(map(len, region.splitlines(keepends=True)), initial=region_start)
+        )
+
+        region_stripped = [line.strip() for line in region_lines]
+        removed = self.stripped[first : last + 1]
+        self._update_counts(removed, region_stripped)
+        self.text = new_text
+        self.lines[first : last + 1] = region_lines
+        self.stripped[first : last + 1] = region_stripped
+        if len(region_stripped) == len(removed):
+            self._update_positions(first, removed, region_stripped)
+        else:
+            # Every later line number moves, as `starts` does below.
+            self.positions = _line_positions(self.stripped)
+        self.starts[first : last + 2] = region_starts
+        tail_from = first + len(region_lines) + 1
+        if delta:
+            self.starts[tail_from:] = [pos + delta for pos in self.starts[tail_from:]]
+
+
+def _line_positions(stripped: list[str]) -> dict[str, list[int]]:
+    positions: dict[str, list[int]] = {}
+    for line_num, line in enumerate(stripped):
+        positions.setdefault(line, []).append(line_num)
+    return positions
+
+
+@functools.lru_cache(maxsize=32)
+def _line_index_for(fp: FileFingerprint) -> LineIndex:
+    return LineIndex(fp.path.read_text(encoding="utf-8"))
+
+
+def cached_line_index(path: Path) -> LineIndex:
+    """Returns the LineIndex of *path*'s text, cached per file fingerprint.
+
+    The index is shared between callers: read from it, but build a new
+    LineIndex (or a new string) instead of calling `apply_edit` on it.
+    """
+    return _line_index_for(fingerprint(path))
 
 
 # --- Core Diff Logic Class ---
@@ -159,8 +331,11 @@ class DiffApplyer:
         self,
         # Fuzzy threshold for *reporting* 'did you mean' errors
         fuzzy_threshold_error: float = DEFAULT_FUZZY_THRESHOLD_FOR_ERROR_REPORTING,
+        # Wall-clock cap on the "Did you mean?" search after a failed match
+        fuzzy_time_budget: float = DEFAULT_FUZZY_TIME_BUDGET,
     ):
         self.fuzzy_threshold_error = fuzzy_threshold_error
+        self.fuzzy_time_budget = fuzzy_time_budget
         # Threshold for *applying* fuzzy matches is effectively 1.0 (only exact/whitespace/anchor/ellipsis apply)
         log.info(
             f"DiffApplyer initialized (Error Report Threshold={fuzzy_threshold_error})"
@@ -230,6 +405,24 @@ class DiffApplyer:
 
         return None
 
+    def parse_blocks(self, diff_content: str) -> list[tuple[str, str]]:
+        """Returns the (search, replace) pairs of *diff_content*, markers unescaped.
+
+        Raises ValueError if the markers are malformed or no block is found.
+        """
+        validation_error = self._validate_marker_sequencing(diff_content)
+        if validation_error:
+            raise ValueError(validation_error)
+        blocks = [
+            (self._unescape_markers(m.group(1)), self._unescape_markers(m.group(2)))
+            for m in _BLOCK_RE.finditer(diff_content)
+        ]
+        if not blocks:
+            raise ValueError(
+                "Invalid diff format: Could not parse any valid SEARCH/REPLACE blocks."
+            )
+        return blocks
+
     def _unescape_markers(self, content: str) -> str:
         """Removes escaping backslashes from diff markers if they are at the start of a line."""
         content = re.sub(r"^\\(<<<<<<< SEARCH)", r"\1", content, flags=re.MULTILINE)
@@ -237,25 +430,20 @@ class DiffApplyer:
         content = re.sub(r"^\\(>>>>>>> REPLACE)", r"\1", content, flags=re.MULTILINE)
         return content
 
-    def _char_index_to_line_num(self, text: str, char_index: int) -> int:
-        """Converts a character index to a 0-based line number."""
-        # Efficiently count newlines up to the index
-        return text.count("\n", 0, char_index)
-
-    def _line_num_to_char_index(self, text_lines: list[str], line_num: int) -> int:
-        """Converts a 0-based line number to its starting character index."""
-        if line_num < 0:
-            return 0
-        if line_num >= len(text_lines):
-            return sum(len(line) + 1 for line in text_lines)  # End of text approx
-
-        char_index = 0
-        for i in range(line_num):
-            char_index += len(text_lines[i]) + 1  # Add 1 for the newline character
-        return char_index
+    def _find_match(
+        self,
+        content_to_search_in: str,
+        search_block: str,
+        index: LineIndex | None = None,
+        suggest: bool = True,
+    ) -> MatchResult:
+        """Finds the unique location of the search_block using various strategies.
 
-    def _find_match(self, content_to_search_in: str, search_block: str) -> MatchResult:
-        """Finds the unique location of the search_block using various strategies."""
+        With `suggest=False` a failed match returns without running the fuzzy
+        "Did you mean?" search.
+        """
+        if index is None:
+            index = LineIndex(content_to_search_in)
         if not search_block.strip():
             return MatchResult(
                 error="Empty SEARCH block is not allowed for replacement."
@@ -292,9 +480,7 @@ class DiffApplyer:
 
         # --- 2. Whitespace-Flexible Match ---
         # This needs to return the actual matched segment's start/end in the original content
-        ws_results = self._find_whitespace_flexible_match(
-            content_to_search_in, search_block
-        )
+        ws_results = self._find_whitespace_flexible_match(index, search_block)
         if len(ws_results) == 1:
             start_idx, end_idx = ws_results[0]
             return MatchResult(
@@ -319,7 +505,7 @@ class DiffApplyer:
         # --- 3. Block-Anchor Match (Optional but Recommended) ---
         # This also needs to return the actual matched segment's start/end
         if len(search_block.splitlines()) >= 3:
-            anchor_results = self._find_anchor_match(content_to_search_in, search_block)
+            anchor_results = self._find_anchor_match(index, search_block)
             if len(anchor_results) == 1:
                 start_idx, end_idx = anchor_results[0]
                 return MatchResult(
@@ -341,6 +527,9 @@ class DiffApplyer:
                     match_locations=anchor_results,  # Store the found locations
                 )
 
+        if not suggest:
+            return MatchResult(error="No unique match found.")
+
         # --- 4. Fuzzy Match (For Error Reporting Only) ---
         # Fuzzy matching does not lead to application, only error reporting.
         # We find the best fuzzy match info here to include in the failure result.
@@ -349,7 +538,7 @@ class DiffApplyer:
             best_snippet,
             context_snippet,
             _best_indices,
-        ) = self._find_best_fuzzy_match_info(content_to_search_in, search_block)
+        ) = self._find_best_fuzzy_match_info(index, search_block)
 
         error_msg = f"No unique match found (best fuzzy score: {best_score:.1%})."
         return MatchResult(
@@ -366,7 +555,7 @@ class DiffApplyer:
         )
 
     def _find_whitespace_flexible_match(
-        self, content: str, search: str
+        self, index: LineIndex, search: str
     ) -> list[tuple[int, int]]:
         """Finds matches ignoring leading/trailing whitespace on each line. Returns list of (start_char_index, end_char_index)."""
         search_lines = search.splitlines()
@@ -375,77 +564,17 @@ class DiffApplyer:
         if not search_lines:
             return []  # Cannot match empty search
 
-        content_lines = content.splitlines()
-        match_locations = []
         num_search_lines = len(search_lines)
-        num_content_lines = len(content_lines)
-
-        if num_search_lines > num_content_lines:
-            return []  # Cannot match if search is longer
-
-        current_char_index = 0
-        for i in range(num_content_lines - num_search_lines + 1):
-            # Calculate start index for this potential match *before* checking lines
-            start_char_index = current_char_index
-
-            match = True
-            for j in range(num_search_lines):
-                if content_lines[i + j].strip() != search_lines_stripped[j]:
-                    match = False
-                    break
-            if match:
-                # Calculate end character index based on matched lines
-                end_char_index = start_char_index
-                for k in range(num_search_lines):
-                    end_char_index += len(content_lines[i + k]) + 1  # +1 for newline
-
-                # Adjust end index: remove the last +1 if it's not the end of the *entire* content
-                # or if the last matched line didn't have a newline in the original splitlines list
-                # A simpler way is to calculate based on the start index and the lengths.
-                end_char_index = start_char_index + sum(
-                    len(content_lines[i + k]) + 1 for k in range(num_search_lines)
-                )
-                # If the match extends to the very end of the file AND the original content didn't end with a newline,
-                # the last +1 might be wrong. Let's adjust.
-                if i + num_search_lines == num_content_lines and not content.endswith(
-                    "\n"
-                ):
-                    end_char_index -= 1
-
-                # More robust end index: start + length of matched segment
-                # Account for potentially missing final newline if match is at EOF
-                if i + num_search_lines == num_content_lines and not content.endswith(
-                    "\n"
-                ):
-                    # The join added newlines we didn't have in the original segment string
-                    # Let's calculate end based on character indices more directly
-                    end_char_index = self._line_num_to_char_index(
-                        content_lines, i + num_search_lines
-                    )
-                    # If not EOF, the index is start of next line. If EOF without newline, need to adjust.
-                    if end_char_index > 0 and content[end_char_index - 1] == "\n":
-                        end_char_index -= 1  # remove trailing newline char count
-
-                else:
-                    # If not at EOF, the end index should be the start of the line *after* the match
-                    end_char_index = self._line_num_to_char_index(
-                        content_lines, i + num_search_lines
-                    )
-
-                # Correct approach: Find start index of line i, find start index of line i + num_search_lines
-                start_idx_calc = self._line_num_to_char_index(content_lines, i)
-                end_idx_calc = self._line_num_to_char_index(
-                    content_lines, i + num_search_lines
-                )
-
-                match_locations.append((start_idx_calc, end_idx_calc))
-
-            # Update current_char_index for the next iteration
-            current_char_index += len(content_lines[i]) + 1
-
-        return match_locations
-
-    def _find_anchor_match(self, content: str, search: str) -> list[tuple[int, int]]:
+        # Like an exact match, each span stops before the terminator of its
+        # last line so the following line stays on its own line.
+        return [
+            (index.line_to_char(i), index.line_end(i + num_search_lines - 1))
+            for i in index.find_stripped(search_lines_stripped)
+        ]
+
+    def _find_anchor_match(
+        self, index: LineIndex, search: str
+    ) -> list[tuple[int, int]]:
         """Finds matches based on first and last lines (stripped). Returns list of (start_char_index, end_char_index)."""
         search_lines = search.splitlines()
         if len(search_lines) < 3:
@@ -461,58 +590,96 @@ class DiffApplyer:
             )
             return []  # Avoid matching purely on whitespace anchors
 
-        content_lines = content.splitlines()
-        match_locations = []
-        num_content_lines = len(content_lines)
-
+        num_content_lines = len(index)
         if search_len_lines > num_content_lines:
             return []
 
-        for i in range(num_content_lines - search_len_lines + 1):
-            first_content_line = content_lines[i]
-            last_content_line = content_lines[i + search_len_lines - 1]
+        # Walk the occurrences of whichever anchor is rarer, then check the other.
+        if index.counts[search_first_stripped] <= index.counts[search_last_stripped]:
+            candidates: Iterable[int] = index.occurrences(search_first_stripped)
+        else:
+            candidates = (
+                i - search_len_lines + 1
+                for i in index.occurrences(search_last_stripped)
+            )
 
+        match_locations = []
+        for i in candidates:
             if (
-                first_content_line.strip() == search_first_stripped
-                and last_content_line.strip() == search_last_stripped
+                0 <= i <= num_content_lines - search_len_lines
+                and index.stripped[i] == search_first_stripped
+                and index.stripped[i + search_len_lines - 1] == search_last_stripped
             ):
-                # Calculate precise start and end character indices
-                start_char_index = self._line_num_to_char_index(content_lines, i)
-                end_char_index = self._line_num_to_char_index(
-                    content_lines, i + search_len_lines
+                match_locations.append(
+                    (index.line_to_char(i), index.line_end(i + search_len_lines - 1))
                 )
-                match_locations.append((start_char_index, end_char_index))
 
         return match_locations
 
     def _find_best_fuzzy_match_info(
-        self, content_to_search_in: str, search_block: str
+        self, index: LineIndex, search_block: str
     ) -> tuple[float, str | None, str | None, tuple[int, int] | None]:
         """Finds the best fuzzy match for error reporting. Returns (score, best_match_snippet, context_snippet, (start_line, end_line))."""
-        if not search_block or not content_to_search_in:
+        if not search_block or not index.text:
             return 0.0, None, None, None
 
         search_lines = search_block.splitlines()
-        content_lines = content_to_search_in.splitlines()
+        content_lines = index.lines
         len_search = len(search_lines)
         len_content = len(content_lines)
 
         if len_search == 0 or len_content == 0 or len_search > len_content:
             return 0.0, None, None, None
 
+        deadline = time.perf_counter() + self.fuzzy_time_budget
+
+        # 1. Pre-filter: score each line, then rank windows by the sum of their
+        #    line scores (prefix sums keep this linear). Lines that occur in the
+        #    search block verbatim (modulo indentation) are found by hashing;
+        #    only when there are none does each line get a slower token count.
+        search_set = {line.strip() for line in search_lines} - {""}
+        line_scores: list[int] = [line in search_set for line in index.stripped]
+        if not any(line_scores):
+            search_tokens = set(_TOKEN_RE.findall(search_block))
+            line_scores = []
+            for line_num, line in enumerate(index.stripped):
+                if line_num % 4096 == 0 and time.perf_counter() > deadline:
+                    break
+                line_scores.append(
+                    len(search_tokens.intersection(_TOKEN_RE.findall(line)))
+                )
+        scanned = len(line_scores)
+        if scanned < len_search:
+            return 0.0, None, None, None
+        prefix = [0, *accumulate(line_scores)]
+        candidates = heapq.nlargest(
+            FUZZY_PREFILTER_CANDIDATES,
+            range(scanned - len_search + 1),
+            key=lambda i: prefix[i + len_search] - prefix[i],
+        )
+
+        # 2. Rank the survivors by SequenceMatcher's cheap upper bounds.
+        matcher = SequenceMatcher(isjunk=None, autojunk=False)
+        matcher.set_seq2(search_block)  # seq2 is the side SequenceMatcher caches
+        bounded: list[tuple[float, int]] = []
+        for i in candidates:
+            matcher.set_seq1("\n".join(content_lines[i : i + len_search]))
+            if matcher.real_quick_ratio() > 0:
+                bounded.append((matcher.quick_ratio(), i))
+        bounded.sort(key=lambda item: (-item[0], item[1]))
+
+        # 3. Exact ratio only for the most promising few, within the time budget.
         best_score = 0.0
         best_match_line_indices = None  # Store 0-based line indices
-
-        # Iterate through all possible subsegments of content_lines matching search_lines length
-        for i in range(len_content - len_search + 1):
-            original_slice_lines = content_lines[i : i + len_search]
-            original_slice_str = "\n".join(original_slice_lines)
-            # Use SequenceMatcher on the joined strings for fuzzy comparison
-            similarity = _get_similarity(original_slice_str, search_block)
-
+        for upper_bound, i in bounded[:FUZZY_EXACT_CANDIDATES]:
+            if upper_bound <= best_score:
+                break
+            if best_match_line_indices is not None and time.perf_counter() > deadline:
+                break
+            matcher.set_seq1("\n".join(content_lines[i : i + len_search]))
+            similarity = matcher.ratio()
             if similarity > best_score:
                 best_score = similarity
-                # Store 0-based line indices
                 best_match_line_indices = (i, i + len_search)
 
         if best_match_line_indices is None:
@@ -724,6 +891,70 @@ class DiffApplyer:
         log.info("Ellipsis block applied successfully.")
         return temp_content, None
 
+    def _plan_single_pass(
+        self,
+        original_content: str,
+        index: LineIndex,
+        blocks: list[tuple[str, str]],
+        line_ending: str,
+    ) -> list[tuple[int, int, str, MatchResult]] | None:
+        """Locates every block in the original content for a one-shot splice.
+
+        Returns `(start, end, replacement, match)` per block, or None when the
+        blocks must be applied one after another: a block is not a unique
+        exact/whitespace match in the original, the spans overlap or share a
+        line, or a block could match differently once earlier blocks have been
+        applied. The last check is conservative: a block counts as dependent
+        if any of its non-blank lines occurs in an earlier replacement or in
+        the original lines near an earlier span.
+        """
+        plan: list[tuple[int, int, str, MatchResult]] = []
+        for search, replace in blocks:
+            match = self._find_match(original_content, search, index, suggest=False)
+            if not (match.found and match.is_unique):
+                return None
+            if match.match_type not in ("exact", "whitespace"):
+                return None  # Anchor windows depend on line counts between anchors
+            assert match.start_index is not None and match.end_index is not None
+            replacement = self._apply_indentation(
+                original_content[match.start_index : match.end_index],
+                search,
+                replace,
+                line_ending,
+            )
+            plan.append((match.start_index, match.end_index, replacement, match))
+
+        # (first line, last line, lines of the span after replacement)
+        edited: list[tuple[int, int, list[str]]] = []
+        for start, end, replacement, _ in plan:
+            first, last = index.char_to_line(start), index.char_to_line(end)
+            if edited and first <= edited[-1][1]:
+                return None
+            merged = (
+                original_content[index.line_to_char(first) : start]
+                + replacement
+                + original_content[end : index.line_end(last)]
+            )
+            edited.append((first, last, [line.strip() for line in merged.splitlines()]))
+
+        # Line numbers shift by at most this much between the original and any
+        # intermediate state of a sequential application.
+        slack = sum(
+            abs(len(lines) - (last - first + 1)) for first, last, lines in edited
+        )
+        for k in range(1, len(plan)):
+            search_lines = [
+                line.strip() for line in blocks[k][0].splitlines() if line.strip()
+            ]
+            reach = len(blocks[k][0].splitlines()) + slack
+            nearby: list[str] = []
+            for first, last, lines in edited[:k]:
+                nearby += lines
+                nearby += index.stripped[max(0, first - reach) : last + reach + 1]
+            if any(s in line for s in search_lines for line in nearby):
+                return None
+        return plan
+
     def apply_diff(self, original_content: str, diff_content: str) -> ApplyDiffResult:
         """
         Applies the multi-block diff string sequentially, stopping on the first error.
@@ -753,12 +984,7 @@ class DiffApplyer:
             )
 
         # --- 2. Block Parsing ---
-        # Regex to find blocks, ensuring markers are at line start/end properly
-        # Handles optional newline before ======= and >>>>>>>
-        # Uses non-capturing group (?: ) for marker prefixes
-        # Correctly handles escaped markers using negative lookbehind (?<!\\)
-        regex_pattern = r"(?:^|\n)(?<!\\)<<<<<<< SEARCH\s*\n([\s\S]*?)(?:\n?)(?<!\\)=======\s*\n([\s\S]*?)(?:\n?)(?<!\\)>>>>>>> REPLACE(?=\n|$)"
-        matches = list(re.finditer(regex_pattern, diff_content))
+        matches = list(_BLOCK_RE.finditer(diff_content))
 
         if not matches:
             # If content exists but no blocks found, it's a parsing error
@@ -777,23 +1003,63 @@ class DiffApplyer:
                 ],
             )
 
-        # --- 3. Sequential Block Application ---
+        blocks = [
+            (self._unescape_markers(m.group(1)), self._unescape_markers(m.group(2)))
+            for m in matches
+        ]
         current_content = original_content
-        applied_blocks_info: list[AppliedBlockInfo] = []
-        failed_blocks_info: list[FailedBlockInfo] = []  # Should contain max 1 item
+        # Built once per pass and kept current as blocks are applied.
+        index = LineIndex(current_content)
         line_ending = "\r\n" if "\r\n" in original_content else "\n"
         dots_re = re.compile(
             r"^\s*\.\.\.\s*$", re.MULTILINE
         )  # Simple check for ellipsis lines
 
-        for i, match in enumerate(matches):
-            search_raw = match.group(1)
-            replace_raw = match.group(2)
+        # --- 3. Single-Pass Application of Independent Blocks ---
+        # Blocks that each match once in the original and cannot affect each
+        # other's matches are spliced in with a single join.
+        has_any_ellipsis = any(
+            dots_re.search(search) and dots_re.search(replace)
+            for search, replace in blocks
+        )
+        plan = (
+            None
+            if len(blocks) < 2 or has_any_ellipsis
+            else self._plan_single_pass(original_content, index, blocks, line_ending)
+        )
+        if plan is not None:
+            pieces: list[str] = []
+            applied_blocks_info: list[AppliedBlockInfo] = []
+            position = 0
+            delta = 0
+            for i, (start, end, replacement, match_result) in enumerate(plan):
+                pieces += [original_content[position:start], replacement]
+                applied_blocks_info.append(
+                    AppliedBlockInfo(
+                        original_index=i,
+                        match_type=match_result.match_type,
+                        applied_at_char_index=start + delta,
+                        similarity_score=match_result.similarity_score
+                        if match_result.match_type != "exact"
+                        else None,
+                    )
+                )
+                position = end
+                delta += len(replacement) - (end - start)
+            pieces.append(original_content[position:])
+            log.info(f"Applied all {len(plan)} blocks in a single pass.")
+            return ApplyDiffResult(
+                success=True,
+                final_content="".join(pieces),
+                applied_blocks=applied_blocks_info,
+            )
 
-            search_final = self._unescape_markers(search_raw)
-            replace_final = self._unescape_markers(replace_raw)
+        # --- 4. Sequential Block Application ---
+        applied_blocks_info = []
+        failed_blocks_info: list[FailedBlockInfo] = []  # Should contain max 1 item
 
-            log.debug(f"--- Processing Block {i + 1}/{len(matches)} ---")
+        for i, (search_final, replace_final) in enumerate(blocks):
+            log.debug(f"--- Processing Block {i + 1}/{len(blocks)} ---")
             log.debug(f"SEARCH (unescaped):\n{search_final[:100]}...")
             log.debug(f"REPLACE (unescaped):\n{replace_final[:100]}...")
 
@@ -834,7 +1100,7 @@ class DiffApplyer:
                     )  # Mark success, indices less relevant here
             else:
                 # Standard block: Find match in the *current* content
-                match_result = self._find_match(current_content, search_final)
+                match_result = self._find_match(current_content, search_final, index)
 
             # --- Handle Match Result (Standard or Ellipsis Success/Failure) ---
             if match_result and match_result.found and match_result.is_unique:
@@ -846,6 +1112,7 @@ class DiffApplyer:
                 if match_result.match_type == "ellipsis":
                     # Content already updated by _handle_ellipsis_block
                     current_content = applied_content
+                    index = LineIndex(current_content)
                     applied_at_index = (
                         -1
                     )  # Index less meaningful for multi-part ellipsis
@@ -865,11 +1132,8 @@ class DiffApplyer:
                         line_ending,
                     )
 
-                    current_content = (
-                        current_content[:match_start]
-                        + replace_final_indented
-                        + current_content[match_end:]
-                    )
+                    index.apply_edit(match_start, match_end, replace_final_indented)
+                    current_content = index.text
                     applied_at_index = match_start
 
                 applied_blocks_info.append(
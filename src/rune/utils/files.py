@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+from typing import IO, NamedTuple
+
+import pathspec
+
+RANGE_HASH_LENGTH = 16  # Hex digits of a line-range hash; enough to detect edits
+HASH_CHUNK = 1024 * 1024  # Bytes read at a time by file_hash
+# Whether file writes are flushed to disk before they replace the file; off
+# unless RUNE_FSYNC_WRITES=1, since it makes every edit wait on the disk
+FSYNC_WRITES = os.getenv("RUNE_FSYNC_WRITES", "") not in ("", "0")
+
+# What a FileTransaction restores if its commit fails: text, bytes, a file
+# holding the content, or None to delete the target
+Previous = str | bytes | Path | None
+
+
+class FileFingerprint(NamedTuple):
+    """Cheap identity of a file's current state, taken from a single `stat`."""
+
+    path: Path
+    mtime_ns: int
+    size: int
+
+
+def fingerprint(path: Path) -> FileFingerprint:
+    """Returns the fingerprint of *path* without reading its content."""
+    st = path.stat()
+    return FileFingerprint(path, st.st_mtime_ns, st.st_size)
+
+
+def content_hash(data: str | bytes) -> str:
+    """Returns a stable hex digest for *data* (text is hashed as UTF-8)."""
+    if isinstance(data, str):
+        data = data.encode("utf-8", errors="surrogatepass")
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_hash(path: Path) -> str:
+    """Returns the `content_hash` of the file at *path*, reading it in chunks."""
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(HASH_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def line_range_hash(lines: list[str]) -> str:
+    """Short digest of a range of lines (without terminators), as shown by read_file."""
+    return content_hash("\n".join(lines))[:RANGE_HASH_LENGTH]
+
+
+def load_ignore_spec(start_dir: Path) -> pathspec.PathSpec:
+    """Builds the ignore spec from defaults plus every .gitignore/.runeignore up to the git root."""
+    patterns: list[str] = [
+        ".git/",
+        ".venv/",
+        "__pycache__/",
+        ".pytest_cache/",
+        ".ruff_cache/",
+    ]
+
+    current = start_dir.resolve()
+    try:
+        git_root_str = subprocess.check_output(
+            ["git", "rev-parse", "--show-toplevel"],
+            cwd=current,
+            text=True,
+            stderr=subprocess.DEVNULL,
+        ).strip()
+        git_root = Path(git_root_str).resolve()
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        git_root = None
+
+    # Walk up from the start_dir to the git_root (or filesystem root)
+    while True:
+        for fname in (".gitignore", ".runeignore"):
+            f = current / fname
+            if f.is_file():
+                try:
+                    patterns.extend(f.read_text().splitlines())
+                except OSError:
+                    pass  # Ignore files we can't read
+
+        # Stop if we have reached the git root, or the filesystem root
+        if (git_root and current == git_root) or current.parent == current:
+            break
+        current = current.parent
+
+    return pathspec.PathSpec.from_lines("gitwildmatch", patterns)
+
+
+def _default_file_mode() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def _fsync_dir(directory: Path) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return  # Directories cannot be opened on Windows; replace is durable there
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass  # Some filesystems do not support syncing directories
+    finally:
+        os.close(fd)
+
+
+class FileTransaction:
+    """Replaces the content of several files all-or-nothing.
+
+    `stage` writes each new content to a temp file next to its target, so
+    nothing visible changes until `commit` moves every temp file into place
+    with `os.replace`. If a replace fails part-way, the targets already
+    replaced are restored from their previous content: text, bytes, or a
+    file holding it. `stage_copy` takes the new content from a file and
+    `stage_delete` schedules a removal the same way. Leaving the `with`
+    block without committing discards whatever was staged.
+
+    With `fsync=True` (by default FSYNC_WRITES), each temp file is flushed
+    to disk before it is moved and the directories are synced after, so a
+    crash leaves either the old or the new content rather than an empty file.
+    """
+
+    def __init__(self, *, fsync: bool | None = None) -> None:
+        self._fsync = FSYNC_WRITES if fsync is None else fsync
+        # (target, temp file or None to delete, previous content or None, encoding)
+        self._staged: list[tuple[Path, Path | None, Previous, str]] = []
+
+    def __enter__(self) -> FileTransaction:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.abort()
+
+    def _stage(
+        self,
+        path: Path,
+        write: Callable[[IO], object],
+        *,
+        binary: bool,
+        previous: Previous,
+        encoding: str,
+    ) -> None:
+        fd, tmp_name = tempfile.mkstemp(
+            prefix=f".{path.name}.", suffix=".tmp", dir=path.parent
+        )
+        tmp = Path(tmp_name)
+        try:
+            with os.fdopen(
+                fd, "wb" if binary else "w", encoding=None if binary else encoding
+            ) as f:
+                write(f)
+                if self._fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            if path.exists():
+                shutil.copymode(path, tmp)
+            else:
+                tmp.chmod(_default_file_mode())
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        self._staged.append((path, tmp, previous, encoding))
+
+    def stage(
+        self,
+        path: Path,
+        text: str,
+        *,
+        previous: Previous,
+        encoding: str = "utf-8",
+    ) -> None:
+        self._stage(
+            path,
+            lambda f: f.write(text),
+            binary=False,
+            previous=previous,
+            encoding=encoding,
+        )
+
+    def stage_copy(self, path: Path, source: Path, *, previous: Previous) -> None:
+        """Stages the content of *source*, copied in chunks rather than read whole."""
+        with source.open("rb") as src:
+            self._stage(
+                path,
+                lambda f: shutil.copyfileobj(src, f),
+                binary=True,
+                previous=previous,
+                encoding="utf-8",
+            )
+
+    def stage_delete(
+        self, path: Path, *, previous: str | bytes | Path, encoding: str = "utf-8"
+    ) -> None:
+        self._staged.append((path, None, previous, encoding))
+
+    def abort(self) -> None:
+        for _, tmp, _, _ in self._staged:
+            if tmp is not None:
+                tmp.unlink(missing_ok=True)
+        self._staged = []
+
+    def commit(self) -> None:
+        replaced: list[tuple[Path, Path | None, Previous, str]] = []
+        try:
+            for staged in self._staged:
+                path, tmp = staged[0], staged[1]
+                if tmp is None:
+                    path.unlink()
+                else:
+                    os.replace(tmp, path)
+                replaced.append(staged)
+        except OSError:
+            for path, _, previous, encoding in reversed(replaced):
+                if previous is None:
+                    path.unlink(missing_ok=True)
+                elif isinstance(previous, Path):
+                    shutil.copyfile(previous, path)
+                elif isinstance(previous, bytes):
+                    path.write_bytes(previous)
+                else:
+                    path.write_text(previous, encoding=encoding)
+            self._staged = [s for s in self._staged if s not in replaced]
+            self.abort()
+            raise
+        if self._fsync:
+            for directory in {path.parent for path, *_ in self._staged}:
+                _fsync_dir(directory)
+        self._staged = []
+
+
+def atomic_write_text(
+    path: Path, text: str, *, encoding: str = "utf-8", fsync: bool | None = None
+) -> None:
+    """Replaces *path* with *text* so readers never observe a partial file."""
+    with FileTransaction(fsync=fsync) as txn:
+        # A single replace either happens or not, so there is nothing to restore.
+        txn.stage(path, text, previous=None, encoding=encoding)
+        txn.commit()
@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import os
+import signal
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+MAX_LOG_DIR_BYTES = 256 * 1024 * 1024  # Total size of .rune/logs kept on disk
+MAX_JOB_LOG_BYTES = 32 * 1024 * 1024  # A log is moved to <pid>.log.1 at this size
+KILL_GRACE = 3.0  # Seconds between SIGTERM and SIGKILL in `kill`
+READ_CHUNK = 64 * 1024  # Bytes read from a job's output pipe at a time
+
+
+@dataclass
+class Job:
+    """A command started with `run_command(background=True)`."""
+
+    id: int
+    command: str
+    pid: int  # Also the process group id: jobs start in a new session
+    log_path: Path
+    started: float  # time.monotonic()
+    proc: subprocess.Popen
+    exit_code: int | None = None
+    ended: float | None = None
+    cpu_time: float | None = None  # Seconds, as of the last sample or the reap
+    peak_rss: int | None = None  # Bytes, the highest seen
+    killed: bool = False
+    rotations: int = 0  # Times the log was full and moved to <pid>.log.1
+    tailed_rotations: int = 0  # Rotations `job_tail` has already accounted for
+    pump: threading.Thread | None = None  # Copies the output into the log
+
+    @property
+    def running(self) -> bool:
+        return self.exit_code is None
+
+    @property
+    def rotated_log_path(self) -> Path:
+        return self.log_path.with_name(self.log_path.name + ".1")
+
+
+def _pump_log(job: Job, stream: BinaryIO, log: BinaryIO, max_bytes: int) -> None:
+    """Copies a job's output to its log, rotating the log when it is full."""
+    size = 0
+    try:
+        while chunk := stream.read1(READ_CHUNK):
+            while chunk:
+                if size >= max_bytes:
+                    log.close()
+                    os.replace(job.log_path, job.rotated_log_path)
+                    log = job.log_path.open("wb", buffering=0)
+                    size = 0
+                    job.rotations += 1
+                part, chunk = chunk[: max_bytes - size], chunk[max_bytes - size :]
+                log.write(part)
+                size += len(part)
+    finally:
+        log.close()
+        stream.close()
+
+
+def _group_usage(pgid: int) -> tuple[float, int] | None:
+    """CPU seconds and resident bytes of every live process in group *pgid*.
+
+    Read from /proc, so None where that is not available.
+    """
+    proc_dir = Path("/proc")
+    if not proc_dir.is_dir():
+        return None
+    ticks = os.sysconf("SC_CLK_TCK")
+    page = os.sysconf("SC_PAGE_SIZE")
+    cpu, rss, found = 0.0, 0, False
+    for entry in proc_dir.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue  # Exited while scanning
+        # Fields after the parenthesised command name, which may contain spaces.
+        fields = stat[stat.rindex(")") + 2 :].split()
+        if int(fields[2]) != pgid:
+            continue
+        found = True
+        cpu += (int(fields[11]) + int(fields[12])) / ticks
+        rss += int(fields[21]) * page
+    return (cpu, rss) if found else None
+
+
+def prune_logs(log_dir: Path, max_bytes: int, keep: set[Path]) -> list[Path]:
+    """Deletes the oldest files in *log_dir* until it holds at most *max_bytes*.
+
+    Files in *keep* (logs of running jobs) are never deleted. Returns the
+    deleted paths.
+    """
+    if not log_dir.is_dir():
+        return []
+    files = []
+    for path in log_dir.iterdir():
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        if path.is_file():
+            files.append((st.st_mtime, st.st_size, path))
+    total = sum(size for _, size, _ in files)
+    deleted = []
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        if path in keep:
+            continue
+        path.unlink(missing_ok=True)
+        total -= size
+        deleted.append(path)
+    return deleted
+
+
+class JobTable:
+    """The background jobs of a session, by id.
+
+    Each job runs in its own process group. A thread copies its stdout and
+    stderr to `.rune/logs/<pid>.log`, moving a full log to `<pid>.log.1` so
+    a job keeps at most 2 * MAX_JOB_LOG_BYTES on disk. Exit codes are
+    collected with `os.wait4` so the CPU time and peak memory of finished
+    jobs can still be reported. Starting a job prunes old logs to
+    MAX_LOG_DIR_BYTES; `close` kills the jobs still running.
+    """
+
+    def __init__(self) -> None:
+        self._jobs: dict[int, Job] = {}
+
+    def __iter__(self):
+        return iter(self._jobs.values())
+
+    def get(self, job_id: int) -> Job:
+        try:
+            return self._jobs[job_id]
+        except KeyError:
+            known = ", ".join(str(i) for i in self._jobs) or "none"
+            raise ValueError(f"No job {job_id} (known jobs: {known}).") from None
+
+    def start(self, command: str, cwd: Path) -> Job:
+        log_dir = cwd / ".rune" / "logs"
+        log_dir.mkdir(parents=True, exist_ok=True)
+        prune_logs(
+            log_dir,
+            MAX_LOG_DIR_BYTES,
+            keep={
+                path
+                for job in self
+                if self.poll(job).running
+                for path in (job.log_path, job.rotated_log_path)
+            },
+        )
+        proc = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            cwd=cwd,
+            shell=True,
+            start_new_session=True,
+        )
+        assert proc.stdout is not None
+        log_path = log_dir / f"{proc.pid}.log"
+        try:
+            log = log_path.open("wb", buffering=0)
+        except BaseException:
+            proc.stdout.close()
+            os.killpg(proc.pid, signal.SIGKILL)
+            proc.wait()
+            raise
+        job = Job(
+            id=max(self._jobs, default=0) + 1,
+            command=command,
+            pid=proc.pid,
+            log_path=log_path,
+            started=time.monotonic(),
+            proc=proc,
+        )
+        job.pump = threading.Thread(
+            target=_pump_log,
+            args=(job, proc.stdout, log, MAX_JOB_LOG_BYTES),
+            name=f"job-{job.id}-log",
+            daemon=True,
+        )
+        job.pump.start()
+        self._jobs[job.id] = job
+        return job
+
+    def poll(self, job: Job) -> Job:
+        """Updates *job* if it has exited since the last poll."""
+        if not job.running:
+            return job
+        if hasattr(os, "wait4"):
+            try:
+                pid, status, usage = os.wait4(job.pid, os.WNOHANG)
+            except ChildProcessError:
+                pid, status, usage = job.pid, None, None  # Reaped elsewhere
+            if pid == 0:
+                return job
+            if status is not None:
+                job.proc.returncode = os.waitstatus_to_exitcode(status)
+            if usage is not None:
+                # Only covers the leader and the children it reaped, so keep
+                # whatever the group was last seen using if that is more.
+                job.cpu_time = max(job.cpu_time or 0.0, usage.ru_utime + usage.ru_stime)
+                job.peak_rss = max(job.peak_rss or 0, usage.ru_maxrss * 1024)  # KiB
+        job.exit_code = job.proc.poll()
+        if job.exit_code is not None:
+            job.ended = time.monotonic()
+            if job.pump is not None:
+                # Let the log catch up; a leftover child may keep the pipe open.
+                job.pump.join(timeout=0.5)
+        return job
+
+    def _sample(self, job: Job) -> tuple[float, int] | None:
+        """Current usage of a running job's process group, also kept on *job*."""
+        usage = _group_usage(job.pid)
+        if usage is not None:
+            job.cpu_time = max(job.cpu_time or 0.0, usage[0])
+            job.peak_rss = max(job.peak_rss or 0, usage[1])
+        return usage
+
+    def status(self, job: Job) -> dict:
+        """What `job_status` and `jobs_list` report for *job*."""
+        usage = self._sample(job) if job.running else None
+        self.poll(job)
+        end = job.ended if job.ended is not None else time.monotonic()
+        if job.running:
+            state = "running"
+        else:
+            state = "killed" if job.killed else "exited"
+        info: dict = {
+            "id": job.id,
+            "pid": job.pid,
+            "command": job.command,
+            "state": state,
+            "exit_code": job.exit_code,
+            "runtime_s": round(end - job.started, 1),
+            "log_file": str(job.log_path),
+            "log_bytes": job.log_path.stat().st_size if job.log_path.exists() else 0,
+        }
+        if job.rotations:
+            info["log_rotations"] = job.rotations  # Older output is in <log>.1
+        if job.running:
+            if usage is not None:
+                info["cpu_time_s"] = round(usage[0], 2)
+                info["rss_mb"] = round(usage[1] / 2**20, 1)
+        elif job.cpu_time is not None:
+            info["cpu_time_s"] = round(job.cpu_time, 2)
+            info["peak_rss_mb"] = round((job.peak_rss or 0) / 2**20, 1)
+        return info
+
+    def send_signal(self, job: Job, sig: int) -> None:
+        """Sends *sig* to the job's whole process group."""
+        try:
+            os.killpg(job.pid, sig)
+        except ProcessLookupError:
+            pass  # Everything in the group has exited already
+
+    def kill(self, job: Job, *, force: bool = False) -> None:
+        """Sends SIGTERM (or SIGKILL with *force*) to the job's process group.
+
+        Escalates to SIGKILL if the job is still running after KILL_GRACE
+        seconds.
+        """
+        if not self.poll(job).running:
+            return
+        self._sample(job)
+        job.killed = True
+        self.send_signal(job, signal.SIGKILL if force else signal.SIGTERM)
+        deadline = time.monotonic() + KILL_GRACE
+        while self.poll(job).running and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if job.running:
+            self.send_signal(job, signal.SIGKILL)
+            while self.poll(job).running:
+                time.sleep(0.01)
+
+    def close(self) -> None:
+        """Stops every job that is still running, e.g. when the session ends."""
+        running = [job for job in self if self.poll(job).running]
+        for job in running:
+            job.killed = True
+            self.send_signal(job, signal.SIGTERM)
+        deadline = time.monotonic() + KILL_GRACE
+        while any(self.poll(job).running for job in running):
+            if time.monotonic() > deadline:
+                for job in running:
+                    if job.running:
+                        self.send_signal(job, signal.SIGKILL)
+                deadline = float("inf")  # Only once
+            time.sleep(0.01)
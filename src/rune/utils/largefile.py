@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import mmap
+import os
+import shutil
+import tempfile
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+COPY_CHUNK = 8 * 1024 * 1024  # Bytes copied (and scanned for newlines) at a time
+HUNK_MAX_LINES = 20  # Lines shown per side of a block's hunk
+
+
+@dataclass
+class StreamedBlock:
+    """Where one SEARCH/REPLACE block landed in a streamed edit (1-based lines)."""
+
+    old_start: int
+    new_start: int
+    search: str
+    replace: str
+
+    def hunk(self) -> str:
+        """A unified-diff hunk for this block alone, capped at HUNK_MAX_LINES a side."""
+        old_lines = self.search.splitlines()
+        new_lines = self.replace.splitlines()
+        out = [
+            f"@@ -{self.old_start},{len(old_lines)} "
+            f"+{self.new_start},{len(new_lines)} @@\n"
+        ]
+        for prefix, lines in (("-", old_lines), ("+", new_lines)):
+            out.extend(f"{prefix}{line}\n" for line in lines[:HUNK_MAX_LINES])
+            if len(lines) > HUNK_MAX_LINES:
+                out.append(f"# {len(lines) - HUNK_MAX_LINES} more lines omitted\n")
+        return "".join(out)
+
+
+def _count_newlines(mm: mmap.mmap, start: int, end: int) -> int:
+    count = 0
+    for offset in range(start, end, COPY_CHUNK):
+        count += mm[offset : min(offset + COPY_CHUNK, end)].count(b"\n")
+    return count
+
+
+def _copy_range(mm: mmap.mmap, start: int, end: int, out) -> None:
+    for offset in range(start, end, COPY_CHUNK):
+        out.write(mm[offset : min(offset + COPY_CHUNK, end)])
+
+
+def stream_replace(
+    path: Path,
+    blocks: list[tuple[str, str]],
+    *,
+    encoding: str = "utf-8",
+    before_replace: Callable[[], None] | None = None,
+) -> list[StreamedBlock]:
+    """Applies exact SEARCH/REPLACE *blocks* to *path* without loading it into memory.
+
+    Each SEARCH text is located in the original file with `mmap.find` and
+    must occur exactly once; blocks may not overlap. The result is written to
+    a temp file next to *path* (untouched regions are copied COPY_CHUNK bytes
+    at a time) which then replaces *path* with `os.replace`. Line endings in
+    the blocks follow the file's. Raises ValueError if a block cannot be
+    placed, leaving *path* untouched. *before_replace* is called once the new
+    file is complete, just before it replaces *path*.
+    """
+    if path.stat().st_size == 0:
+        raise ValueError("Cannot stream-edit an empty file.")
+
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        first_newline = mm.find(b"\n")
+        crlf = first_newline > 0 and mm[first_newline - 1] == ord("\r")
+
+        def encode(text: str) -> bytes:
+            if crlf:
+                text = text.replace("\r\n", "\n").replace("\n", "\r\n")
+            return text.encode(encoding)
+
+        spans: list[tuple[int, int, bytes, int]] = []
+        for number, (search, replace) in enumerate(blocks, 1):
+            needle = encode(search)
+            if not needle:
+                raise ValueError(
+                    f"Block {number}: the SEARCH section is empty. Large files only "
+                    "support replacing existing text."
+                )
+            start = mm.find(needle)
+            if start < 0:
+                raise ValueError(
+                    f"Block {number}: SEARCH text not found. Large files are matched "
+                    "exactly (no whitespace, fuzzy or `...` matching); copy the "
+                    "lines verbatim from read_file."
+                )
+            if mm.find(needle, start + 1) >= 0:
+                raise ValueError(
+                    f"Block {number}: SEARCH text occurs more than once; include "
+                    "more surrounding lines to make it unique."
+                )
+            spans.append((start, start + len(needle), encode(replace), number))
+
+        spans.sort()
+        for (_, prev_end, _, prev), (start, _, _, number) in zip(spans, spans[1:]):
+            if start < prev_end:
+                raise ValueError(f"Blocks {prev} and {number} overlap.")
+
+        results: list[StreamedBlock] = []  # In file order
+        fd, tmp_name = tempfile.mkstemp(
+            prefix=f".{path.name}.", suffix=".tmp", dir=path.parent
+        )
+        tmp = Path(tmp_name)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                position = 0
+                line = 1
+                shift = 0  # New-file line number minus old-file line number
+                for start, end, new_bytes, number in spans:
+                    line += _count_newlines(mm, position, start)
+                    _copy_range(mm, position, start, out)
+                    out.write(new_bytes)
+                    search, replace = blocks[number - 1]
+                    results.append(StreamedBlock(line, line + shift, search, replace))
+                    old_newlines = _count_newlines(mm, start, end)
+                    line += old_newlines
+                    shift += new_bytes.count(b"\n") - old_newlines
+                    position = end
+                _copy_range(mm, position, len(mm), out)
+            shutil.copymode(path, tmp)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+
+    # Replace only after the map is closed; some platforms refuse otherwise.
+    try:
+        if before_replace is not None:
+            before_replace()
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return results
@@ -0,0 +1,408 @@
+from __future__ import annotations
+
+import bisect
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+from rune.utils.files import content_hash
+
+DEFAULT_TIME_BUDGET = 1.0  # Seconds before falling back to a summary
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024  # Combined size above which no diff is attempted
+MYERS_MAX_EDITS = 400  # Larger anchorless gaps are reported as one replaced block
+COMPACT_CONTEXT = 1  # Context lines around changes in diffs sent to the model
+COMPACT_MAX_LINES = 120  # Hunk lines sent to the model before hunks shrink to headers
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+@dataclass
+class DiffSummary:
+    """What changed, for when a full diff was too large or too slow to compute."""
+
+    reason: str
+    added: int
+    removed: int
+    # Changed region, 1-based and inclusive: (old_start, old_end, new_start, new_end)
+    region: tuple[int, int, int, int] | None = None
+
+    def describe(self, path: str) -> str:
+        text = f"# Diff of {path} omitted ({self.reason}): +{self.added} -{self.removed} lines"
+        if self.region:
+            old_start, old_end, new_start, new_end = self.region
+            text += f", changes within old lines {old_start}-{old_end} / new lines {new_start}-{new_end}"
+        return text + ".\n"
+
+
+@dataclass
+class DiffResult:
+    path: str
+    text: str | None = None  # The unified diff; None if unchanged or summarised
+    summary: DiffSummary | None = None
+    hunks: list[str] = field(default_factory=list)  # Each hunk, header included
+    header: str = ""  # The "---" / "+++" lines
+    # Kept to re-render the diff with less context, see compact().
+    _old: list[str] = field(default_factory=list, repr=False)
+    _new: list[str] = field(default_factory=list, repr=False)
+    _ops: list[tuple[str, int, int, int, int]] = field(default_factory=list, repr=False)
+
+    def as_text(self) -> str | None:
+        """The diff, or a one-line summary if it was not computed; None if unchanged."""
+        if self.summary is not None:
+            return self.summary.describe(self.path)
+        return self.text
+
+    def compact(
+        self, *, context: int = COMPACT_CONTEXT, max_lines: int = COMPACT_MAX_LINES
+    ) -> str | None:
+        """A budgeted rendering of the diff for the model.
+
+        Hunks keep *context* lines around each change. Once *max_lines* hunk
+        lines have been emitted, the remaining hunks are listed by header only.
+        New content written over an empty file is described by its line count
+        and hash rather than echoed back line by line.
+        """
+        if self.text is None:
+            return self.as_text()
+        if not self._old:
+            new_text = "".join(self._new)
+            return (
+                f"{self.header}# New content: {len(self._new)} lines, "
+                f"sha256 {content_hash(new_text)}\n"
+            )
+
+        out = [self.header]
+        emitted = omitted = 0
+        for group in _grouped(self._ops, context):
+            hunk = _format_hunk(group, self._old, self._new)
+            if emitted + len(hunk) - 1 <= max_lines:
+                out += hunk
+                emitted += len(hunk) - 1
+            else:
+                out.append(hunk[0])
+                omitted += len(hunk) - 1
+        if omitted:
+            out.append(
+                f"# {omitted} more diff lines omitted; re-read the file for details.\n"
+            )
+        return "".join(out)
+
+
+# --- Matching ---
+
+
+def _unique_common(
+    a: list[str], alo: int, ahi: int, b: list[str], blo: int, bhi: int
+) -> list[tuple[int, int]]:
+    """Pairs (i, j) of lines occurring exactly once in each region, in a-order."""
+    a_lines, b_lines = a[alo:ahi], b[blo:bhi]
+    a_counts, b_counts = Counter(a_lines), Counter(b_lines)
+    b_pos = {line: j for j, line in enumerate(b_lines, blo)}
+    return [
+        (i, b_pos[line])
+        for i, line in enumerate(a_lines, alo)
+        if a_counts[line] == 1 and b_counts[line] == 1
+    ]
+
+
+def _longest_increasing(pairs: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Longest subsequence of *pairs* (sorted by i) whose j values increase."""
+    tails: list[int] = []  # j of the last pair of the best run of each length
+    tail_idx: list[int] = []
+    prev: list[int] = [-1] * len(pairs)
+    for idx, (_, j) in enumerate(pairs):
+        # Most pairs extend the longest run, which needs no search.
+        pos = len(tails) if not tails or j > tails[-1] else bisect.bisect_left(tails, j)
+        if pos == len(tails):
+            tails.append(j)
+            tail_idx.append(idx)
+        else:
+            tails[pos] = j
+            tail_idx[pos] = idx
+        prev[idx] = tail_idx[pos - 1] if pos else -1
+    result = []
+    idx = tail_idx[-1] if tail_idx else -1
+    while idx != -1:
+        result.append(pairs[idx])
+        idx = prev[idx]
+    return result[::-1]
+
+
+def _myers(
+    a: list[str],
+    alo: int,
+    ahi: int,
+    b: list[str],
+    blo: int,
+    bhi: int,
+    deadline: float,
+) -> list[tuple[int, int, int]] | None:
+    """Matching blocks of a shortest edit script, or None past MYERS_MAX_EDITS."""
+    n, m = ahi - alo, bhi - blo
+    v = {1: 0}
+    trace: list[dict[int, int]] = []
+    for d in range(min(n + m, MYERS_MAX_EDITS) + 1):
+        if d % 32 == 0 and time.perf_counter() > deadline:
+            raise _BudgetExceeded
+        trace.append(dict(v))
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[k - 1] < v[k + 1]):
+                x = v[k + 1]
+            else:
+                x = v[k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            v[k] = x
+            if x >= n and y >= m:
+                return _myers_backtrack(trace, d, k, n, alo, blo)
+    return None
+
+
+def _myers_backtrack(
+    trace: list[dict[int, int]],
+    d: int,
+    k: int,
+    n: int,
+    alo: int,
+    blo: int,
+) -> list[tuple[int, int, int]]:
+    blocks = []
+    x = n
+    for step in range(d, 0, -1):
+        prev_v = trace[step]
+        if k == -step or (k != step and prev_v[k - 1] < prev_v[k + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = prev_v[prev_k]
+        # The diagonal run after the edit step is a match.
+        start_x = prev_x if prev_k == k + 1 else prev_x + 1
+        if x > start_x:
+            blocks.append((alo + start_x, blo + start_x - k, x - start_x))
+        x, k = prev_x, prev_k
+    if x > 0:
+        blocks.append((alo, blo, x))
+    return blocks[::-1]
+
+
+def matching_blocks(
+    a: list[str], b: list[str], *, deadline: float = float("inf")
+) -> list[tuple[int, int, int]]:
+    """Returns (i, j, size) runs of equal lines, in order, like SequenceMatcher.
+
+    Patience-style: lines unique to both sides anchor the alignment and the
+    gaps between anchors are split the same way recursively. Gaps without
+    unique lines are aligned with Myers' algorithm, or reported as replaced
+    wholesale when their edit distance exceeds MYERS_MAX_EDITS.
+    Raises _BudgetExceeded once *deadline* (a perf_counter value) passes.
+    """
+    blocks: list[tuple[int, int, int]] = []
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        alo, ahi, blo, bhi = stack.pop()
+        if time.perf_counter() > deadline:
+            raise _BudgetExceeded
+
+        # Common prefix and suffix cost nothing to align.
+        start = 0
+        while (
+            alo + start < ahi and blo + start < bhi and a[alo + start] == b[blo + start]
+        ):
+            start += 1
+        if start:
+            blocks.append((alo, blo, start))
+            alo, blo = alo + start, blo + start
+        end = 0
+        while (
+            alo < ahi - end and blo < bhi - end and a[ahi - end - 1] == b[bhi - end - 1]
+        ):
+            end += 1
+        if end:
+            blocks.append((ahi - end, bhi - end, end))
+            ahi, bhi = ahi - end, bhi - end
+        if alo == ahi or blo == bhi:
+            continue
+
+        anchors = _longest_increasing(_unique_common(a, alo, ahi, b, blo, bhi))
+        if anchors:
+            prev_i, prev_j = alo, blo
+            run_start = None  # (i, j) where the current run of adjacent anchors began
+            for i, j in anchors:
+                if run_start is None or i != prev_i or j != prev_j:
+                    if run_start is not None:
+                        blocks.append((*run_start, prev_i - run_start[0]))
+                    stack.append((prev_i, i, prev_j, j))
+                    run_start = (i, j)
+                prev_i, prev_j = i + 1, j + 1
+            blocks.append((*run_start, prev_i - run_start[0]))
+            stack.append((prev_i, ahi, prev_j, bhi))
+            continue
+
+        blocks += _myers(a, alo, ahi, b, blo, bhi, deadline) or []
+
+    blocks.sort()
+    # Merge adjacent runs so callers see maximal blocks.
+    merged: list[tuple[int, int, int]] = []
+    for i, j, size in blocks:
+        if (
+            merged
+            and merged[-1][0] + merged[-1][2] == i
+            and merged[-1][1] + merged[-1][2] == j
+        ):
+            pi, pj, psize = merged[-1]
+            merged[-1] = (pi, pj, psize + size)
+        elif size:
+            merged.append((i, j, size))
+    return merged
+
+
+def opcodes(
+    a: list[str], b: list[str], *, deadline: float = float("inf")
+) -> list[tuple[str, int, int, int, int]]:
+    """Edit operations turning *a* into *b*, in SequenceMatcher.get_opcodes() form."""
+    ops = []
+    i = j = 0
+    for bi, bj, size in [
+        *matching_blocks(a, b, deadline=deadline),
+        (len(a), len(b), 0),
+    ]:
+        if i < bi and j < bj:
+            ops.append(("replace", i, bi, j, bj))
+        elif i < bi:
+            ops.append(("delete", i, bi, j, bj))
+        elif j < bj:
+            ops.append(("insert", i, bi, j, bj))
+        if size:
+            ops.append(("equal", bi, bi + size, bj, bj + size))
+        i, j = bi + size, bj + size
+    return ops
+
+
+# --- Unified format ---
+
+
+def _grouped(
+    ops: list[tuple[str, int, int, int, int]], context: int
+) -> list[list[tuple[str, int, int, int, int]]]:
+    """Splits *ops* into hunks with at most *context* equal lines around changes."""
+    if not ops:
+        return []
+    ops = list(ops)
+    if ops[0][0] == "equal":
+        tag, i1, i2, j1, j2 = ops[0]
+        ops[0] = tag, max(i1, i2 - context), i2, max(j1, j2 - context), j2
+    if ops[-1][0] == "equal":
+        tag, i1, i2, j1, j2 = ops[-1]
+        ops[-1] = tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)
+
+    groups: list[list[tuple[str, int, int, int, int]]] = []
+    group: list[tuple[str, int, int, int, int]] = []
+    for tag, i1, i2, j1, j2 in ops:
+        if tag == "equal" and i2 - i1 > 2 * context:
+            group.append((tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)))
+            groups.append(group)
+            group = []
+            i1, j1 = max(i1, i2 - context), max(j1, j2 - context)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        groups.append(group)
+    return groups
+
+
+def _range(start: int, stop: int) -> str:
+    length = stop - start
+    if length == 1:
+        return str(start + 1)
+    if not length:
+        return f"{start},0"
+    return f"{start + 1},{length}"
+
+
+def _split_lines(text: str) -> list[str]:
+    """The lines of *text*, split after each newline and nothing else.
+
+    Unlike `str.splitlines`, form feeds and the other Unicode line breaks
+    stay inside their line, as they do for `diff` and `patch`.
+    """
+    lines = [line + "\n" for line in text.split("\n")]
+    lines[-1] = lines[-1][:-1]
+    return lines if lines[-1] else lines[:-1]
+
+
+def _emit(prefix: str, line: str, out: list[str]) -> None:
+    if line.endswith("\n"):
+        out.append(prefix + line)
+    else:
+        out.append(f"{prefix}{line}\n\\ No newline at end of file\n")
+
+
+def _format_hunk(
+    group: list[tuple[str, int, int, int, int]], a: list[str], b: list[str]
+) -> list[str]:
+    """The lines of one hunk, starting with its "@@" header."""
+    first, last = group[0], group[-1]
+    hunk = [f"@@ -{_range(first[1], last[2])} +{_range(first[3], last[4])} @@\n"]
+    for tag, i1, i2, j1, j2 in group:
+        if tag == "equal":
+            for line in a[i1:i2]:
+                _emit(" ", line, hunk)
+            continue
+        for line in a[i1:i2]:
+            _emit("-", line, hunk)
+        for line in b[j1:j2]:
+            _emit("+", line, hunk)
+    return hunk
+
+
+def _summary(a: list[str], b: list[str], reason: str) -> DiffSummary:
+    """Line counts and the outer bounds of the change, from a linear scan."""
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < len(a) - start and end < len(b) - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a_counts = Counter(a[start : len(a) - end])
+    b_counts = Counter(b[start : len(b) - end])
+    added = sum((b_counts - a_counts).values())
+    removed = sum((a_counts - b_counts).values())
+    region = (start + 1, len(a) - end, start + 1, len(b) - end)
+    return DiffSummary(reason, added, removed, region)
+
+
+def unified_diff(
+    old: str,
+    new: str,
+    path: str,
+    *,
+    fromfile: str | None = None,
+    tofile: str | None = None,
+    context: int = 3,
+    time_budget: float = DEFAULT_TIME_BUDGET,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> DiffResult:
+    """Unified diff of two texts, or a summary if it exceeds the size or time budget."""
+    result = DiffResult(path)
+    if old == new:
+        return result
+
+    a = _split_lines(old)
+    b = _split_lines(new)
+    if len(old) + len(new) > max_bytes:
+        result.summary = _summary(a, b, f"over {max_bytes:,} bytes")
+        return result
+    try:
+        ops = opcodes(a, b, deadline=time.perf_counter() + time_budget)
+    except _BudgetExceeded:
+        result.summary = _summary(a, b, f"not computed within {time_budget:g}s")
+        return result
+
+    result.header = f"--- {fromfile or f'a/{path}'}\n+++ {tofile or f'b/{path}'}\n"
+    result.hunks = ["".join(_format_hunk(g, a, b)) for g in _grouped(ops, context)]
+    result.text = result.header + "".join(result.hunks)
+    result._old, result._new, result._ops = a, b, ops
+    return result
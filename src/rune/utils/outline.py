@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import ast
+import functools
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from rune.utils.files import FileFingerprint, fingerprint
+from rune.utils.sniff import sniff_file
+
+
+@dataclass(frozen=True)
+class OutlineEntry:
+    """A single definition found in a source file."""
+
+    kind: str  # "class" | "function" | "method" | other language keywords
+    name: str  # Qualified name, e.g. "DiffApplyer.apply_diff"
+    signature: str
+    start_line: int  # 1-based, includes decorators
+    end_line: int  # 1-based, inclusive
+    doc: str | None = None  # First line of the docstring, if any
+    depth: int = 0
+
+    def format(self) -> str:
+        text = f"{'  ' * self.depth}L{self.start_line}-{self.end_line} {self.signature}"
+        if self.doc:
+            text += f"  # {self.doc}"
+        return text
+
+
+# --- Python (ast) ---
+
+
+def _first_doc_line(node: ast.AST) -> str | None:
+    doc = ast.get_docstring(node, clean=True)  # type: ignore[arg-type]
+    if not doc:
+        return None
+    return doc.strip().splitlines()[0]
+
+
+def _python_signature(node: ast.AST) -> str:
+    if isinstance(node, ast.ClassDef):
+        bases = [ast.unparse(b) for b in node.bases]
+        bases += [ast.unparse(k) for k in node.keywords]
+        return (
+            f"class {node.name}({', '.join(bases)})" if bases else f"class {node.name}"
+        )
+
+    assert isinstance(node, ast.FunctionDef | ast.AsyncFunctionDef)
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    signature = f"{prefix} {node.name}({ast.unparse(node.args)})"
+    if node.returns is not None:
+        signature += f" -> {ast.unparse(node.returns)}"
+    return signature
+
+
+def _python_outline(source: str) -> list[OutlineEntry]:
+    tree = ast.parse(source)
+    entries: list[OutlineEntry] = []
+
+    def visit(body: list[ast.stmt], parents: list[str], in_class: bool) -> None:
+        for node in body:
+            if not isinstance(
+                node, ast.ClassDef | ast.FunctionDef | ast.AsyncFunctionDef
+            ):
+                continue
+            if isinstance(node, ast.ClassDef):
+                kind = "class"
+            else:
+                kind = "method" if in_class else "function"
+            start = min([d.lineno for d in node.decorator_list] + [node.lineno])
+            entries.append(
+                OutlineEntry(
+                    kind=kind,
+                    name=".".join([*parents, node.name]),
+                    signature=_python_signature(node),
+                    start_line=start,
+                    end_line=node.end_lineno or node.lineno,
+                    doc=_first_doc_line(node),
+                    depth=len(parents),
+                )
+            )
+            # Nested functions are implementation details; only descend into classes.
+            if isinstance(node, ast.ClassDef):
+                visit(node.body, [*parents, node.name], in_class=True)
+
+    visit(tree.body, [], in_class=False)
+    return entries
+
+
+# --- Other languages (regex) ---
+
+_DEFINITION_PATTERNS: list[tuple[str, re.Pattern[str]]] = [
+    (
+        "class",
+        re.compile(
+            r"^(?P<indent>\s*)(?:export\s+)?(?:default\s+)?(?:pub(?:\([^)]*\))?\s+|public\s+|private\s+|protected\s+|internal\s+)?"
+            r"(?:abstract\s+|final\s+|static\s+|sealed\s+|data\s+)*"
+            r"(?P<kind>class|interface|struct|enum|trait|impl|module|type)\s+(?P<name>[A-Za-z_][\w:<>]*)"
+        ),
+    ),
+    (
+        "function",
+        re.compile(
+            r"^(?P<indent>\s*)(?:export\s+)?(?:default\s+)?(?:pub(?:\([^)]*\))?\s+)?(?:async\s+)?"
+            r"(?P<kind>function\*?|fn|func|def|fun|sub)\s+(?:\([^)]*\)\s*)?(?P<name>[A-Za-z_][\w.]*)"
+        ),
+    ),
+    (
+        "function",
+        re.compile(
+            r"^(?P<indent>\s*)(?:export\s+)?(?:const|let|var)\s+(?P<name>[A-Za-z_$][\w$]*)\s*=\s*"
+            r"(?:async\s+)?(?:function\b|\([^)]*\)\s*=>|[A-Za-z_$][\w$]*\s*=>)"
+        ),
+    ),
+]
+
+_FUNCTION_KEYWORDS = {"function", "function*", "fn", "func", "def", "fun", "sub"}
+
+
+def _regex_outline(source: str) -> list[OutlineEntry]:
+    lines = source.splitlines()
+    found: list[tuple[int, int, str, str, str]] = []  # (line, indent, kind, name, sig)
+    for lineno, line in enumerate(lines, 1):
+        for default_kind, pattern in _DEFINITION_PATTERNS:
+            m = pattern.match(line)
+            if not m:
+                continue
+            kind = m.groupdict().get("kind") or default_kind
+            if kind in _FUNCTION_KEYWORDS:
+                kind = "function"
+            indent = len(m.group("indent").expandtabs(4))
+            found.append((lineno, indent, kind, m.group("name"), line.strip()))
+            break
+
+    entries: list[OutlineEntry] = []
+    stack: list[tuple[int, str]] = []  # (indent, name) of enclosing definitions
+    for i, (lineno, indent, kind, name, sig) in enumerate(found):
+        # Without a parser the end of a definition is approximated as the line
+        # before the next definition at the same or a shallower indent.
+        end = len(lines)
+        for next_lineno, next_indent, *_ in found[i + 1 :]:
+            if next_indent <= indent:
+                end = next_lineno - 1
+                break
+        while end > lineno and not lines[end - 1].strip():
+            end -= 1
+
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+        qualified = ".".join([*(n for _, n in stack), name])
+        entries.append(
+            OutlineEntry(
+                kind=kind,
+                name=qualified,
+                signature=sig.rstrip("{").rstrip(),
+                start_line=lineno,
+                end_line=end,
+                depth=len(stack),
+            )
+        )
+        stack.append((indent, name))
+    return entries
+
+
+def outline_source(source: str, suffix: str = "") -> list[OutlineEntry]:
+    """Extracts definitions from *source*, using `ast` for Python when it parses."""
+    if suffix in {".py", ".pyi"}:
+        try:
+            return _python_outline(source)
+        except SyntaxError:
+            pass
+    return _regex_outline(source)
+
+
+@functools.lru_cache(maxsize=256)
+def _outline_for(fp: FileFingerprint) -> tuple[OutlineEntry, ...]:
+    encoding = sniff_file(fp.path).encoding or "utf-8"
+    source = fp.path.read_text(encoding=encoding, errors="replace")
+    return tuple(outline_source(source, fp.path.suffix))
+
+
+def outline_file(path: Path) -> list[OutlineEntry]:
+    """Returns the outline of *path*, cached per file fingerprint."""
+    return list(_outline_for(fingerprint(path)))
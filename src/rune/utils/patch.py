@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+
+from rune.utils.diff import LineIndex
+
+# Context lines that may be ignored at each end of a hunk, as in `patch`
+DEFAULT_FUZZ = 2
+
+_HUNK_HEADER_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+_NO_NEWLINE = "\\ No newline at end of file"
+
+
+class PatchError(ValueError):
+    """Raised when a patch cannot be parsed or one of its hunks does not apply."""
+
+
+@dataclass
+class Hunk:
+    old_start: int  # 1-based; 0 for an empty side
+    new_start: int
+    # (" " | "-" | "+", text) in patch order
+    lines: list[tuple[str, str]] = field(default_factory=list)
+    # Set by "\ No newline at end of file" after the old / new side's last line
+    old_no_newline: bool = False
+    new_no_newline: bool = False
+
+
+@dataclass
+class FilePatch:
+    old_path: str | None  # None for a created file (/dev/null)
+    new_path: str | None  # None for a deleted file
+    hunks: list[Hunk] = field(default_factory=list)
+
+    @property
+    def path(self) -> str:
+        return self.new_path or self.old_path or ""
+
+
+@dataclass
+class HunkResult:
+    line: int  # 1-based line where the hunk was applied
+    offset: int  # Lines away from where the header said
+    fuzz: int  # Context lines ignored at each end to make it fit
+
+
+def _strip_prefix(raw: str) -> str | None:
+    path = raw.split("\t", 1)[0].strip()
+    if path == "/dev/null":
+        return None
+    if path.startswith(("a/", "b/")):
+        path = path[2:]
+    return path
+
+
+def _is_file_header(lines: list[str], i: int) -> bool:
+    return (
+        lines[i].startswith("--- ")
+        and i + 1 < len(lines)
+        and lines[i + 1].startswith("+++ ")
+    )
+
+
+def parse_patch(text: str) -> list[FilePatch]:
+    """Parses a unified diff (plain or `git diff` output) that may span several files.
+
+    The line counts in `@@` headers are only used to tell whether an empty
+    line is still part of a hunk; hand-written patches often get them wrong.
+    """
+    patches: list[FilePatch] = []
+    current: FilePatch | None = None
+    hunk: Hunk | None = None
+    remaining = 0  # Lines the hunk header says are still to come
+    last_tag = ""
+
+    lines = text.splitlines()
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        # Inside a hunk, "--- x" / "+++ y" are a removed "-- x" and an added "++ y".
+        if (hunk is None or remaining <= 0) and _is_file_header(lines, i):
+            current = FilePatch(
+                _strip_prefix(line[4:]), _strip_prefix(lines[i + 1][4:])
+            )
+            patches.append(current)
+            hunk = None
+            i += 2
+            continue
+
+        if m := _HUNK_HEADER_RE.match(line):
+            if current is None:
+                raise PatchError(f"Hunk header before any file header at line {i + 1}.")
+            old_count = int(m.group(2)) if m.group(2) is not None else 1
+            new_count = int(m.group(4)) if m.group(4) is not None else 1
+            remaining = max(old_count, new_count)
+            hunk = Hunk(old_start=int(m.group(1)), new_start=int(m.group(3)))
+            current.hunks.append(hunk)
+        elif hunk is not None and line == _NO_NEWLINE:
+            if last_tag in (" ", "-"):
+                hunk.old_no_newline = True
+            if last_tag in (" ", "+"):
+                hunk.new_no_newline = True
+        elif hunk is not None and (
+            line[:1] in (" ", "-", "+") or (line == "" and remaining > 0)
+        ):
+            # Some generators drop the leading space of empty context lines.
+            tag, body = (line[0], line[1:]) if line else (" ", "")
+            hunk.lines.append((tag, body))
+            last_tag = tag
+            remaining -= 1
+        else:
+            # Preamble ("diff --git", "index ...", prose) or the end of a hunk.
+            hunk = None
+        i += 1
+
+    if not patches:
+        raise PatchError(
+            "No file headers ('--- a/path' / '+++ b/path') found in patch."
+        )
+    for patch in patches:
+        if patch.old_path is None and patch.new_path is None:
+            raise PatchError("A file patch has /dev/null on both sides.")
+        if not patch.hunks and patch.old_path == patch.new_path:
+            raise PatchError(f"No hunks found for {patch.path}.")
+    return patches
+
+
+def _locate(
+    index: LineIndex, old: list[str], expected: int, earliest: int
+) -> int | None:
+    """Finds where *old* occurs at or after line *earliest*, nearest to *expected*.
+
+    Candidate windows come from the index's stripped-line table; windows that
+    also match exactly are preferred over ones that only match up to
+    leading/trailing whitespace.
+    """
+    if not old:
+        return max(earliest, min(expected, len(index)))
+    candidates = [
+        start
+        for start in index.find_stripped([line.strip() for line in old])
+        if start >= earliest
+    ]
+    if not candidates:
+        return None
+    exact = [s for s in candidates if index.lines[s : s + len(old)] == old]
+    return min(exact or candidates, key=lambda s: (abs(s - expected), s))
+
+
+def apply_hunks(
+    content: str, hunks: list[Hunk], *, fuzz: int = DEFAULT_FUZZ, path: str = ""
+) -> tuple[str, list[HunkResult]]:
+    """Applies *hunks* to *content* the way `patch` does.
+
+    A hunk is placed where its context and removed lines occur nearest to
+    the line its header names (shifted by the hunks before it). If it fits
+    nowhere, up to *fuzz* context lines at each end are ignored in turn.
+    """
+    index = LineIndex(content)
+    line_ending = "\r\n" if "\r\n" in content else "\n"
+    results: list[HunkResult] = []
+    shift = 0  # Lines added minus removed by the hunks applied so far
+    drift = 0  # Offset of the previous hunk, which later hunks likely share
+    earliest = 0  # Hunks apply in order and never overlap
+
+    for number, hunk in enumerate(hunks, 1):
+        header_line = max(0, hunk.old_start - 1) + shift
+        has_old_lines = any(tag != "+" for tag, _ in hunk.lines)
+        for level in range(fuzz + 1):
+            lead = _context_to_drop(hunk.lines, level)
+            trail = _context_to_drop(hunk.lines[::-1], level)
+            trimmed = hunk.lines[lead : len(hunk.lines) - trail]
+            old = [text for tag, text in trimmed if tag != "+"]
+            if has_old_lines and not old:
+                continue  # Fuzz may not discard everything that anchors the hunk
+            start = _locate(index, old, header_line + drift + lead, earliest)
+            if start is not None:
+                break
+        else:
+            where = f" of {path}" if path else ""
+            raise PatchError(
+                f"Hunk {number}{where} (line {hunk.old_start}) does not apply: "
+                "its context and removed lines were not found."
+            )
+
+        # Context lines come from the file: they may only match after
+        # stripping, and the patch's whitespace must not replace the file's.
+        new = []
+        old_line = start
+        for tag, text in trimmed:
+            if tag == " ":
+                new.append(index.lines[old_line])
+            elif tag == "+":
+                new.append(text)
+            if tag != "+":
+                old_line += 1
+        span_start = index.line_to_char(start)
+        span_end = index.line_to_char(start + len(old))
+        at_eof = span_end == len(index.text)
+        file_has_final_newline = index.text.endswith(("\n", "\r"))
+
+        replacement = line_ending.join(new)
+        if new:
+            if not (at_eof and trail == 0):
+                keep_eol = True
+            elif hunk.new_no_newline:
+                keep_eol = False
+            elif hunk.old_no_newline:
+                keep_eol = True
+            else:
+                # The patch is silent about it: keep the file's convention.
+                keep_eol = file_has_final_newline or not index.text
+            if keep_eol:
+                replacement += line_ending
+            if not old and at_eof and index.text and not file_has_final_newline:
+                replacement = line_ending + replacement  # Don't glue onto the last line
+        index.apply_edit(span_start, span_end, replacement)
+
+        drift = start - (header_line + lead)
+        results.append(HunkResult(line=start + 1, offset=drift, fuzz=level))
+        shift += len(new) - len(old)
+        earliest = start + len(new)
+
+    return index.text, results
+
+
+def _context_to_drop(lines: list[tuple[str, str]], level: int) -> int:
+    """How many of the first *level* lines are context and may be dropped."""
+    dropped = 0
+    for tag, _ in lines[:level]:
+        if tag != " ":
+            break
+        dropped += 1
+    return dropped
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import shlex
+import signal
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+READ_CHUNK = 64 * 1024  # Bytes requested from the shell's pipes per read
+
+
+@dataclass
+class ShellResult:
+    exit_code: int
+    restarted: bool  # A new shell was started; state from earlier commands is gone
+    exited: bool  # The command ended the shell (`exit`, `exec`, a crash)
+
+
+async def _pump(
+    stream: asyncio.StreamReader, marker: bytes, emit: Callable[[bytes], None]
+) -> bytes | None:
+    """Passes *stream* to *emit* up to *marker*; returns the rest of that line.
+
+    Returns None if the stream ends before the marker arrives. Bytes that
+    could be the start of a marker split across reads are held back.
+    """
+    pending = b""
+    while True:
+        chunk = await stream.read(READ_CHUNK)
+        if not chunk:
+            if pending:
+                emit(pending)
+            return None
+        pending += chunk
+        index = pending.find(marker)
+        if index >= 0:
+            if index:
+                emit(pending[:index])
+            rest = pending[index + len(marker) :]
+            while b"\n" not in rest and (more := await stream.read(READ_CHUNK)):
+                rest += more
+            return rest.split(b"\n", 1)[0]
+        keep = len(marker) - 1
+        if len(pending) > keep:
+            emit(pending[:-keep])
+            pending = pending[-keep:]
+
+
+class ShellSession:
+    """A long-lived bash process that runs commands one after another.
+
+    Exported variables, the working directory, shell functions and sourced
+    scripts carry over from one command to the next. Each command is sent
+    through `eval` (so a syntax error cannot swallow what follows) with
+    stdin from /dev/null, then a random sentinel line is printed on stdout
+    (with the exit status) and on stderr; output up to the sentinels belongs
+    to the command. If the shell has died, the next command starts a new
+    one and says so in its result. Cancelling `run` kills the shell and its
+    process group, since the command cannot be interrupted on its own.
+    Setting `cwd` to another directory makes the next command `cd` there
+    first; a `cd` inside a command is kept until then.
+    """
+
+    def __init__(self, cwd: Path) -> None:
+        self.cwd = cwd
+        self._moved_to: Path | None = None  # The last `cwd` the shell was put in
+        self._proc: asyncio.subprocess.Process | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock: asyncio.Lock | None = None
+        self._started = False
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.returncode is None
+
+    @property
+    def pid(self) -> int | None:
+        return self._proc.pid if self.alive else None
+
+    async def _start(self) -> None:
+        try:
+            self._proc = await asyncio.create_subprocess_exec(
+                "bash",
+                "--noprofile",
+                "--norc",
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=self.cwd,
+                start_new_session=True,
+            )
+        except FileNotFoundError as e:
+            raise FileNotFoundError("A persistent shell needs bash on PATH.") from e
+        self._started = True
+        self._moved_to = self.cwd
+
+    async def run(
+        self,
+        command: str,
+        on_stdout: Callable[[bytes], None],
+        on_stderr: Callable[[bytes], None],
+    ) -> ShellResult:
+        """Runs *command*, passing its output to the callbacks as it arrives."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Pipes belong to the loop that created them.
+            self.close()
+            self._loop, self._lock = loop, asyncio.Lock()
+        assert self._lock is not None
+
+        async with self._lock:
+            restarted = False
+            if not self.alive:
+                restarted = self._started
+                await self._start()
+            proc = self._proc
+            assert proc is not None and proc.stdin is not None
+            assert proc.stdout is not None and proc.stderr is not None
+
+            script = ""
+            if self.cwd != self._moved_to:
+                script = f"cd -- {shlex.quote(str(self.cwd))}\n"
+                self._moved_to = self.cwd
+            sentinel = f"__rune_{uuid.uuid4().hex}__"
+            script += (
+                f"eval {shlex.quote(command)} < /dev/null\n"
+                f"printf '\\n{sentinel} %d\\n' $?\n"
+                f"printf '\\n{sentinel}\\n' >&2\n"
+            )
+            try:
+                proc.stdin.write(script.encode("utf-8"))
+                await proc.stdin.drain()
+                marker = f"\n{sentinel}".encode()
+                status, _ = await asyncio.gather(
+                    _pump(proc.stdout, marker, on_stdout),
+                    _pump(proc.stderr, marker, on_stderr),
+                )
+            except (BrokenPipeError, ConnectionResetError):
+                status = None  # The shell died before reading the command
+            except BaseException:
+                self.close()
+                raise
+
+            if status is None:
+                exit_code = await proc.wait()
+                self._proc = None
+                return ShellResult(exit_code, restarted, exited=True)
+            return ShellResult(int(status), restarted, exited=False)
+
+    def close(self) -> None:
+        """Kills the shell and everything it started."""
+        proc, self._proc = self._proc, None
+        if proc is None or proc.returncode is not None:
+            return
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            proc.kill()
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import codecs
+import functools
+from dataclasses import dataclass
+from pathlib import Path
+
+from rune.utils.files import FileFingerprint, fingerprint
+
+SNIFF_BYTES = 8192
+
+# (BOM, codec for the whole file, codec for chunks read past the BOM)
+_BOMS: list[tuple[bytes, str, str]] = [
+    # UTF-32 must be checked before UTF-16: their little-endian BOMs share a prefix.
+    (codecs.BOM_UTF32_LE, "utf-32", "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32", "utf-32-be"),
+    (codecs.BOM_UTF8, "utf-8-sig", "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16", "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16", "utf-16-be"),
+]
+
+_MAGIC: list[tuple[bytes, str]] = [
+    (b"\x89PNG\r\n\x1a\n", "PNG image"),
+    (b"\xff\xd8\xff", "JPEG image"),
+    (b"GIF87a", "GIF image"),
+    (b"GIF89a", "GIF image"),
+    (b"RIFF", "RIFF container (WAV/AVI/WebP)"),
+    (b"%PDF-", "PDF document"),
+    (b"PK\x03\x04", "ZIP archive"),
+    (b"\x1f\x8b", "gzip archive"),
+    (b"BZh", "bzip2 archive"),
+    (b"\xfd7zXZ\x00", "xz archive"),
+    (b"7z\xbc\xaf\x27\x1c", "7-Zip archive"),
+    (b"\x7fELF", "ELF executable"),
+    (b"\xcf\xfa\xed\xfe", "Mach-O executable"),
+    (b"\xca\xfe\xba\xbe", "Java class / Mach-O universal binary"),
+    (b"MZ", "Windows executable"),
+    (b"SQLite format 3\x00", "SQLite database"),
+    (b"\x00asm", "WebAssembly module"),
+    (b"\x93NUMPY", "NumPy array"),
+    (b"\x80\x04\x95", "Python pickle"),
+    (b"\x80\x05\x95", "Python pickle"),
+]
+
+# Control characters that are normal in text files.
+_TEXT_CONTROLS = {0x07, 0x08, 0x09, 0x0A, 0x0C, 0x0D, 0x1B}
+
+
+@dataclass(frozen=True)
+class SniffResult:
+    """What the first few KB of a file say about how to read it."""
+
+    is_binary: bool
+    encoding: str | None  # Codec for the whole file; None for binary files
+    kind: str  # "text" or a short description such as "PNG image"
+    magic: str  # Leading bytes as hex, for display
+    chunk_encoding: str | None = None  # Codec for chunks not starting at offset 0
+
+    def summary(self, path: str, size: int) -> dict:
+        """Short description returned to the model instead of binary content."""
+        return {
+            "path": path,
+            "binary": True,
+            "type": self.kind,
+            "size": size,
+            "magic": self.magic,
+        }
+
+
+def sniff_bytes(head: bytes, suffix: str = "") -> SniffResult:
+    """Classifies a file from its first bytes as binary or text (with encoding)."""
+    magic = head[:16].hex(" ")
+
+    for bom, encoding, chunk_encoding in _BOMS:
+        if head.startswith(bom):
+            return SniffResult(False, encoding, "text", magic, chunk_encoding)
+
+    # Short signatures (e.g. "MZ") are only trusted when the rest doesn't look
+    # like text, so a README that happens to start with them is not misread.
+    for signature, kind in _MAGIC:
+        if len(signature) >= 4 and head.startswith(signature):
+            return SniffResult(True, None, kind, magic)
+
+    if b"\x00" in head:
+        kind = next(
+            (kind for signature, kind in _MAGIC if head.startswith(signature)),
+            "Python bytecode" if suffix == ".pyc" else "binary data",
+        )
+        return SniffResult(True, None, kind, magic)
+
+    try:
+        # final=False tolerates a multi-byte sequence cut off at the sniff boundary.
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+        return SniffResult(False, "utf-8", "text", magic, "utf-8")
+    except UnicodeDecodeError:
+        pass
+
+    for signature, kind in _MAGIC:
+        if head.startswith(signature):
+            return SniffResult(True, None, kind, magic)
+
+    controls = sum(1 for b in head if b < 0x20 and b not in _TEXT_CONTROLS)
+    if controls > len(head) // 10:
+        return SniffResult(True, None, "binary data", magic)
+
+    # Not UTF-8 but text-like: a legacy single-byte encoding. cp1252 is a
+    # superset of Latin-1's printable range; fall back to Latin-1 for the few
+    # bytes cp1252 leaves undefined.
+    try:
+        head.decode("cp1252")
+        return SniffResult(False, "cp1252", "text", magic, "cp1252")
+    except UnicodeDecodeError:
+        return SniffResult(False, "latin-1", "text", magic, "latin-1")
+
+
+@functools.lru_cache(maxsize=1024)
+def _sniff_fingerprint(fp: FileFingerprint) -> SniffResult:
+    with fp.path.open("rb") as f:
+        head = f.read(SNIFF_BYTES)
+    return sniff_bytes(head, fp.path.suffix)
+
+
+def sniff_file(path: Path) -> SniffResult:
+    """Sniffs *path*, caching the verdict per file fingerprint."""
+    return _sniff_fingerprint(fingerprint(path))
+
+
+def decode_chunk(data: bytes, sniffed: SniffResult, *, offset: int) -> str:
+    """Decodes bytes read at *offset* of a sniffed text file, with errors replaced."""
+    encoding = sniffed.encoding if offset == 0 else sniffed.chunk_encoding
+    return data.decode(encoding or "utf-8", errors="replace")
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import ast
+import difflib
+import io
+import os
+import re
+import tokenize
+from dataclasses import dataclass
+
+_DEFINITION_TYPES = (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)
+_TAIL_RE = re.compile(r"\s*(#.*)?")  # What may follow a definition on its last line
+# Lines as `ast` numbers them (str.splitlines also breaks on \f, \x1c, ...).
+_LINE_RE = re.compile(r"[^\r\n]*(?:\r\n|\r|\n)|[^\r\n]+\Z")
+
+
+@dataclass
+class DefinitionEdit:
+    """The result of replacing one definition in a Python source file."""
+
+    text: str  # The whole file after the edit
+    old_start: int  # 1-based, inclusive; decorators included
+    old_end: int
+    new_start: int
+    new_end: int
+
+
+def _definitions(tree: ast.Module) -> dict[str, list[ast.stmt]]:
+    """Maps qualified names ("Class.method", "outer.inner") to their nodes."""
+    found: dict[str, list[ast.stmt]] = {}
+
+    def visit(body: list[ast.stmt], parents: list[str]) -> None:
+        for node in body:
+            if isinstance(node, _DEFINITION_TYPES):
+                name = ".".join([*parents, node.name])
+                found.setdefault(name, []).append(node)
+                visit(node.body, [*parents, node.name])
+            elif isinstance(node, ast.If | ast.Try | ast.With | ast.AsyncWith):
+                # Conditional definitions (`if TYPE_CHECKING:`, `try: ... except
+                # ImportError:`) keep the enclosing scope's qualified name.
+                for block in ("body", "orelse", "finalbody"):
+                    visit(getattr(node, block, []), parents)
+                for handler in getattr(node, "handlers", []):
+                    visit(handler.body, parents)
+
+    visit(tree.body, [])
+    return found
+
+
+def _line_tail(line: str, end_col: int | None) -> str:
+    """What follows a node that ends at byte *end_col* of *line*."""
+    return line.encode("utf-8")[end_col or 0 :].decode("utf-8", errors="replace")
+
+
+def _string_lines(source: str) -> set[int]:
+    """0-based numbers of the lines that continue a multi-line string literal."""
+    inside: set[int] = set()
+    fstring_starts: list[int] = []  # Python 3.12+ splits f-strings into tokens
+    fstring_start = getattr(tokenize, "FSTRING_START", None)
+    fstring_end = getattr(tokenize, "FSTRING_END", None)
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(source).readline):
+            if token.type == tokenize.STRING:
+                inside.update(range(token.start[0], token.end[0]))
+            elif token.type == fstring_start:
+                fstring_starts.append(token.start[0])
+            elif token.type == fstring_end and fstring_starts:
+                inside.update(range(fstring_starts.pop(), token.end[0]))
+    except (tokenize.TokenError, SyntaxError):
+        pass  # ast.parse reports the problem
+    return inside
+
+
+def _dedent(source: str) -> tuple[list[str], set[int]]:
+    """Like `textwrap.dedent`, but leaves the inside of string literals alone.
+
+    Returns the lines and the numbers of those that continue a string, which
+    are neither counted for the common margin nor changed.
+    """
+    lines = [line.rstrip("\r\n") for line in _LINE_RE.findall(source)]
+    strings = _string_lines(source)
+    code = [
+        line
+        for number, line in enumerate(lines)
+        if number not in strings and line.strip()
+    ]
+    margin = os.path.commonprefix(
+        [line[: len(line) - len(line.lstrip())] for line in code]
+    )
+    return [
+        line if number in strings else line[len(margin) :] if line.strip() else ""
+        for number, line in enumerate(lines)
+    ], strings
+
+
+def _reindent(lines: list[str], strings: set[int], indent: str) -> list[str]:
+    return [
+        line if number in strings else indent + line if line.strip() else ""
+        for number, line in enumerate(lines)
+    ]
+
+
+def replace_python_definition(
+    source: str, qualified_name: str, new_source: str
+) -> DefinitionEdit:
+    """Replaces the class or function *qualified_name* in *source* with *new_source*.
+
+    The span comes from the `ast` node: from its first decorator (or its
+    `def`/`class` line) through the end of its last physical line. A comment
+    there (`# noqa`, `# type: ignore`) moves to the new last line unless
+    *new_source* ends with a comment of its own. *new_source* may be written
+    at any indentation; it is re-indented to the original's column. If it has
+    no decorators, the original's decorators are kept. Everything outside the
+    span is left byte-for-byte untouched, and the edited file must parse.
+    Raises ValueError if the name is missing or ambiguous, or if either the
+    new source or the resulting file does not parse.
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError as e:
+        raise ValueError(
+            f"The file does not parse as Python (line {e.lineno}: {e.msg}), "
+            "so definitions cannot be located."
+        ) from e
+
+    definitions = _definitions(tree)
+    nodes = definitions.get(qualified_name)
+    if not nodes:
+        hint = difflib.get_close_matches(qualified_name, definitions, n=3)
+        message = f"No definition named '{qualified_name}' found."
+        if hint:
+            message += f" Did you mean: {', '.join(hint)}?"
+        raise ValueError(message)
+    if len(nodes) > 1:
+        lines = ", ".join(str(node.lineno) for node in nodes)
+        raise ValueError(
+            f"'{qualified_name}' is defined {len(nodes)} times (lines {lines}); "
+            "use edit_file to change a specific one."
+        )
+    node = nodes[0]
+    assert isinstance(node, _DEFINITION_TYPES)
+
+    new_source = new_source.strip("\n")
+    new_lines, new_strings = _dedent(new_source)
+    try:
+        new_tree = ast.parse("\n".join(new_lines))
+    except SyntaxError as e:
+        raise ValueError(
+            f"new_source does not parse (line {e.lineno}: {e.msg})."
+        ) from e
+    if len(new_tree.body) != 1 or not isinstance(new_tree.body[0], _DEFINITION_TYPES):
+        raise ValueError("new_source must be exactly one class or function definition.")
+    new_node = new_tree.body[0]
+    new_has_decorators = bool(new_node.decorator_list)
+
+    lines = _LINE_RE.findall(source)
+    start = node.lineno
+    if new_has_decorators and node.decorator_list:
+        start = min(d.lineno for d in node.decorator_list)
+    end = node.end_lineno or node.lineno
+
+    # col offsets are UTF-8 byte offsets; indentation is ASCII so they agree there.
+    indent = lines[node.lineno - 1][: node.col_offset]
+    if indent.strip():
+        raise ValueError(
+            f"'{qualified_name}' does not start its own line; use edit_file instead."
+        )
+    last_line = lines[end - 1].rstrip("\r\n")
+    tail = _TAIL_RE.fullmatch(_line_tail(last_line, node.end_col_offset))
+    if not tail:
+        raise ValueError(
+            f"'{qualified_name}' shares its last line with other code; "
+            "use edit_file instead."
+        )
+
+    eol = "\r\n" if "\r\n" in source else "\n"
+    last_eol = lines[end - 1][len(last_line) :]  # "" at EOF
+    replacement = _reindent(new_lines, new_strings, indent)
+    # The new node's own last line; comment lines may follow it in new_source.
+    new_end = (new_node.end_lineno or new_node.lineno) - 1
+    new_tail = _TAIL_RE.fullmatch(
+        _line_tail(new_lines[new_end], new_node.end_col_offset)
+    )
+    if tail.group(1) and not (new_tail and new_tail.group(1)):
+        replacement[new_end] += "  " + tail.group(1)
+    new_text = "".join(
+        [*lines[: start - 1], eol.join(replacement) + last_eol, *lines[end:]]
+    )
+    try:
+        ast.parse(new_text)
+    except SyntaxError as e:
+        raise ValueError(
+            f"The file would not parse after the edit (line {e.lineno}: {e.msg}); "
+            "nothing was written."
+        ) from e
+
+    # Reported spans include decorators, whether they were replaced or kept.
+    old_start = min([d.lineno for d in node.decorator_list] + [node.lineno])
+    return DefinitionEdit(
+        text=new_text,
+        old_start=old_start,
+        old_end=end,
+        new_start=old_start,
+        new_end=start + len(replacement) - 1,
+    )
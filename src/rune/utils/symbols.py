@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import os
+from collections import defaultdict
+from pathlib import Path
+
+from rune.utils.files import FileFingerprint, fingerprint, load_ignore_spec
+from rune.utils.outline import OutlineEntry, outline_source
+
+SOURCE_SUFFIXES = {
+    ".py",
+    ".pyi",
+    ".js",
+    ".jsx",
+    ".mjs",
+    ".ts",
+    ".tsx",
+    ".go",
+    ".rs",
+    ".rb",
+    ".java",
+    ".kt",
+    ".scala",
+    ".swift",
+    ".cs",
+    ".php",
+}
+MAX_INDEXED_FILE_SIZE = 1024 * 1024  # 1 MB
+
+
+class SymbolIndex:
+    """Workspace-wide table of definitions, keyed by their unqualified name.
+
+    `refresh()` re-stats every source file but only re-parses files whose
+    fingerprint changed since the previous refresh, so repeated lookups in a
+    session cost one directory walk plus the parsing of edited files.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._files: dict[Path, tuple[FileFingerprint, tuple[OutlineEntry, ...]]] = {}
+        self._by_name: dict[str, list[tuple[Path, OutlineEntry]]] = defaultdict(list)
+
+    def _iter_source_files(self):
+        ignore_spec = load_ignore_spec(self.root)
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            current = Path(dirpath)
+            rel_dir = current.relative_to(self.root)
+            dirnames[:] = sorted(
+                d
+                for d in dirnames
+                if not ignore_spec.match_file(f"{(rel_dir / d).as_posix()}/")
+            )
+            for name in sorted(filenames):
+                path = current / name
+                if path.suffix not in SOURCE_SUFFIXES:
+                    continue
+                if ignore_spec.match_file((rel_dir / name).as_posix()):
+                    continue
+                yield path
+
+    def _drop(self, path: Path) -> None:
+        _, entries = self._files.pop(path)
+        for entry in entries:
+            short = entry.name.rsplit(".", 1)[-1]
+            self._by_name[short] = [
+                item for item in self._by_name[short] if item[0] != path
+            ]
+
+    def refresh(self) -> None:
+        seen: set[Path] = set()
+        for path in self._iter_source_files():
+            try:
+                fp = fingerprint(path)
+            except OSError:
+                continue
+            seen.add(path)
+            cached = self._files.get(path)
+            if cached is not None and cached[0] == fp:
+                continue
+            if cached is not None:
+                self._drop(path)
+            if fp.size > MAX_INDEXED_FILE_SIZE:
+                entries: tuple[OutlineEntry, ...] = ()
+            else:
+                try:
+                    source = path.read_text(encoding="utf-8", errors="replace")
+                except OSError:
+                    continue
+                entries = tuple(outline_source(source, path.suffix))
+            self._files[path] = (fp, entries)
+            for entry in entries:
+                self._by_name[entry.name.rsplit(".", 1)[-1]].append((path, entry))
+
+        for path in set(self._files) - seen:
+            self._drop(path)
+
+    def lookup(self, name: str) -> list[tuple[Path, OutlineEntry]]:
+        """Finds definitions whose qualified name is *name* or ends with `.name`."""
+        short = name.rsplit(".", 1)[-1]
+        return [
+            (path, entry)
+            for path, entry in self._by_name.get(short, [])
+            if entry.name == name or entry.name.endswith(f".{name}")
+        ]
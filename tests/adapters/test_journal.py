@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from rune.adapters.persistence import journal as journal_module
+from rune.adapters.persistence.journal import UndoError, UndoJournal
+
+
+def _write(journal: UndoJournal, path: Path, data: bytes | None) -> None:
+    journal.record(path)
+    if data is None:
+        path.unlink()
+    else:
+        path.write_bytes(data)
+
+
+def test_undo_restores_each_turn(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(journal_module, "PATCH_MAX_BYTES", 2000)
+    big = b"".join(b"row %d\r\n" % i for i in range(300))
+    (tmp_path / "a.py").write_bytes(b"".join(b"line %d\n" % i for i in range(100)))
+    (tmp_path / "big.txt").write_bytes(big)
+    (tmp_path / "img.bin").write_bytes(b"\x00\x01\x02")
+    (tmp_path / "gone.txt").write_text("bye\n")
+    original = {p.name: p.read_bytes() for p in tmp_path.iterdir()}
+    journal = UndoJournal(tmp_path)
+
+    assert journal.begin_turn("first   change\nplease") == 1
+    _write(journal, tmp_path / "a.py", original["a.py"].replace(b"line 50\n", b"LINE 50\n"))
+    _write(journal, tmp_path / "a.py", original["a.py"].replace(b"line 50\n", b"fifty\n"))
+    _write(journal, tmp_path / "big.txt", big + b"tail\r\n")
+    _write(journal, tmp_path / "img.bin", b"\x00\x09")
+    _write(journal, tmp_path / "new.txt", b"hello\n")
+    _write(journal, tmp_path / "gone.txt", None)
+    turn = journal.end_turn()
+    assert turn.prompt == "first change please"
+    kinds = {entry.path: entry.before for entry in turn.entries}
+    assert kinds == {"a.py": "patch", "big.txt": "blob", "img.bin": "blob", "new.txt": "absent", "gone.txt": "blob"}
+
+    journal.begin_turn("no-op")
+    after_first = (tmp_path / "a.py").read_bytes()
+    _write(journal, tmp_path / "a.py", after_first)
+    assert journal.end_turn() is None
+    assert journal.turns() == [1]
+
+    journal.begin_turn("second")
+    _write(journal, tmp_path / "a.py", after_first + b"more\n")
+    journal.end_turn()
+    assert journal.turns() == [1, 2]
+
+    assert [t.number for t in journal.undo()] == [2]
+    assert (tmp_path / "a.py").read_bytes() == after_first
+    assert [t.number for t in journal.undo(1)] == [1]
+    assert {p.name: p.read_bytes() for p in tmp_path.iterdir() if p.name != ".rune"} == original
+    assert list((tmp_path / ".rune" / "journal" / "objects").glob("*/*")) == []
+    with pytest.raises(ValueError, match="Nothing to undo"):
+        journal.undo()
+
+
+def test_undo_refuses_files_changed_since(tmp_path: Path) -> None:
+    (tmp_path / "a.txt").write_text("one\n")
+    journal = UndoJournal(tmp_path)
+    journal.begin_turn("edit")
+    _write(journal, tmp_path / "a.txt", b"two\n")
+    journal.end_turn()
+    (tmp_path / "a.txt").write_text("edited by hand\n")
+
+    with pytest.raises(ValueError, match="a.txt was changed after turn 1"):
+        journal.undo()
+    assert (tmp_path / "a.txt").read_text() == "edited by hand\n"
+    assert journal.turns() == [1]
+
+
+def test_partial_undo_reports_the_turns_undone(tmp_path: Path) -> None:
+    (tmp_path / "a.txt").write_text("one\n")
+    (tmp_path / "b.txt").write_text("one\n")
+    journal = UndoJournal(tmp_path)
+    journal.begin_turn("first")
+    _write(journal, tmp_path / "a.txt", b"two\n")
+    journal.end_turn()
+    journal.begin_turn("second")
+    _write(journal, tmp_path / "b.txt", b"two\n")
+    journal.end_turn()
+    (tmp_path / "a.txt").write_text("edited by hand\n")
+
+    with pytest.raises(UndoError, match="a.txt was changed after turn 1") as error:
+        journal.undo(1)
+    assert [turn.number for turn in error.value.undone] == [2]
+    assert (tmp_path / "b.txt").read_text() == "one\n"
+    assert journal.turns() == [1]
+
+
+def test_failed_undo_leaves_the_turn_applied(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(journal_module, "PATCH_MAX_BYTES", 100)
+    (tmp_path / "a.txt").write_text("one\n")
+    (tmp_path / "big.bin").write_bytes(b"x" * 1000)
+    journal = UndoJournal(tmp_path)
+    journal.begin_turn("edit")
+    _write(journal, tmp_path / "a.txt", b"two\n")
+    _write(journal, tmp_path / "big.bin", b"y" * 1000)
+    journal.end_turn()
+
+    rename = os.rename
+
+    def replace_once(src, dst):
+        monkeypatch.setattr(os, "replace", fail)
+        rename(src, dst)
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", replace_once)
+    with pytest.raises(UndoError, match="disk full"):
+        journal.undo()
+    monkeypatch.undo()
+
+    assert (tmp_path / "a.txt").read_text() == "two\n"
+    assert (tmp_path / "big.bin").read_bytes() == b"y" * 1000
+    assert sorted(p.name for p in tmp_path.iterdir()) == [".rune", "a.txt", "big.bin"]
+    assert journal.turns() == [1]
+    journal.undo()
+    assert (tmp_path / "big.bin").read_bytes() == b"x" * 1000
+
+
+def test_record_outside_a_turn_does_nothing(tmp_path: Path) -> None:
+    (tmp_path / "a.txt").write_text("one\n")
+    journal = UndoJournal(tmp_path)
+    _write(journal, tmp_path / "a.txt", b"two\n")
+    assert journal.end_turn() is None
+    assert not (tmp_path / ".rune").exists()
+
+
+def test_large_pre_images_are_linked_and_dropped_when_unused(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(journal_module, "PATCH_MAX_BYTES", 100)
+    big = tmp_path / "big.txt"
+    original = b"x" * 1000
+    big.write_bytes(original)
+    journal = UndoJournal(tmp_path)
+    objects = tmp_path / ".rune" / "journal" / "objects"
+
+    journal.begin_turn("failed edit")
+    journal.record(big, linkable=True)
+    assert len(list(objects.glob("*/*"))) == 1
+    assert journal.end_turn() is None
+    assert list(objects.glob("*/*")) == []
+
+    journal.begin_turn("replace")
+    journal.record(big, linkable=True)
+    (tmp_path / "new.tmp").write_bytes(b"y" * 1000)
+    (tmp_path / "new.tmp").replace(big)
+    turn = journal.end_turn()
+    assert [entry.before for entry in turn.entries] == ["blob"]
+
+    journal.undo()
+    assert big.read_bytes() == original
+    assert list(objects.glob("*/*")) == []
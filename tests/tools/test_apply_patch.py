@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from rune.tools.apply_patch import apply_patch
+
+
+def _numbered(n: int) -> str:
+    return "".join(f"line {i}\n" for i in range(1, n + 1))
+
+
+def test_apply_patch_multi_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "a.txt").write_text(_numbered(10))
+    (tmp_path / "old.txt").write_text("bye\n")
+
+    patch = """diff --git a/a.txt b/a.txt
+index 1111111..2222222 100644
+--- a/a.txt
++++ b/a.txt
+@@ -2,3 +2,3 @@
+ line 2
+-line 3
++line three
+ line 4
+@@ -8,3 +8,4 @@
+ line 8
+ line 9
+ line 10
++line 11
+--- /dev/null
++++ b/pkg/new.txt
+@@ -0,0 +1,2 @@
++hello
++world
+--- a/old.txt
++++ /dev/null
+@@ -1 +0,0 @@
+-bye
+"""
+
+    result = apply_patch(mock_run_context, patch)
+
+    assert [(f["path"], f["status"]) for f in result.data["files"]] == [
+        ("a.txt", "modified"),
+        ("pkg/new.txt", "created"),
+        ("old.txt", "deleted"),
+    ]
+    expected = _numbered(11).replace("line 3\n", "line three\n")
+    assert (tmp_path / "a.txt").read_text() == expected
+    assert (tmp_path / "pkg" / "new.txt").read_text() == "hello\nworld\n"
+    assert not (tmp_path / "old.txt").exists()
+    assert "+++ b/pkg/new.txt" in result.data["diff"]
+
+
+def test_apply_patch_offset_and_fuzz(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "a.txt").write_text(_numbered(50))
+
+    # Wrong line numbers and counts, and a first context line that has since changed.
+    patch = """--- a/a.txt
++++ b/a.txt
+@@ -10,4 +10,4 @@
+ line twenty-nine
+ line 30
+-line 31
++line 31 changed
+ line 32
+"""
+
+    result = apply_patch(mock_run_context, patch)
+
+    assert result.data["files"][0]["adjusted"] == ["hunk 1 at line 30, offset +19, fuzz 1"]
+    assert "line 31 changed\nline 32\n" in (tmp_path / "a.txt").read_text()
+
+
+def test_apply_patch_failure_changes_nothing(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "a.txt").write_text("one\ntwo\n")
+    (tmp_path / "b.txt").write_text("three\n")
+
+    patch = """--- a/a.txt
++++ b/a.txt
+@@ -1,2 +1,2 @@
+-one
++ONE
+ two
+--- a/b.txt
++++ b/b.txt
+@@ -1 +1 @@
+-four
++FOUR
+"""
+
+    with pytest.raises(ValueError, match="Hunk 1 of b.txt .* does not apply"):
+        apply_patch(mock_run_context, patch)
+
+    assert (tmp_path / "a.txt").read_text() == "one\ntwo\n"
+    assert (tmp_path / "b.txt").read_text() == "three\n"
+
+
+def test_apply_patch_no_newline_at_end(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "a.txt").write_text("one\ntwo")
+
+    patch = """--- a/a.txt
++++ b/a.txt
+@@ -1,2 +1,3 @@
+ one
+-two
+\\ No newline at end of file
++two
++three
+"""
+
+    apply_patch(mock_run_context, patch)
+    assert (tmp_path / "a.txt").read_text() == "one\ntwo\nthree\n"
+
+
+def test_apply_patch_keeps_the_files_context_whitespace(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "a.go").write_bytes(b"func f() {\n\tx := 1 \n\ty := 2\n\treturn\n}\n")
+
+    patch = """--- a/a.go
++++ b/a.go
+@@ -1,5 +1,5 @@
+ func f() {
+     x := 1
+-    y := 2
++\ty := 3
+     return
+ }
+"""
+
+    apply_patch(mock_run_context, patch)
+    assert (tmp_path / "a.go").read_bytes() == b"func f() {\n\tx := 1 \n\ty := 3\n\treturn\n}\n"
+
+
+def test_apply_patch_sql_comments_inside_a_hunk(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "q.sql").write_text("SELECT 1;\n-- old note\nSELECT 2;\n")
+    (tmp_path / "b.txt").write_text("b\n")
+
+    patch = """--- a/q.sql
++++ b/q.sql
+@@ -1,3 +1,3 @@
+ SELECT 1;
+--- old note
++++ new note
+ SELECT 2;
+--- a/b.txt
++++ b/b.txt
+@@ -1 +1 @@
+-b
++B
+"""
+
+    result = apply_patch(mock_run_context, patch)
+    assert [f["path"] for f in result.data["files"]] == ["q.sql", "b.txt"]
+    assert (tmp_path / "q.sql").read_text() == "SELECT 1;\n++ new note\nSELECT 2;\n"
+    assert (tmp_path / "b.txt").read_text() == "B\n"
+
+
+def test_apply_patch_rename_onto_existing_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "a.txt").write_text("a\n")
+    (tmp_path / "b.txt").write_text("b\n")
+    rename = """--- a/a.txt
++++ b/b.txt
+@@ -1 +1 @@
+-a
++A
+"""
+
+    with pytest.raises(FileExistsError, match="Cannot rename a.txt to b.txt"):
+        apply_patch(mock_run_context, rename)
+    assert (tmp_path / "b.txt").read_text() == "b\n"
+
+    delete_first = """--- a/b.txt
++++ /dev/null
+@@ -1 +0,0 @@
+-b
+""" + rename
+    apply_patch(mock_run_context, delete_first)
+    assert not (tmp_path / "a.txt").exists()
+    assert (tmp_path / "b.txt").read_text() == "A\n"
@@ -2,7 +2,10 @@ from __future__ import annotations
 import pytest
 from pathlib import Path
 
-from rune.tools.edit_file import edit_file
+import rune.tools.edit_file as edit_file_module
+from rune.tools.edit_file import EditFilesEdits, edit_file, edit_files
+from rune.tools.read_file import read_file
+from rune.utils import largefile
 
 
 def test_edit_file_success(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context) -> None:
@@ -85,3 +88,162 @@ def test_edit_file_outside_project_directory(tmp_path: Path, monkeypatch: pytest
         outside_file.unlink()
     except OSError:
         pass
+
+
+def test_edit_file_multiple_blocks_keep_line_index_current(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    target = tmp_path / "many.py"
+    target.write_text("".join(f"    value_{i} = {i}\n" for i in range(50)))
+
+    # Unindented two-line searches go through the whitespace-flexible matcher,
+    # and every block shifts the lines that the following blocks match.
+    diff = "\n".join(
+        f'''<<<<<<< SEARCH
+value_{i} = {i}
+value_{i + 1} = {i + 1}
+=======
+value_{i} = {i}
+extra_{i} = {i}
+value_{i + 1} = {i + 1}
+>>>>>>> REPLACE'''
+        for i in (3, 20, 48)
+    )
+
+    edit_file(mock_run_context, "many.py", diff)
+    lines = target.read_text().splitlines()
+    assert len(lines) == 53
+    assert lines[3:6] == ["    value_3 = 3", "    extra_3 = 3", "    value_4 = 4"]
+    assert lines[21:24] == ["    value_20 = 20", "    extra_20 = 20", "    value_21 = 21"]
+    assert lines[50:53] == ["    value_48 = 48", "    extra_48 = 48", "    value_49 = 49"]
+
+
+def _block(search: str, replace: str) -> str:
+    return f"<<<<<<< SEARCH\n{search}\n=======\n{replace}\n>>>>>>> REPLACE"
+
+
+def test_edit_files_applies_all_edits(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "a.py").write_text("def old():\n    pass\n")
+    (tmp_path / "b.py").write_text("from a import old\nold()\n")
+
+    result = edit_files(
+        mock_run_context,
+        [
+            EditFilesEdits("a.py", _block("def old():", "def new():")),
+            EditFilesEdits("b.py", _block("from a import old", "from a import new")),
+            EditFilesEdits("b.py", _block("old()", "new()")),
+        ],
+    )
+
+    assert result.data["status"] == "modified"
+    assert result.data["files"] == [
+        {"path": "a.py", "blocks_applied": 1},
+        {"path": "b.py", "blocks_applied": 2},
+    ]
+    assert "+++ b/a.py" in result.data["diff"]
+    assert "+++ b/b.py" in result.data["diff"]
+    assert (tmp_path / "a.py").read_text() == "def new():\n    pass\n"
+    assert (tmp_path / "b.py").read_text() == "from a import new\nnew()\n"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.py", "b.py"]
+
+
+def test_edit_files_changes_nothing_when_one_edit_fails(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "a.py").write_text("x = 1\n")
+    (tmp_path / "b.py").write_text("y = 2\n")
+
+    with pytest.raises(ValueError, match=r"Edit 2 \(b.py\) failed, no files were changed"):
+        edit_files(
+            mock_run_context,
+            [
+                EditFilesEdits("a.py", _block("x = 1", "x = 10")),
+                EditFilesEdits("b.py", _block("z = 3", "z = 30")),
+            ],
+        )
+
+    assert (tmp_path / "a.py").read_text() == "x = 1\n"
+    assert (tmp_path / "b.py").read_text() == "y = 2\n"
+
+
+def test_edit_files_reports_non_utf8_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "a.py").write_text("x = 1\n")
+    (tmp_path / "latin.txt").write_bytes("café = 1\n".encode("latin-1"))
+
+    with pytest.raises(ValueError, match=r"Edit 2 \(latin.txt\) failed, no files were changed"):
+        edit_files(
+            mock_run_context,
+            [
+                EditFilesEdits("a.py", _block("x = 1", "x = 10")),
+                EditFilesEdits("latin.txt", _block("café = 1", "café = 2")),
+            ],
+        )
+
+    assert (tmp_path / "a.py").read_text() == "x = 1\n"
+    assert (tmp_path / "latin.txt").read_bytes() == "café = 1\n".encode("latin-1")
+
+
+def test_edit_file_line_range_uses_read_hash(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "f.py").write_text("a = 1\nb = 2\nc = 3\nd = 4")
+
+    read = read_file(mock_run_context, "f.py", start_line=2, end_line=3)
+    result = edit_file(mock_run_context, "f.py", start_line=2, end_line=3, replacement="bc = 23\n", expected_hash=read.data["range_hash"])
+    assert result.data["lines_replaced"] == [2, 3]
+    assert result.data["new_lines"] == [2, 2]
+    assert (tmp_path / "f.py").read_text() == "a = 1\nbc = 23\nd = 4"
+
+    # The returned hash chains into the next edit; the last line keeps having no newline.
+    edit_file(mock_run_context, "f.py", start_line=2, end_line=2, replacement="", expected_hash=result.data["range_hash"])
+    last = read_file(mock_run_context, "f.py", start_line=2, end_line=2)
+    edit_file(mock_run_context, "f.py", start_line=2, end_line=2, replacement="d = 40\ne = 5", expected_hash=last.data["range_hash"])
+    edit_file(mock_run_context, "f.py", start_line=1, end_line=0, replacement="# header", expected_hash="e3b0c44298fc1c14")
+    assert (tmp_path / "f.py").read_text() == "# header\na = 1\nd = 40\ne = 5"
+
+
+def test_edit_file_line_range_rejects_stale_hash(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "f.py").write_text("a = 1\nb = 2\n")
+    read = read_file(mock_run_context, "f.py", start_line=2, end_line=2)
+    (tmp_path / "f.py").write_text("a = 1\nb = 20\n")
+
+    with pytest.raises(ValueError, match="changed since it was read"):
+        edit_file(mock_run_context, "f.py", start_line=2, end_line=2, replacement="b = 3", expected_hash=read.data["range_hash"])
+    with pytest.raises(ValueError, match="Invalid line range 3-5"):
+        edit_file(mock_run_context, "f.py", start_line=3, end_line=5, replacement="x", expected_hash="e3b0c44298fc1c14")
+    with pytest.raises(ValueError, match="either diff or a line range"):
+        edit_file(mock_run_context, "f.py", "diff", start_line=1, end_line=1, replacement="x", expected_hash="0" * 16)
+    assert (tmp_path / "f.py").read_text() == "a = 1\nb = 20\n"
+
+
+def test_edit_file_streams_large_files(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    monkeypatch.setattr(edit_file_module, "LARGE_FILE_THRESHOLD", 100)
+    monkeypatch.setattr(largefile, "COPY_CHUNK", 7)
+    lines = [f"line {i}" for i in range(1, 51)]
+    target = tmp_path / "big.txt"
+    target.write_bytes("\r\n".join(lines).encode() + b"\r\n")
+
+    diff = "<<<<<<< SEARCH\nline 40\n=======\nforty\n>>>>>>> REPLACE\n<<<<<<< SEARCH\nline 10\nline 11\n=======\nten\n>>>>>>> REPLACE"
+    result = edit_file(mock_run_context, "big.txt", diff)
+
+    lines[39] = "forty"
+    lines[9:11] = ["ten"]
+    assert target.read_bytes() == "\r\n".join(lines).encode() + b"\r\n"
+    assert result.data["streamed"] is True
+    assert result.data["blocks_applied"] == 2
+    assert "@@ -10,2 +10,1 @@\n-line 10\n-line 11\n+ten\n" in result.data["diff"]
+    assert "@@ -40,1 +39,1 @@\n-line 40\n+forty\n" in result.data["diff"]
+    assert list(tmp_path.iterdir()) == [target]
+
+    with pytest.raises(ValueError, match="more than once"):
+        edit_file(mock_run_context, "big.txt", "<<<<<<< SEARCH\nline 1\n=======\nx\n>>>>>>> REPLACE")
+    with pytest.raises(ValueError, match="matched exactly"):
+        edit_file(mock_run_context, "big.txt", "<<<<<<< SEARCH\n  line 20\n=======\nx\n>>>>>>> REPLACE")
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from rune.tools.jobs import job_kill, job_status, job_tail, jobs_list
+from rune.tools.run_command import run_command
+from rune.utils import jobs as jobs_module
+from rune.utils.jobs import JobTable, prune_logs
+
+
+def _wait_until_done(mock_run_context, job_id: int) -> dict:
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        info = job_status(mock_run_context, job_id).data
+        if info["state"] != "running":
+            return info
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def _alive(pid: int) -> bool:
+    try:
+        state = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()[0]
+    except FileNotFoundError:
+        return False
+    return state != "Z"
+
+
+async def test_job_tail_and_status(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    started = await run_command(mock_run_context, "echo first; sleep 0.3; echo second >&2; exit 4", background=True)
+    job_id = started.data["job_id"]
+    assert (tmp_path / started.data["log_file"]).exists()
+
+    deadline = time.monotonic() + 5
+    while not (first := job_tail(mock_run_context, job_id).data)["content"]:
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+    assert first["content"] == "first\n"
+
+    info = _wait_until_done(mock_run_context, job_id)
+    assert info["state"] == "exited" and info["exit_code"] == 4
+    assert info["log_file"] == started.data["log_file"]
+    assert "cpu_time_s" in info and "peak_rss_mb" in info
+
+    rest = job_tail(mock_run_context, job_id).data
+    assert rest["content"] == "second\n"
+    assert rest["job"]["exit_code"] == 4
+    assert job_tail(mock_run_context, job_id).data["content"] == ""
+
+    listed = jobs_list(mock_run_context).data["jobs"]
+    assert [job["id"] for job in listed] == [job_id]
+
+    with pytest.raises(ValueError):
+        job_status(mock_run_context, job_id + 1)
+
+
+async def test_job_kill_stops_the_process_group(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    started = await run_command(mock_run_context, "sleep 30 & echo $!; wait", background=True)
+    job_id = started.data["job_id"]
+
+    deadline = time.monotonic() + 5
+    while not (child := job_tail(mock_run_context, job_id).data["content"].strip()):
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+    assert job_status(mock_run_context, job_id).data["state"] == "running"
+
+    info = job_kill(mock_run_context, job_id).data
+    assert info["state"] == "killed"
+    assert info["exit_code"] is not None
+    deadline = time.monotonic() + 5
+    while _alive(int(child)):
+        assert time.monotonic() < deadline, "the job's child survived"
+        time.sleep(0.02)
+
+
+def test_prune_logs_caps_total_size(tmp_path: Path) -> None:
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"{i}.log"
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (1000 + i, 1000 + i))
+        paths.append(path)
+
+    deleted = prune_logs(tmp_path, 250, keep={paths[0]})
+    assert deleted == paths[1:4]
+    assert sorted(tmp_path.iterdir()) == [paths[0], paths[4]]
+
+
+def test_job_log_is_rotated_at_the_cap(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(jobs_module, "MAX_JOB_LOG_BYTES", 1000)
+    table = JobTable()
+    job = table.start("seq 1 2000", tmp_path)
+    deadline = time.monotonic() + 5
+    while table.poll(job).running:
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+
+    assert job.rotations > 1
+    assert job.log_path.stat().st_size <= 1000
+    assert job.rotated_log_path.stat().st_size <= 1000
+    assert job.log_path.read_text().endswith("2000\n")
+    assert table.status(job)["log_rotations"] == job.rotations
+
+
+def test_close_kills_running_jobs(tmp_path: Path) -> None:
+    table = JobTable()
+    sleeping = table.start("sleep 30 & echo $!; wait", tmp_path)
+    done = table.start("true", tmp_path)
+    deadline = time.monotonic() + 5
+    while table.poll(done).running or not sleeping.log_path.read_text():
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+    child = int(sleeping.log_path.read_text())
+
+    table.close()
+    assert table.status(sleeping)["state"] == "killed"
+    assert table.status(done)["state"] == "exited"
+    deadline = time.monotonic() + 5
+    while _alive(child):
+        assert time.monotonic() < deadline, "the job's child survived"
+        time.sleep(0.02)
@@ -3,7 +3,7 @@ from __future__ import annotations
 import pytest
 from pathlib import Path
 
-from rune.tools.read_chunk import read_chunk
+from rune.tools.read_chunk import read_chunk, tail
 from pydantic_ai import RunContext
 from pydantic_ai.usage import Usage
 from rune.core.context import SessionContext
@@ -82,3 +82,68 @@ def test_read_chunk_outside_project_directory(tmp_path: Path, monkeypatch: pytes
         outside_file.unlink()
     except OSError:
         pass
+
+
+def test_read_chunk_from_end(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context: RunContext[SessionContext]) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "log.txt").write_text("first line\nsecond line\nthird\n")
+
+    # Starts at the first complete line within the last 15 bytes.
+    result = read_chunk(mock_run_context, "log.txt", from_end=15)
+    assert result.data["content"] == "third\n"
+    assert result.data["more"] is False
+
+    result = read_chunk(mock_run_context, "log.txt", from_end=1000)
+    assert result.data["content"] == "first line\nsecond line\nthird\n"
+
+
+def test_tail_returns_only_appended_lines(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context: RunContext[SessionContext]) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    log = tmp_path / "job.log"
+    log.write_text("start\n")
+
+    assert tail(mock_run_context, "job.log").data["content"] == "start\n"
+    assert tail(mock_run_context, "job.log").data["content"] == ""
+
+    with log.open("a") as f:
+        f.write("ERROR one\nok\nERROR tw")
+    result = tail(mock_run_context, "job.log", pattern="ERROR")
+    assert result.data["content"] == "ERROR one\n"
+    assert result.data["pending_bytes"] == len("ERROR tw")
+
+    with log.open("a") as f:
+        f.write("o\n")
+    assert tail(mock_run_context, "job.log").data["content"] == "ERROR two\n"
+
+    # A truncated file is read again from the start.
+    log.write_text("new\n")
+    assert tail(mock_run_context, "job.log").data["content"] == "new\n"
+
+
+def test_tail_respects_max_bytes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context: RunContext[SessionContext]) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    log = tmp_path / "job.log"
+    log.write_text("")
+    tail(mock_run_context, "job.log")
+
+    log.write_text("aaaa\nbbbb\ncccc\n")
+    first = tail(mock_run_context, "job.log", max_bytes=12)
+    assert first.data["content"] == "aaaa\nbbbb\n"
+    assert first.data["more"] is True
+    second = tail(mock_run_context, "job.log", max_bytes=12)
+    assert second.data["content"] == "cccc\n"
+    assert second.data["more"] is False
+
+
+def test_read_chunk_binary_summary(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context: RunContext[SessionContext]) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "module.pyc").write_bytes(b"\xa7\r\r\n\x00\x00\x00\x00" + bytes(50))
+
+    result = read_chunk(mock_run_context, "module.pyc")
+    assert result.data["binary"] is True
+    assert result.data["type"] == "Python bytecode"
+    assert "content" not in result.data
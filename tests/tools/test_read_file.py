@@ -71,3 +71,115 @@ def test_read_file_outside_project_directory(
         outside_file.unlink()
     except OSError:
         pass
+
+
+def test_read_file_unchanged_short_circuit(tmp_path, monkeypatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "test_file.txt").write_text("hello world")
+
+    mock_run_context.deps.begin_tool_call()
+    first = read_file(mock_run_context, "test_file.txt")
+    assert first.data["content"] == "hello world"
+
+    mock_run_context.deps.begin_tool_call()
+    second = read_file(mock_run_context, "test_file.txt")
+    assert second.data["status"] == "unchanged"
+    assert "content" not in second.data
+    assert second.data["unchanged_since_tool_call"] == first.data["tool_call"] == 1
+    assert second.data["sha256"] == first.data["sha256"]
+
+    forced = read_file(mock_run_context, "test_file.txt", force=True)
+    assert forced.data["content"] == "hello world"
+
+
+def test_read_file_rereads_after_change(tmp_path, monkeypatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    test_file = tmp_path / "test_file.txt"
+    test_file.write_text("hello world")
+    read_file(mock_run_context, "test_file.txt")
+
+    test_file.write_text("goodbye world!")
+    result = read_file(mock_run_context, "test_file.txt")
+    assert result.data["content"] == "goodbye world!"
+
+    # Touching the file without changing it keeps the short-circuit.
+    os.utime(test_file, ns=(0, 0))
+    result = read_file(mock_run_context, "test_file.txt")
+    assert result.data["status"] == "unchanged"
+
+
+def test_read_file_outline_mode(tmp_path, monkeypatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "mod.py").write_text(
+        "import os\n"
+        "\n"
+        "class Greeter(Base):\n"
+        '    """Says hello."""\n'
+        "\n"
+        "    @staticmethod\n"
+        "    def greet(name: str) -> str:\n"
+        "        return f'hi {name}'\n"
+        "\n"
+        "async def main():\n"
+        "    pass\n"
+    )
+
+    result = read_file(mock_run_context, "mod.py", mode="outline")
+    outline = result.data["outline"].splitlines()
+    assert outline == [
+        "L3-8 class Greeter(Base)  # Says hello.",
+        "  L6-8 def greet(name: str) -> str",
+        "L10-11 async def main()",
+    ]
+
+
+def test_read_file_outline_regex_fallback(tmp_path, monkeypatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "lib.rs").write_text(
+        "pub struct Point {\n    x: i32,\n}\n\nfn origin() -> Point {\n    Point { x: 0 }\n}\n"
+    )
+
+    result = read_file(mock_run_context, "lib.rs", mode="outline")
+    assert result.data["outline"].splitlines() == [
+        "L1-3 pub struct Point",
+        "L5-7 fn origin() -> Point",
+    ]
+
+
+def test_read_file_line_range(tmp_path, monkeypatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "lines.txt").write_text("one\ntwo\nthree\nfour\n")
+
+    result = read_file(mock_run_context, "lines.txt", start_line=2, end_line=3)
+    assert result.data["content"] == "two\nthree"
+    assert result.data["total_lines"] == 4
+
+    with pytest.raises(ValueError, match="Invalid line range"):
+        read_file(mock_run_context, "lines.txt", start_line=5)
+
+
+def test_read_file_binary_summary(tmp_path, monkeypatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "image.png").write_bytes(b"\x89PNG\r\n\x1a\n" + bytes(100))
+
+    result = read_file(mock_run_context, "image.png")
+    assert result.data["binary"] is True
+    assert result.data["type"] == "PNG image"
+    assert result.data["size"] == 108
+    assert "content" not in result.data
+
+
+def test_read_file_detects_encoding(tmp_path, monkeypatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "latin1.csv").write_bytes("name,city\nJosé,Málaga\n".encode("latin-1"))
+    (tmp_path / "utf16.txt").write_bytes("héllo\n".encode("utf-16"))
+
+    assert read_file(mock_run_context, "latin1.csv").data["content"] == "name,city\nJosé,Málaga\n"
+    assert read_file(mock_run_context, "utf16.txt").data["content"] == "héllo\n"
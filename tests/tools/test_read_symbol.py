@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import pytest
+from pathlib import Path
+
+from rune.tools.read_symbol import read_symbol
+from pydantic_ai import RunContext
+from rune.core.context import SessionContext
+
+
+SOURCE = '''class Applyer:
+    """Applies things."""
+
+    def apply(self, x):
+        return x + 1
+
+    def revert(self, x):
+        return x - 1
+
+
+def apply(y):
+    return y
+'''
+
+
+def test_read_symbol_qualified_and_bare(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context: RunContext[SessionContext]) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "mod.py").write_text(SOURCE)
+
+    result = read_symbol(mock_run_context, ["Applyer.revert", "apply", "Missing"])
+    symbols = result.data["symbols"]
+
+    assert [s["name"] for s in symbols] == ["Applyer.revert", "Applyer.apply", "apply"]
+    assert symbols[0]["path"] == str(Path("pkg") / "mod.py")
+    assert symbols[0]["source"] == "    def revert(self, x):\n        return x - 1"
+    assert (symbols[0]["start_line"], symbols[0]["end_line"]) == (7, 8)
+    assert result.data["not_found"] == ["Missing"]
+
+
+def test_read_symbol_picks_up_edits(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context: RunContext[SessionContext]) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    mod = tmp_path / "mod.py"
+    mod.write_text(SOURCE)
+    read_symbol(mock_run_context, ["Applyer"])
+
+    mod.write_text("def renamed():\n    pass\n")
+    with pytest.raises(ValueError, match="No definitions found"):
+        read_symbol(mock_run_context, ["Applyer"])
+    result = read_symbol(mock_run_context, ["renamed"])
+    assert result.data["symbols"][0]["source"] == "def renamed():\n    pass"
+
+
+def test_read_symbol_outside_project_directory(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context: RunContext[SessionContext]) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    with pytest.raises(PermissionError):
+        read_symbol(mock_run_context, ["anything"], path="..")
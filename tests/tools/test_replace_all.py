@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from rune.tools import replace_all as replace_all_module
+from rune.tools.replace_all import replace_all
+
+
+def _project(root: Path) -> None:
+    (root / "pkg").mkdir()
+    (root / "pkg" / "a.py").write_text("from pkg.util import old_name\n\nold_name()\nold_name_suffix = 1\n")
+    (root / "pkg" / "b.py").write_bytes(b"x = old_name\r\n")
+    (root / "notes.md").write_text("old_name is documented here\n")
+    (root / "ignored").mkdir()
+    (root / "ignored" / "c.py").write_text("old_name\n")
+    (root / ".gitignore").write_text("ignored/\n")
+    (root / "blob.bin").write_bytes(b"\x00old_name\x00")
+
+
+def test_replace_all_dry_run_then_apply(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    _project(tmp_path)
+
+    preview = replace_all(mock_run_context, r"\bold_name\b", "new_name", "*.py", regex=True)
+    assert preview.data["status"] == "dry_run"
+    assert preview.data["files"] == [
+        {"path": "pkg/a.py", "replacements": 2},
+        {"path": "pkg/b.py", "replacements": 1},
+    ]
+    assert "+old_name" not in preview.data["diff"] and "+new_name()" in preview.data["diff"]
+    assert "old_name()" in (tmp_path / "pkg" / "a.py").read_text()
+
+    result = replace_all(mock_run_context, r"\bold_name\b", "new_name", "*.py", regex=True, dry_run=False)
+    assert result.data["status"] == "replaced"
+    assert result.data["total_replacements"] == 3
+    assert (tmp_path / "pkg" / "a.py").read_text() == "from pkg.util import new_name\n\nnew_name()\nold_name_suffix = 1\n"
+    assert (tmp_path / "pkg" / "b.py").read_bytes() == b"x = new_name\r\n"
+    assert (tmp_path / "ignored" / "c.py").read_text() == "old_name\n"
+    assert (tmp_path / "notes.md").read_text() == "old_name is documented here\n"
+
+
+def test_replace_all_literal_and_no_matches(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    _project(tmp_path)
+
+    result = replace_all(mock_run_context, "old_name", "x.y", dry_run=False)
+    assert [f["path"] for f in result.data["files"]] == ["notes.md", "pkg/a.py", "pkg/b.py"]
+    assert (tmp_path / "blob.bin").read_bytes() == b"\x00old_name\x00"
+
+    assert replace_all(mock_run_context, "old_name", "z").data["status"] == "no_matches"
+    with pytest.raises(ValueError, match="Invalid regular expression"):
+        replace_all(mock_run_context, "(", "z", regex=True)
+
+
+def test_replace_all_without_rg_skips_hidden_dirs(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    monkeypatch.setattr(replace_all_module, "_rg_candidates", lambda *args: None)
+    (tmp_path / "a.py").write_text("old_name\n")
+    (tmp_path / ".rune" / "sessions").mkdir(parents=True)
+    (tmp_path / ".rune" / "sessions" / "s.json").write_text('{"text": "old_name"}\n')
+    (tmp_path / ".config").mkdir()
+    (tmp_path / ".config" / "c.py").write_text("old_name\n")
+    (tmp_path / ".hidden.py").write_text("old_name\n")
+
+    result = replace_all(mock_run_context, "old_name", "new_name", dry_run=False)
+    assert result.data["files"] == [{"path": "a.py", "replacements": 1}]
+    assert (tmp_path / ".rune" / "sessions" / "s.json").read_text() == '{"text": "old_name"}\n'
+    assert (tmp_path / ".config" / "c.py").read_text() == "old_name\n"
+    assert (tmp_path / ".hidden.py").read_text() == "old_name\n"
+
+
+def test_replace_all_keeps_utf8_bom(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "bom.cs").write_bytes(b"\xef\xbb\xbfvar old_name = 1;\r\n")
+
+    result = replace_all(mock_run_context, "old_name", "new_name", dry_run=False)
+    assert result.data["files"] == [{"path": "bom.cs", "replacements": 1}]
+    assert (tmp_path / "bom.cs").read_bytes() == b"\xef\xbb\xbfvar new_name = 1;\r\n"
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import ast
+from pathlib import Path
+
+import pytest
+
+from rune.tools.replace_definition import replace_definition
+
+SOURCE = '''import functools
+
+
+class Cache:
+    """Caches things."""
+
+    @functools.lru_cache
+    def get(self, key):  # hot path
+        value = self._load(key)
+        return value
+
+    def _load(self, key):
+        return key
+
+
+def main():
+    return Cache().get(1)
+'''
+
+
+def test_replace_definition_method_keeps_decorators_and_surroundings(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "cache.py").write_text(SOURCE)
+
+    result = replace_definition(mock_run_context, "cache.py", "Cache.get", "def get(self, key):\n    return self._load(key) * 2\n")
+
+    assert result.data["status"] == "modified"
+    assert result.data["old_lines"] == [7, 10]
+    assert result.data["new_lines"] == [7, 9]
+    expected = SOURCE.replace("    def get(self, key):  # hot path\n        value = self._load(key)\n        return value\n", "    def get(self, key):\n        return self._load(key) * 2\n")
+    assert (tmp_path / "cache.py").read_text() == expected
+    assert "+        return self._load(key) * 2" in result.data["diff"]
+
+
+def test_replace_definition_with_new_decorators(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "cache.py").write_text(SOURCE)
+
+    replace_definition(mock_run_context, "cache.py", "Cache.get", "        @staticmethod\n        def get(key):\n            return key\n")
+
+    text = (tmp_path / "cache.py").read_text()
+    assert "functools.lru_cache" not in text
+    assert "    @staticmethod\n    def get(key):\n        return key\n\n    def _load" in text
+
+
+def test_replace_definition_rejects_unparseable_result(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "cache.py").write_text(SOURCE)
+
+    with pytest.raises(ValueError, match="does not parse"):
+        replace_definition(mock_run_context, "cache.py", "main", "def main(:\n    pass\n")
+    with pytest.raises(ValueError, match="exactly one class or function"):
+        replace_definition(mock_run_context, "cache.py", "main", "x = 1\n")
+    assert (tmp_path / "cache.py").read_text() == SOURCE
+
+
+def test_replace_definition_unknown_or_ambiguous_name(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "cache.py").write_text(SOURCE)
+    (tmp_path / "compat.py").write_text("try:\n    from fast import load\nexcept ImportError:\n    def load():\n        pass\nelse:\n    def load():\n        pass\n")
+
+    with pytest.raises(ValueError, match="Did you mean: Cache.get"):
+        replace_definition(mock_run_context, "cache.py", "Cache.gett", "def gett(self):\n    pass\n")
+    with pytest.raises(ValueError, match="defined 2 times"):
+        replace_definition(mock_run_context, "compat.py", "load", "def load():\n    return 1\n")
+
+
+def test_replace_definition_keeps_trailing_comment(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "mod.py").write_text("def f(x):\n    return x.y  # type: ignore[attr-defined]\n\n\ndef g():\n    pass  # noqa\n")
+
+    replace_definition(mock_run_context, "mod.py", "f", "def f(x):\n    return x.z\n")
+    replace_definition(mock_run_context, "mod.py", "g", "def g():\n    return 1  # new comment\n")
+
+    assert (tmp_path / "mod.py").read_text() == "def f(x):\n    return x.z  # type: ignore[attr-defined]\n\n\ndef g():\n    return 1  # new comment\n"
+
+
+def test_replace_definition_leaves_multiline_strings_alone(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "cache.py").write_text(SOURCE)
+    new_source = 'def get(self, key):\n    """Loads *key*.\n\n    Uses the database.\n    """\n    query = """\nSELECT *\nFROM t\n"""\n    return self.db.run(query, f"""{key}\n  suffix""")\n'
+
+    replace_definition(mock_run_context, "cache.py", "Cache.get", new_source)
+
+    text = (tmp_path / "cache.py").read_text()
+    # Only lines that start code move; string contents keep their exact values.
+    assert '    def get(self, key):\n        """Loads *key*.\n\n    Uses the database.\n    """\n' in text
+    assert '        query = """\nSELECT *\nFROM t\n"""\n        return self.db.run(query, f"""{key}\n  suffix""")\n' in text
+    new_get = [node for node in ast.walk(ast.parse(text)) if isinstance(node, ast.FunctionDef) and node.name == "get"][0]
+    assert ast.get_docstring(new_get, clean=False) == "Loads *key*.\n\n    Uses the database.\n    "
+    assert new_get.body[1].value.value == "\nSELECT *\nFROM t\n"
+
+
+def test_replace_definition_trailing_comment_with_comment_line_after(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "mod.py").write_text("def f(x):\n    return x.y  # type: ignore\n\n\ndef g():\n    pass\n")
+
+    replace_definition(mock_run_context, "mod.py", "f", "def f(x):\n    return x.z\n    # TODO: cache this\n")
+
+    assert (tmp_path / "mod.py").read_text() == "def f(x):\n    return x.z  # type: ignore\n    # TODO: cache this\n\n\ndef g():\n    pass\n"
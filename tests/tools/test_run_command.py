@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import pytest
 
-from rune.tools.run_command import run_command
+from rune.tools.run_command import LIVE_MAX_LINE_CHARS, _create_live_content, _LiveTail, run_command
 
 
 async def test_run_command_success(mock_run_context) -> None:
@@ -34,3 +34,83 @@ async def test_run_command_background(mock_run_context) -> None:
     )
     assert "pid" in result.data
     assert "log_file" in result.data
+
+
+async def test_run_command_large_output_is_capped(tmp_path, monkeypatch, mock_run_context) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    result = await run_command(mock_run_context, "seq 1 200000")
+    assert result.data["stdout_total_lines"] == 200000
+    assert len(result.data["stdout"]) < 40_000
+    assert result.data["stdout"].startswith("1\n2\n") and result.data["stdout"].endswith("199999\n200000\n")
+    log = tmp_path / result.data["stdout_log"]
+    assert log.stat().st_size == result.data["stdout_total_bytes"]
+
+    with pytest.raises(ValueError) as error:
+        await run_command(mock_run_context, "seq 1 200000; exit 3")
+    assert "exit code 3" in str(error.value) and len(str(error.value)) < 40_000
+
+
+def test_live_content_renders_only_the_tail() -> None:
+    stdout, stderr = _LiveTail(), _LiveTail()
+    stdout.feed("".join(f"test_{i} PASSED\n" for i in range(1000)))
+    stderr.feed("warning: slow\n")
+
+    frame = _create_live_content("pytest -v", stdout, stderr, rows=9)
+    texts = [r.plain for r in frame.renderables]
+    assert texts[2] == "… 992 earlier lines"
+    assert texts[3].splitlines() == [f"test_{i} PASSED" for i in range(992, 1000)]
+    assert texts[-1] == "warning: slow"
+
+
+async def test_run_command_huge_line_and_split_utf8(mock_run_context) -> None:
+    command = "python -c \"import sys; sys.stdout.write('x' * 300000 + '\\n'); sys.stdout.flush(); sys.stdout.buffer.write(b'\\xc3'); sys.stdout.flush(); sys.stdout.buffer.write(b'\\xa9 done')\""
+    result = await run_command(mock_run_context, command)
+    assert result.data["stdout_total_bytes"] == 300008
+    assert result.data["stdout"].endswith("é done")
+
+    tail = _LiveTail()
+    tail.feed("a" * 5000)
+    tail.feed("b\nprompt> ")
+    assert tail.last(5) == ["a" * LIVE_MAX_LINE_CHARS + " …", "prompt> "]
+
+
+async def test_run_command_persistent_keeps_state(tmp_path, mock_run_context) -> None:
+    mock_run_context.deps.current_working_dir = tmp_path
+    (tmp_path / "sub").mkdir()
+    try:
+        first = await run_command(mock_run_context, "cd sub && export GREETING=hi && printf 'no newline'", persistent=True)
+        assert first.data["stdout"] == "no newline"
+        assert "shell" not in first.data
+        second = await run_command(mock_run_context, "echo $GREETING; pwd; echo oops >&2", persistent=True)
+        assert second.data["stdout"] == f"hi\n{tmp_path / 'sub'}\n"
+        assert second.data["stderr"] == "oops\n"
+
+        with pytest.raises(ValueError, match="exit code 2"):
+            await run_command(mock_run_context, "echo 'unbalanced", persistent=True)
+        with pytest.raises(ValueError, match="ended the persistent shell"):
+            await run_command(mock_run_context, "exit 4", persistent=True)
+        restarted = await run_command(mock_run_context, "echo ${GREETING:-gone}", persistent=True)
+        assert restarted.data["stdout"] == "gone\n"
+        assert "restarted" in restarted.data["shell"]
+
+        with pytest.raises(TimeoutError, match="persistent shell was killed"):
+            await run_command(mock_run_context, "sleep 5", timeout=0.2, persistent=True)
+        assert (await run_command(mock_run_context, "echo back", persistent=True)).data["stdout"] == "back\n"
+    finally:
+        mock_run_context.deps.shell.close()
+
+
+async def test_run_command_persistent_follows_the_working_directory(tmp_path, mock_run_context) -> None:
+    (tmp_path / "one").mkdir()
+    (tmp_path / "two").mkdir()
+    mock_run_context.deps.current_working_dir = tmp_path / "one"
+    try:
+        first = await run_command(mock_run_context, "export KEPT=yes; pwd", persistent=True)
+        assert first.data["stdout"] == f"{tmp_path / 'one'}\n"
+
+        mock_run_context.deps.current_working_dir = tmp_path / "two"
+        second = await run_command(mock_run_context, "echo $KEPT; pwd", persistent=True)
+        assert second.data["stdout"] == f"yes\n{tmp_path / 'two'}\n"
+    finally:
+        mock_run_context.deps.shell.close()
@@ -3,6 +3,8 @@ from __future__ import annotations
 import pytest
 from pathlib import Path
 
+import rune.tools.write_file as write_file_module
+import rune.utils.files as files_module
 from rune.tools.write_file import write_file
 from pydantic_ai import RunContext
 from pydantic_ai.usage import Usage
@@ -18,6 +20,15 @@ def test_write_file_create_new(tmp_path: Path, monkeypatch: pytest.MonkeyPatch,
     assert (tmp_path / "new_file.txt").read_text() == "hello world"
 
 
+def test_write_file_create_returns_compact_diff(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context: RunContext[SessionContext]) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    content = "".join(f"line {i}\n" for i in range(2000))
+    result = write_file(mock_run_context, "big.txt", content)
+    assert "# New content: 2000 lines, sha256 " in result.data["diff"]
+    assert "+line 1999" not in result.data["diff"]
+
+
 def test_write_file_overwrite_existing(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context: RunContext[SessionContext]) -> None:
     monkeypatch.chdir(tmp_path)
     mock_run_context.deps.current_working_dir = tmp_path
@@ -67,3 +78,31 @@ def test_write_file_outside_project_directory(tmp_path: Path, monkeypatch: pytes
 
     with pytest.raises(PermissionError):
         write_file(mock_run_context, "/tmp/should_fail.txt", "content")
+
+
+def test_write_file_skips_diff_for_large_writes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context: RunContext[SessionContext]) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    monkeypatch.setattr(write_file_module, "DIFF_MAX_BYTES", 100)
+    (tmp_path / "data.txt").write_text("old\n")
+    content = "".join(f"row {i}\n" for i in range(50))
+
+    result = write_file(mock_run_context, "data.txt", content)
+    assert result.data["status"] == "modified"
+    assert result.data["diff"].startswith(f"# Diff of data.txt skipped (4 -> {len(content)} bytes, 50 lines, sha256 ")
+    assert (tmp_path / "data.txt").read_text() == content
+    assert [p.name for p in tmp_path.iterdir()] == ["data.txt"]
+    assert write_file(mock_run_context, "data.txt", content).data["status"] == "unchanged"
+
+
+@pytest.mark.parametrize("enabled", [False, True])
+def test_write_file_follows_the_fsync_setting(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_run_context: RunContext[SessionContext], enabled: bool) -> None:
+    monkeypatch.chdir(tmp_path)
+    mock_run_context.deps.current_working_dir = tmp_path
+    monkeypatch.setattr(files_module, "FSYNC_WRITES", enabled)
+    synced = []
+    monkeypatch.setattr(files_module.os, "fsync", synced.append)
+
+    write_file(mock_run_context, "a.txt", "hello\n")
+    assert (tmp_path / "a.txt").read_text() == "hello\n"
+    assert bool(synced) is enabled
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from rune.utils.capture import OutputCapture
+
+
+def test_small_output_stays_in_memory(tmp_path: Path) -> None:
+    capture = OutputCapture(tmp_path / "out.log", head_bytes=10, tail_bytes=10)
+    for line in (b"one\n", b"two\n", b"three\n"):
+        capture.append(line)
+    capture.close()
+    assert capture.text() == "one\ntwo\nthree\n"
+    assert not capture.truncated
+    assert not (tmp_path / "out.log").exists()
+
+
+def test_large_output_keeps_head_and_tail_and_spills_everything(tmp_path: Path) -> None:
+    capture = OutputCapture(tmp_path / "out.log", head_bytes=16, tail_bytes=16)
+    lines = [b"line %03d\n" % i for i in range(200)]
+    for line in lines:
+        capture.append(line)
+    capture.close()
+
+    assert capture.truncated
+    assert (capture.total_bytes, capture.total_lines) == (1800, 200)
+    assert (tmp_path / "out.log").read_bytes() == b"".join(lines)
+    assert capture.text("out.log") == "line 000\n… 198 lines (1,782 bytes) omitted; full output in out.log …\nline 199\n"
+
+
+def test_chunk_larger_than_tail_keeps_its_end(tmp_path: Path) -> None:
+    capture = OutputCapture(tmp_path / "out.log", head_bytes=4, tail_bytes=8)
+    capture.append(b"x" * 100 + b"the end\n")
+    capture.close()
+    assert capture.text().endswith("…\nthe end\n")
+    assert (tmp_path / "out.log").read_bytes() == b"x" * 100 + b"the end\n"
+
+
+def test_large_chunks_split_at_line_boundaries(tmp_path: Path) -> None:
+    capture = OutputCapture(tmp_path / "out.log", head_bytes=20, tail_bytes=20)
+    capture.append(b"".join(b"row %02d\n" % i for i in range(50)))
+    capture.append(b"last\n")
+    capture.close()
+    assert capture.text("out.log") == "row 00\nrow 01\n… 46 lines (322 bytes) omitted; full output in out.log …\nrow 48\nrow 49\nlast\n"
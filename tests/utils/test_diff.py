@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from rune.utils.diff import DiffApplyer, LineIndex
+
+
+def _assert_consistent(index: LineIndex) -> None:
+    fresh = LineIndex(index.text)
+    assert index.lines == fresh.lines
+    assert index.stripped == fresh.stripped
+    assert index.starts == fresh.starts
+    assert dict(index.counts) == dict(fresh.counts)
+    assert index.positions == fresh.positions
+
+
+@pytest.mark.parametrize("text", ["", "a", "a\n", "a\nb", "a\r\nb\r\n", "\n\n\n"])
+def test_line_index_offsets(text: str) -> None:
+    index = LineIndex(text)
+    for i, line in enumerate(text.splitlines()):
+        assert text[index.line_to_char(i) :].startswith(line)
+        assert index.char_to_line(index.line_to_char(i)) == i
+    assert index.line_to_char(len(index)) == len(text)
+
+
+def test_line_index_apply_edit_matches_rebuild() -> None:
+    rng = random.Random(0)
+    pieces = ["x", "  y", "\n", "\r\n", "\r", ""]
+    index = LineIndex("one\ntwo\r\nthree\nfour")
+    for _ in range(500):
+        start = rng.randint(0, len(index.text))
+        end = rng.randint(start, min(len(index.text), start + 6))
+        replacement = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 4)))
+        index.apply_edit(start, end, replacement)
+        _assert_consistent(index)
+
+
+def test_whitespace_match_offsets_with_crlf() -> None:
+    content = "def f():\r\n    a = 1\r\n    b = 2\r\n    return a\r\n"
+    diff = """<<<<<<< SEARCH
+b = 2
+return a
+=======
+return 2
+>>>>>>> REPLACE"""
+
+    result = DiffApplyer().apply_diff(content, diff)
+
+    assert result.success
+    assert result.applied_blocks[0].match_type == "whitespace"
+    assert result.final_content == "def f():\r\n    a = 1\r\n    return 2\r\n"
+
+
+class _PreChangeMatchers:
+    """The window-by-window scans the hashed matchers replaced, verbatim."""
+
+    def _find_whitespace_flexible_match(
+        self, index: LineIndex, search: str
+    ) -> list[tuple[int, int]]:
+        search_lines = search.splitlines()
+        search_lines_stripped = [line.strip() for line in search_lines]
+        if not search_lines:
+            return []
+
+        content_stripped = index.stripped
+        match_locations = []
+        num_search_lines = len(search_lines)
+        num_content_lines = len(content_stripped)
+
+        if num_search_lines > num_content_lines:
+            return []
+
+        for i in range(num_content_lines - num_search_lines + 1):
+            match = True
+            for j in range(num_search_lines):
+                if content_stripped[i + j] != search_lines_stripped[j]:
+                    match = False
+                    break
+            if match:
+                match_locations.append(
+                    (
+                        index.line_to_char(i),
+                        index.line_end(i + num_search_lines - 1),
+                    )
+                )
+
+        return match_locations
+
+    def _find_anchor_match(
+        self, index: LineIndex, search: str
+    ) -> list[tuple[int, int]]:
+        search_lines = search.splitlines()
+        if len(search_lines) < 3:
+            return []
+
+        search_first_stripped = search_lines[0].strip()
+        search_last_stripped = search_lines[-1].strip()
+        search_len_lines = len(search_lines)
+
+        if not search_first_stripped or not search_last_stripped:
+            return []
+
+        content_stripped = index.stripped
+        match_locations = []
+        num_content_lines = len(content_stripped)
+
+        if search_len_lines > num_content_lines:
+            return []
+
+        for i in range(num_content_lines - search_len_lines + 1):
+            if (
+                content_stripped[i] == search_first_stripped
+                and content_stripped[i + search_len_lines - 1] == search_last_stripped
+            ):
+                match_locations.append(
+                    (
+                        index.line_to_char(i),
+                        index.line_end(i + search_len_lines - 1),
+                    )
+                )
+
+        return match_locations
+
+
+def test_hashed_matchers_agree_with_pre_change_scan(monkeypatch: pytest.MonkeyPatch) -> None:
+    rng = random.Random(1)
+    vocabulary = ["a = 1", "  a = 1", "b()", "\tb()", "", "   ", "return x", "}"]
+    applyer, reference = DiffApplyer(), _PreChangeMatchers()
+    for _ in range(300):
+        content = "\n".join(rng.choice(vocabulary) for _ in range(rng.randint(0, 40)))
+        index = LineIndex(content)
+        for _ in range(5):
+            search = "\n".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 5)))
+            assert applyer._find_whitespace_flexible_match(index, search) == reference._find_whitespace_flexible_match(index, search)
+            assert applyer._find_anchor_match(index, search) == reference._find_anchor_match(index, search)
+            # Keep the index's incremental positions under test as well.
+            if len(index):
+                line = rng.randrange(len(index))
+                index.apply_edit(index.line_to_char(line), index.line_end(line), rng.choice(vocabulary))
+
+    # End to end, where apply_edit runs between the blocks of one diff.
+    for _ in range(200):
+        content = "\n".join(rng.choice(vocabulary) for _ in range(rng.randint(5, 40))) + "\n"
+        blocks = []
+        for _ in range(rng.randint(1, 4)):
+            search = "\n".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 4)))
+            replace = "\n".join(rng.choice(vocabulary) for _ in range(rng.randint(0, 3)))
+            blocks.append(f"<<<<<<< SEARCH\n{search}\n=======\n{replace}\n>>>>>>> REPLACE")
+        diff = "\n".join(blocks)
+        hashed = DiffApplyer().apply_diff(content, diff)
+        with monkeypatch.context() as m:
+            for name in ("_find_whitespace_flexible_match", "_find_anchor_match"):
+                m.setattr(DiffApplyer, name, getattr(_PreChangeMatchers, name))
+            scanned = DiffApplyer().apply_diff(content, diff)
+        assert hashed.success == scanned.success
+        assert hashed.final_content == scanned.final_content
+        assert hashed.applied_blocks == scanned.applied_blocks
+
+
+def test_fuzzy_suggestion_found_quickly_in_large_file() -> None:
+    lines = [f"    value_{i} = compute({i})" for i in range(20_000)]
+    lines[12_345:12_348] = [
+        "    total = price * qty",
+        "    total -= discount",
+        "    return round(total, 2)",
+    ]
+    diff = """<<<<<<< SEARCH
+    total = price * quantity
+    total -= discounts
+    return round(total, 2)
+=======
+    return 0
+>>>>>>> REPLACE"""
+
+    result = DiffApplyer(fuzzy_time_budget=5.0).apply_diff("\n".join(lines), diff)
+
+    assert not result.success
+    failed = result.failed_blocks[0]
+    assert failed.best_match_score > 0.9
+    assert failed.best_match_snippet is not None
+    assert "total -= discount" in failed.best_match_snippet
+
+
+def test_single_pass_matches_sequential_application(monkeypatch: pytest.MonkeyPatch) -> None:
+    rng = random.Random(2)
+    vocabulary = ["x = 1", "    x = 1", "return x", "", "pass", "y = x"]
+    planned = 0
+    original_plan = DiffApplyer._plan_single_pass
+
+    def counting_plan(self, *args):
+        nonlocal planned
+        plan = original_plan(self, *args)
+        planned += plan is not None
+        return plan
+
+    for _ in range(300):
+        lines = [
+            rng.choice(vocabulary) if rng.random() < 0.3 else f"    line_{i} = {i}"
+            for i in range(30)
+        ]
+        content = "\n".join(lines) + "\n"
+        blocks = []
+        for start in sorted(rng.sample(range(0, 28, 3), rng.randint(2, 4))):
+            search = lines[start : start + rng.randint(1, 2)]
+            if rng.random() < 0.5:
+                search = [line.strip() for line in search]
+            replace = rng.choice([[], ["x = 1"], ["new = 0", "return x"], search[:1]])
+            blocks.append(
+                "<<<<<<< SEARCH\n"
+                + "\n".join(search)
+                + "\n=======\n"
+                + "\n".join(replace)
+                + "\n>>>>>>> REPLACE"
+            )
+        diff = "\n".join(blocks)
+
+        with monkeypatch.context() as m:
+            m.setattr(DiffApplyer, "_plan_single_pass", counting_plan)
+            fast = DiffApplyer().apply_diff(content, diff)
+        with monkeypatch.context() as m:
+            m.setattr(DiffApplyer, "_plan_single_pass", lambda *args: None)
+            sequential = DiffApplyer().apply_diff(content, diff)
+
+        if sequential.success:
+            assert fast.success
+            assert fast.final_content == sequential.final_content
+            assert fast.applied_blocks == sequential.applied_blocks
+        else:
+            assert not fast.success
+    assert planned > 50
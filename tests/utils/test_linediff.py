@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import difflib
+import random
+
+import pytest
+
+from rune.utils.linediff import opcodes, unified_diff
+from rune.utils.patch import apply_hunks, parse_patch
+
+
+def test_opcodes_rebuild_target() -> None:
+    rng = random.Random(0)
+    for _ in range(500):
+        alphabet = rng.choice(["ab", "abcdefgh"])
+        a = [rng.choice(alphabet) + "\n" for _ in range(rng.randint(0, 40))]
+        b = list(a)
+        for _ in range(rng.randint(0, 6)):
+            if b and rng.random() < 0.5:
+                del b[rng.randrange(len(b))]
+            else:
+                b.insert(rng.randint(0, len(b)), rng.choice(alphabet + "xyz") + "\n")
+        rebuilt = []
+        for tag, i1, i2, j1, j2 in opcodes(a, b):
+            if tag == "equal":
+                assert a[i1:i2] == b[j1:j2]
+            rebuilt += b[j1:j2]
+        assert rebuilt == b
+
+
+@pytest.mark.parametrize("old_eol, new_eol", [("\n", "\n"), ("", "\n"), ("\n", "")])
+def test_unified_diff_applies_back(old_eol: str, new_eol: str) -> None:
+    old = "\n".join(f"line {i}" for i in range(100)) + old_eol
+    new_lines = [f"line {i}" for i in range(100)]
+    new_lines[10] = "changed"
+    del new_lines[50:53]
+    new_lines.append("appended")
+    new = "\n".join(new_lines) + new_eol
+
+    result = unified_diff(old, new, "f.txt")
+    assert result.summary is None
+    assert result.text.startswith("--- a/f.txt\n+++ b/f.txt\n@@ -8,7 +8,7 @@\n")
+    assert len(result.hunks) == 3
+    (patch,) = parse_patch(result.text)
+    assert apply_hunks(old, patch.hunks, fuzz=0)[0] == new
+
+
+def test_unified_diff_matches_difflib_for_simple_edit() -> None:
+    old = "".join(f"{i}\n" for i in range(30))
+    new = old.replace("12\n", "twelve\n").replace("25\n", "")
+    expected = "".join(
+        difflib.unified_diff(
+            old.splitlines(keepends=True),
+            new.splitlines(keepends=True),
+            fromfile="a/x",
+            tofile="b/x",
+        )
+    )
+    assert unified_diff(old, new, "x").text == expected
+    assert unified_diff(old, old, "x").as_text() is None
+
+
+def test_unified_diff_summarises_over_budget() -> None:
+    old = "".join(f"row {i}\n" for i in range(1000))
+    new = old.replace("row 500\n", "row 500\nextra\n").replace("row 900\n", "")
+
+    result = unified_diff(old, new, "big.txt", max_bytes=1000)
+    assert result.text is None
+    assert (result.summary.added, result.summary.removed) == (1, 1)
+    assert result.summary.region == (502, 901, 502, 901)
+    assert result.as_text().startswith(
+        "# Diff of big.txt omitted (over 1,000 bytes): +1 -1"
+    )
+
+    result = unified_diff(old, new, "big.txt", time_budget=0)
+    assert result.text is None and "not computed within 0s" in result.as_text()
+
+
+def test_compact_trims_context_and_caps_hunks() -> None:
+    old = "".join(f"row {i}\n" for i in range(1000))
+    new = old
+    for i in range(0, 1000, 50):
+        new = new.replace(f"row {i}\n", f"ROW {i}\n")
+
+    result = unified_diff(old, new, "t.txt")
+    compact = result.compact(context=1, max_lines=12)
+    assert compact.startswith(
+        "--- a/t.txt\n+++ b/t.txt\n@@ -1,2 +1,2 @@\n-row 0\n+ROW 0\n row 1\n"
+    )
+    assert "@@ -950,3 +950,3 @@\n" in compact  # Later hunks keep only their header
+    assert "-row 950" not in compact
+    assert compact.endswith("more diff lines omitted; re-read the file for details.\n")
+    assert result.as_text() == result.text and "-row 950\n" in result.text
+
+    assert unified_diff("", "a\nb\n", "n.txt").compact() == (
+        "--- a/n.txt\n+++ b/n.txt\n# New content: 2 lines, sha256 "
+        "911169ddaaf146aff539f58c26c489af3b892dff0fe283c1c264c65ae5aa59a2\n"
+    )
+
+
+def test_unified_diff_splits_on_newlines_only() -> None:
+    old = "page one\n\x0cpage two\nend\n"
+    new = "page one\n\x0cpage 2 more\nend\n"
+
+    result = unified_diff(old, new, "doc.txt")
+    assert result.hunks == ["@@ -1,3 +1,3 @@\n page one\n-\x0cpage two\n+\x0cpage 2 more\n end\n"]